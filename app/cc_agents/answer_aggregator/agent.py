@@ -17,7 +17,9 @@ from claude_agent_sdk import (
 
 from app.cc_tools.waiting_answer.waiting_answer_tools import create_waiting_answer_mcp_server
 from app.cc_tools.slack.slack_tools import create_slack_mcp_server
-from app.cc_utils.waiting_answer_db import get_user_pending_requests
+from app.cc_utils import pending_index
+from app.cc_utils.waiting_answer_db import get_user_pending_requests_async
+from app.cc_utils.usage_tracker import track_usage
 from app.config.settings import get_settings
 
 
@@ -86,8 +88,11 @@ async def call_answer_aggregator(
     """
     user_id = message_data["user_id"]
 
-    # 1. 이 사용자의 응답 대기 중인 질의 확인
-    pending_requests = get_user_pending_requests(user_id)
+    # 1. 이 사용자의 응답 대기 중인 질의 확인 (대부분 대기 중인 질의가 없으므로 메모리 인덱스로 먼저 확인)
+    if not pending_index.pending_request_ids(user_id):
+        return False
+
+    pending_requests = await get_user_pending_requests_async(user_id)
 
     if not pending_requests:
         return False  # 응답 대기 중인 질의 없음
@@ -126,8 +131,9 @@ async def call_answer_aggregator(
     )
 
     try:
-        async with ClaudeSDKClient(options=options) as client:
-            query = f"""
+        with track_usage("answer_aggregator", channel_id=message_data.get("channel_id"), user_id=user_id, model=options.model) as usage:
+            async with ClaudeSDKClient(options=options) as client:
+                query = f"""
 다음 정보를 분석하여 처리하세요:
 
 응답 대기 중인 질의 목록:
@@ -141,13 +147,14 @@ async def call_answer_aggregator(
 - message_ts: {message_data.get('message_ts')}
 - user_id: {message_data.get('user_id')}
 """
-            await client.query(query)
-
-            async for message in client.receive_response():
-                if isinstance(message, ResultMessage):
-                    result_text = message.result.strip().lower()
-                    logging.info(f"[ANSWER_AGGREGATOR] Response: {result_text}")
-                    return "true" in result_text
+                await client.query(query)
+
+                async for message in client.receive_response():
+                    if isinstance(message, ResultMessage):
+                        usage.record(message)
+                        result_text = message.result.strip().lower()
+                        logging.info(f"[ANSWER_AGGREGATOR] Response: {result_text}")
+                        return "true" in result_text
     except Exception as e:
         logging.error(f"[ANSWER_AGGREGATOR] Error: {e}")
 
@@ -15,6 +15,7 @@ from claude_agent_sdk import (
 
 from app.config.settings import get_settings
 from app.cc_utils.language_helper import detect_language
+from app.cc_utils.usage_tracker import track_usage
 
 
 def create_system_prompt(bot_name: str) -> str:
@@ -103,18 +104,20 @@ async def call_bot_call_detector(
     )
 
     try:
-        async with ClaudeSDKClient(options=options) as client:
-            query = f"""Determine if the following message is directly calling the target "{bot_name}".
+        with track_usage("bot_call_detector", model=options.model) as usage:
+            async with ClaudeSDKClient(options=options) as client:
+                query = f"""Determine if the following message is directly calling the target "{bot_name}".
 
 Message: {message_text}"""
 
-            await client.query(query)
+                await client.query(query)
 
-            async for message in client.receive_response():
-                if isinstance(message, ResultMessage):
-                    result_text = message.result.strip().lower()
-                    logging.info(f"[BOT_CALL_DETECTOR] Response: {result_text}")
-                    return "true" in result_text
+                async for message in client.receive_response():
+                    if isinstance(message, ResultMessage):
+                        usage.record(message)
+                        result_text = message.result.strip().lower()
+                        logging.info(f"[BOT_CALL_DETECTOR] Response: {result_text}")
+                        return "true" in result_text
     except Exception as e:
         logging.error(f"[BOT_CALL_DETECTOR] Error: {e}")
 
@@ -15,6 +15,7 @@ from claude_agent_sdk import (
 from slack_sdk.web.async_client import AsyncWebClient
 
 from app.config.settings import get_settings
+from app.cc_utils.usage_tracker import track_usage
 
 
 def create_system_prompt(bot_name: str) -> str:
@@ -130,22 +131,24 @@ async def call_bot_thread_context_detector(
             cwd=os.getcwd()
         )
 
-        async with ClaudeSDKClient(options=options) as sdk_client:
-            conversation = "\n".join(thread_messages)
-            query = f"""스레드 대화 내역:
+        with track_usage("bot_thread_context_detector", channel_id=channel_id, model=options.model) as usage:
+            async with ClaudeSDKClient(options=options) as sdk_client:
+                conversation = "\n".join(thread_messages)
+                query = f"""스레드 대화 내역:
 {conversation}
 
 현재 사용자 메시지: {current_message}
 
 이 메시지가 대상 "{bot_name}"에게 추가 질의하는 것입니까?"""
 
-            await sdk_client.query(query)
+                await sdk_client.query(query)
 
-            async for message in sdk_client.receive_response():
-                if isinstance(message, ResultMessage):
-                    result_text = message.result.strip().lower()
-                    logging.info(f"[BOT_THREAD_CONTEXT] Response: {result_text}")
-                    return "true" in result_text
+                async for message in sdk_client.receive_response():
+                    if isinstance(message, ResultMessage):
+                        usage.record(message)
+                        result_text = message.result.strip().lower()
+                        logging.info(f"[BOT_THREAD_CONTEXT] Response: {result_text}")
+                        return "true" in result_text
 
     except Exception as e:
         logging.error(f"[BOT_THREAD_CONTEXT] Error: {e}")
@@ -5,8 +5,10 @@
 index.md 파일을 자동으로 업데이트합니다.
 """
 
+import asyncio
 import logging
 import os
+from typing import Optional, Set
 
 from claude_agent_sdk import (
     ClaudeAgentOptions,
@@ -15,14 +17,18 @@ from claude_agent_sdk import (
 )
 
 from app.config.settings import get_settings
+from app.cc_utils.memory_scope import create_scope_hooks, writable_paths
+from app.cc_utils.usage_tracker import apply_budget_policy, track_usage
 
 
-def create_system_prompt(state_prompt: str, memories_path: str) -> str:
+def create_system_prompt(state_prompt: str, memories_path: str, allowed: Set[str], allow_handoff: bool) -> str:
     """Memory manager를 위한 system prompt 생성
 
     Args:
         state_prompt: create_state_prompt()로 생성된 현재 상태 프롬프트
         memories_path: memories 폴더 절대 경로
+        allowed: 이 작업이 수정할 수 있는 파일 (memories 기준 상대 경로)
+        allow_handoff: 다른 파일에 저장할 내용을 hand_off_memory로 넘길 수 있는지 여부
 
     Returns:
         str: 메모리 관리를 위한 system prompt
@@ -41,20 +47,35 @@ def create_system_prompt(state_prompt: str, memories_path: str) -> str:
 이 역할과 관련된 정보를 우선적으로 저장하세요.
 </bot_role>"""
 
+    # 쓰기 범위 섹션 (같은 파일은 항상 한 메모리 작업만 수정하도록 작업마다 범위를 제한)
+    allowed_list = "\n".join(f"- {path}" for path in sorted(allowed)) or "- (없음: 파일을 직접 수정하지 않습니다)"
+    if allow_handoff:
+        handoff_rule = "범위 밖 파일(다른 채널/유저 파일, projects/ 등 주제 파일)에 저장할 내용은 `hand_off_memory` 도구로 대상 파일 경로와 함께 넘기세요. 넘긴 작업은 이 대화를 볼 수 없으므로 필요한 정보를 모두 담으세요."
+    else:
+        handoff_rule = "이 작업은 다른 작업에서 넘겨받은 것입니다. 범위 밖 파일에 저장할 내용은 저장하지 않습니다."
+    scope_section = f"""
+
+## 쓰기 범위
+<write_scope>
+이 작업이 수정할 수 있는 파일은 다음뿐입니다. (파일이 없으면 새로 만듭니다)
+{allowed_list}
+{handoff_rule}
+</write_scope>"""
+
     system_prompt = f"""당신은 Slack에서 상주하는 가상 직원 에이전트를 위해 기억을 관리하는 메모리 에이전트입니다.
 
 {state_prompt}
 
 # 기본 지침
 가상 직원 에이전트의 다음 답변에 참고할 정보를 {memories_path}에 저장합니다.
-{role_section}
+{role_section}{scope_section}
 
 ## 워크플로우
 <workflow>
-1. 반드시 `slack-memory-store` skill을 사용하여 메모리를 관리합니다.
+1. 반드시 `slack-memory-store` skill의 파일 형식(frontmatter, 카테고리 규칙)을 따릅니다.
 2. 전달받은 정보를 분석하고, 적절한 메타데이터를 추출합니다.
-3. add_memory.py 스크립트를 사용하여 자동 분류 및 저장합니다.
-4. 주기적으로 update_index.py를 실행하여 인덱스를 갱신합니다.
+3. 쓰기 범위 안의 파일을 Read로 읽은 뒤 Edit/Write 도구로 저장합니다. add_memory.py 등 Bash로 memories 폴더를 수정하지 마세요. (대상 파일을 스스로 고르므로 쓰기 범위를 지킬 수 없습니다)
+4. index.md는 저장이 끝난 뒤 시스템이 변경된 파일만 자동 반영합니다. update_index.py를 실행하거나 index.md를 직접 수정하지 마세요.
 </workflow>
 
 ## 핵심 행동 원칙
@@ -78,12 +99,16 @@ def create_system_prompt(state_prompt: str, memories_path: str) -> str:
 
 async def call_memory_manager(
     query: str,
+    shard_key: Optional[str] = None,
+    allow_handoff: bool = True,
 ) -> str:
     """
     메모리 관리 에이전트를 실행합니다.
 
     Args:
         query: 메모리 저장 요청 쿼리
+        shard_key: 쓰기 범위 겸 메모리 샤드 키 (app.cc_utils.memory_scope 참고)
+        allow_handoff: 범위 밖 내용을 다른 메모리 작업으로 넘길 수 있는지 여부 (넘겨받은 작업은 False)
 
     Returns:
         str: 에이전트 실행 결과
@@ -99,11 +124,21 @@ async def call_memory_manager(
     from app.cc_agents.state_prompt import create_state_prompt
     state_prompt = create_state_prompt()
 
-    system_prompt = create_system_prompt(state_prompt, memories_path)
+    allowed = await asyncio.to_thread(writable_paths, shard_key)
+    system_prompt = create_system_prompt(state_prompt, memories_path, allowed, allow_handoff)
+
+    mcp_servers = {}
+    if allow_handoff:
+        from app.cc_tools.memory_handoff import create_memory_handoff_mcp_server
+
+        mcp_servers["memory_handoff"] = create_memory_handoff_mcp_server(shard_key)
+
+    # 예산 상한 초과 시 저렴한 모델로 다운그레이드
+    model = await apply_budget_policy("memory_manager", settings.MODEL_FOR_MODERATE)
 
     options = ClaudeAgentOptions(
         system_prompt=system_prompt,
-        model=settings.MODEL_FOR_MODERATE,
+        model=model,
         permission_mode="bypassPermissions",
         allowed_tools=["*"],
         disallowed_tools=[
@@ -117,25 +152,29 @@ async def call_memory_manager(
         ],
         setting_sources=['project'],
         cwd=os.getcwd(),
+        mcp_servers=mcp_servers,
+        hooks=create_scope_hooks(allowed),
         max_buffer_size=10 * 1024 * 1024
     )
 
     try:
-        async with ClaudeSDKClient(options=options) as client:
-            await client.query(query)
+        with track_usage("memory_manager", model=options.model) as usage:
+            async with ClaudeSDKClient(options=options) as client:
+                await client.query(query)
 
-            result_message = ""
-            async for message in client.receive_response():
+                result_message = ""
+                async for message in client.receive_response():
 
-                # from devtools import pprint
-                # pprint(message)
+                    # from devtools import pprint
+                    # pprint(message)
 
-                if isinstance(message, ResultMessage):
-                    result_message = message.result
-                    logging.info(f"[MEMORY_MANAGER] Result: {result_message[:100]}...")
-                    break
+                    if isinstance(message, ResultMessage):
+                        usage.record(message)
+                        result_message = message.result
+                        logging.info(f"[MEMORY_MANAGER] Result: {result_message[:100]}...")
+                        break
 
-            return result_message if result_message else "메모리 작업을 완료할 수 없었습니다."
+                return result_message if result_message else "메모리 작업을 완료할 수 없었습니다."
 
     except Exception as e:
         logging.error(f"[MEMORY_MANAGER] Error: {e}")
@@ -4,9 +4,10 @@
 이 모듈은 사용자 쿼리와 관련된 메모리를 검색하고 취합하여 반환합니다.
 """
 
+import asyncio
 import logging
 import os
-from typing import Optional
+from typing import Dict, List, Optional
 
 from claude_agent_sdk import (
     ClaudeAgentOptions,
@@ -15,18 +16,44 @@ from claude_agent_sdk import (
 )
 
 from app.config.settings import get_settings
+from app.cc_utils import memory_snapshots, memory_store, retrieval_cache
+from app.cc_utils.memory_index import read_memory_files, search_memories
+from app.cc_utils.usage_tracker import track_usage
 
+# 직접 조회 시 포함할 후보의 최소 점수 비율 (채널/유저 외 최고 점수 대비)
+DIRECT_LOOKUP_MIN_SCORE_RATIO = 0.3
 
-def create_system_prompt(state_prompt: str, memories_path: str) -> str:
+# 진행 중인 LLM 검색 (같은 캐시 키의 동시 요청이 한 세션을 공유)
+_inflight: Dict[tuple, asyncio.Future] = {}
+
+
+def create_system_prompt(state_prompt: str, memories_path: str, candidates: Optional[List[dict]] = None) -> str:
     """Memory retriever를 위한 system prompt 생성
 
     Args:
         state_prompt: create_state_prompt()로 생성된 현재 상태 프롬프트
         memories_path: memories 폴더 절대 경로
+        candidates: 로컬 인덱스로 찾은 후보 메모리 파일 목록 (선택)
 
     Returns:
         str: 메모리 검색을 위한 system prompt
     """
+    # 로컬 인덱스 후보가 있으면 index.md 탐색 대신 후보 파일부터 읽도록 안내
+    if candidates:
+        candidate_lines = "\n".join(
+            f"- {memories_path}/{c['path']} (score: {c['score']})" for c in candidates
+        )
+        workflow = f"""1. 대화 컨텍스트 분석 (채널, 유저, 키워드)
+2. 아래 후보 메모리 파일을 먼저 읽기 (로컬 검색 인덱스로 찾은 관련도 순 목록)
+{candidate_lines}
+3. 후보 파일로 부족할 때만 {memories_path}/index.md를 읽고 추가 파일 로드
+4. 정보를 자연스럽게 종합하여 답변"""
+    else:
+        workflow = f"""1. 대화 컨텍스트 분석 (채널, 유저, 키워드)
+2. 항상 {memories_path}/index.md 먼저 읽기
+3. 관련 메모리 파일 로드 (channels, users, projects 등)
+4. 정보를 자연스럽게 종합하여 답변"""
+
     system_prompt = f"""당신은 Slack에서 상주하는 가상 직원 에이전트의 작업을 위해 메모리를 취합하는 에이전트입니다.
 
 {state_prompt}
@@ -36,10 +63,7 @@ def create_system_prompt(state_prompt: str, memories_path: str) -> str:
 
 ## 워크플로우
 <workflow>
-1. 대화 컨텍스트 분석 (채널, 유저, 키워드)
-2. 항상 {memories_path}/index.md 먼저 읽기
-3. 관련 메모리 파일 로드 (channels, users, projects 등)
-4. 정보를 자연스럽게 종합하여 답변
+{workflow}
 </workflow>
 
 ## 메모리 탐색 전략
@@ -75,23 +99,122 @@ async def call_memory_retriever(
         slack_data: Slack 컨텍스트 정보 (선택)
         message_data: 메시지 정보 (선택)
 
+    Returns:
+        str: 취합된 메모리 내용
+    """
+    # 검색하는 동안 같은 세대의 스냅샷을 유지 (쓰기 도중의 파일을 읽지 않도록)
+    with memory_snapshots.open_snapshot() as snapshot_path:
+        return await _retrieve(search_query, slack_data, message_data, str(snapshot_path))
+
+
+async def _retrieve(
+    search_query: str,
+    slack_data: Optional[dict],
+    message_data: Optional[dict],
+    memories_path: str
+) -> str:
+    """
+    메모리 스냅샷에서 검색합니다.
+
+    Args:
+        memories_path: 읽을 메모리 폴더 (스냅샷 또는 원본 memories 폴더)
+
     Returns:
         str: 취합된 메모리 내용
     """
     settings = get_settings()
-    base_dir = settings.FILESYSTEM_BASE_DIR or os.getcwd()
-    memories_path = os.path.join(base_dir, "memories")
 
     # memories 폴더가 없으면 빈 결과 반환
     if not os.path.exists(memories_path):
         logging.info(f"[MEMORY_RETRIEVER] No memories folder found")
         return "관련된 메모리가 없습니다."
 
+    # 검색 전 메모리 세대(generation)를 먼저 기록 (검색 도중의 쓰기는 다음 조회에서 감지)
+    generation = 0
+    if settings.MEMORY_RETRIEVAL_CACHE_ENABLED:
+        generation = await asyncio.to_thread(memory_store.sync)
+
+    # 로컬 BM25 인덱스로 후보 파일 검색
+    candidates = []
+    if settings.MEMORY_INDEX_ENABLED:
+        boost_terms = [(message_data or {}).get("channel_id"), (message_data or {}).get("user_id")]
+        candidates = await asyncio.to_thread(
+            search_memories, search_query, settings.MEMORY_INDEX_TOP_K, boost_terms
+        )
+        logging.info(f"[MEMORY_RETRIEVER] Index candidates: {[c['path'] for c in candidates]}")
+
+        # 직접 조회: 관련 후보 파일이 충분히 작으면 LLM 없이 원문을 그대로 반환
+        # (현재 채널/유저 파일은 점수와 무관하게 상위에 오므로, 그 외 후보가 기준 점수를 넘을 때만)
+        if candidates and settings.MEMORY_DIRECT_LOOKUP_MAX_CHARS > 0:
+            best_score = max((c["score"] for c in candidates if not c["boosted"]), default=0.0)
+            if best_score < settings.MEMORY_DIRECT_LOOKUP_MIN_SCORE:
+                logging.info(f"[MEMORY_RETRIEVER] No relevant topic file for direct lookup (best score {best_score}), using LLM")
+            else:
+                selected = [
+                    c["path"] for c in candidates
+                    if c["boosted"] or c["score"] >= best_score * DIRECT_LOOKUP_MIN_SCORE_RATIO
+                ]
+                direct_memory = read_memory_files(selected, settings.MEMORY_DIRECT_LOOKUP_MAX_CHARS, memories_path)
+                if direct_memory:
+                    logging.info(f"[MEMORY_RETRIEVER] Direct lookup, skipping LLM ({len(selected)} files)")
+                    return direct_memory
+                logging.info(f"[MEMORY_RETRIEVER] Candidates exceed {settings.MEMORY_DIRECT_LOOKUP_MAX_CHARS} chars, using LLM")
+
+    if not settings.MEMORY_RETRIEVAL_CACHE_ENABLED:
+        result = await _retrieve_with_llm(search_query, slack_data, message_data, memories_path, candidates)
+        return result or "관련된 메모리가 없습니다."
+
+    # 캐시 조회: 같은 채널/유저/쿼리이고 관련 파일이 바뀌지 않았으면 재사용
+    candidate_paths = [c["path"] for c in candidates]
+    cache_key = retrieval_cache.make_key(
+        (message_data or {}).get("channel_id"), (message_data or {}).get("user_id"), search_query
+    )
+    cached = await asyncio.to_thread(retrieval_cache.get, cache_key, candidate_paths)
+    if cached is not None:
+        return cached
+
+    # 같은 쿼리가 이미 검색 중이면 그 결과를 함께 기다림
+    task = _inflight.get(cache_key)
+    if task is not None:
+        logging.info(f"[MEMORY_RETRIEVER] Joining in-flight retrieval")
+        result = await asyncio.shield(task)
+        return result or "관련된 메모리가 없습니다."
+
+    task = asyncio.ensure_future(
+        _retrieve_with_llm(search_query, slack_data, message_data, memories_path, candidates)
+    )
+    _inflight[cache_key] = task
+    try:
+        result = await asyncio.shield(task)
+    finally:
+        _inflight.pop(cache_key, None)
+
+    if result is None:
+        return "관련된 메모리가 없습니다."
+    retrieval_cache.put(cache_key, result, candidate_paths, generation)
+    return result
+
+
+async def _retrieve_with_llm(
+    search_query: str,
+    slack_data: Optional[dict],
+    message_data: Optional[dict],
+    memories_path: str,
+    candidates: List[dict]
+) -> Optional[str]:
+    """
+    LLM 세션으로 메모리를 검색합니다.
+
+    Returns:
+        Optional[str]: 취합된 메모리 내용 (오류 시 None)
+    """
+    settings = get_settings()
+
     # state_prompt 생성
     from app.cc_agents.state_prompt import create_state_prompt
     state_prompt = create_state_prompt(slack_data, message_data)
 
-    system_prompt = create_system_prompt(state_prompt, memories_path)
+    system_prompt = create_system_prompt(state_prompt, memories_path, candidates)
 
     options = ClaudeAgentOptions(
         system_prompt=system_prompt,
@@ -116,18 +239,20 @@ async def call_memory_retriever(
     )
 
     try:
-        async with ClaudeSDKClient(options=options) as client:
-            await client.query(search_query)
+        with track_usage("memory_retriever", channel_id=(message_data or {}).get("channel_id"), user_id=(message_data or {}).get("user_id"), model=options.model) as usage:
+            async with ClaudeSDKClient(options=options) as client:
+                await client.query(search_query)
 
-            result_message = ""
-            async for message in client.receive_response():
-                if isinstance(message, ResultMessage):
-                    result_message = message.result
-                    logging.info(f"[MEMORY_RETRIEVER] Result: {result_message[:100]}...")
-                    break
+                result_message = ""
+                async for message in client.receive_response():
+                    if isinstance(message, ResultMessage):
+                        usage.record(message)
+                        result_message = message.result
+                        logging.info(f"[MEMORY_RETRIEVER] Result: {result_message[:100]}...")
+                        break
 
-            return result_message if result_message else "관련된 메모리가 없습니다."
+                return result_message if result_message else "관련된 메모리가 없습니다."
 
     except Exception as e:
         logging.error(f"[MEMORY_RETRIEVER] Error: {e}")
-        return "관련된 메모리가 없습니다."
+        return None
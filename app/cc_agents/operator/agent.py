@@ -8,6 +8,7 @@
 import json
 import logging
 import os
+from typing import Optional
 
 from claude_agent_sdk import (
     ClaudeAgentOptions,
@@ -23,6 +24,10 @@ from app.cc_tools.meeting_transcription.meeting_transcription_tools import (
 )
 from app.cc_tools.deepl.deepl_tools import create_deepl_tools_server
 from app.cc_tools.files.files_tools import create_files_mcp_server
+from app.cc_utils.context_budget import ContextBudget, estimate_tokens
+from app.cc_utils.session_store import get_reply_thread_ts, save_session
+from app.cc_utils.slack_progress import SlackProgressStreamer
+from app.cc_utils.usage_tracker import record_compaction, track_usage
 from app.config.settings import get_settings, Settings
 from app.cc_agents.state_prompt import create_state_prompt
 
@@ -311,6 +316,7 @@ async def save_to_memory(
     try:
         from app.queueing_extended import enqueue_memory_job
 
+        settings = get_settings()
         channel_info = slack_data.get("channel", {})
         channel_id = channel_info.get(
             "channel_id", message_data.get("channel_id", "unknown")
@@ -318,6 +324,36 @@ async def save_to_memory(
         channel_name = channel_info.get("channel_name", "unknown")
         channel_type = channel_info.get("channel_type", "unknown")
 
+        # 인사/감사 등은 저장하지 않고, 단순 채널 가이드라인/유저 선호는 LLM 없이 바로 기록
+        if settings.MEMORY_FAST_PATH_ENABLED:
+            from app.cc_utils.memory_fast_path import classify_save
+
+            decision = classify_save(query, final_message)
+            if decision["action"] == "drop":
+                logging.info(f"[OPERATOR_AGENT] Memory save skipped (trivial)")
+                return
+            if decision["action"] == "direct":
+                await enqueue_memory_job({
+                    "type": "direct",
+                    "fact": {
+                        "kind": decision["kind"],
+                        "text": decision["text"],
+                        "channel_id": channel_id,
+                        "channel_name": channel_name if channel_name != "unknown" else None,
+                        "channel_type": channel_type if channel_type != "unknown" else None,
+                        "user_id": message_data["user_id"],
+                        "user_name": message_data.get("user_name"),
+                    },
+                    # 유저 선호는 users/<id>.md를 수정하므로 채널이 아닌 유저 단위로 순차 처리
+                    "shard_key": (
+                        f"user:{message_data['user_id']}"
+                        if decision["kind"] == "user_preference"
+                        else f"channel:{channel_id}"
+                    ),
+                })
+                logging.info(f"[OPERATOR_AGENT] Memory fact enqueued ({decision['kind']})")
+                return
+
         memory_query = f"""다음은 방금 완료된 Slack 대화 내용입니다. 다음 대화에서 참고할 만한 정보가 있다면 저장하세요.
         
 **채널:**
@@ -340,8 +376,8 @@ async def save_to_memory(
 소속 팀 동료와 관련된 사항은 반드시 저장합니다.
 """
 
-        # 메모리 큐에 작업 추가 (순차 처리됨)
-        await enqueue_memory_job({"memory_query": memory_query})
+        # 메모리 큐에 작업 추가 (채널 파일만 직접 수정하고, 유저/프로젝트 등 다른 파일은 해당 샤드의 작업으로 넘김)
+        await enqueue_memory_job({"memory_query": memory_query, "shard_key": f"channel:{channel_id}"})
         logging.info(f"[OPERATOR_AGENT] Memory job enqueued")
     except Exception as e:
         logging.error(f"[OPERATOR_AGENT] Memory enqueue failed: {e}")
@@ -448,8 +484,80 @@ def create_system_prompt(state_prompt: str) -> str:
     return system_prompt
 
 
+def fit_context_budget(
+    user_query: str,
+    slack_data: dict,
+    message_data: dict,
+    retrieved_memory: str,
+    budget: ContextBudget,
+) -> tuple:
+    """쿼리 전에 컨텍스트 추정치가 압축 임계치를 넘지 않도록 입력을 줄입니다.
+
+    오래된 최근 메시지부터 제거하고, 그래도 넘으면 검색된 메모리 뒷부분을 자릅니다.
+
+    Args:
+        user_query: 사용자 질의
+        slack_data: Slack API 데이터
+        message_data: 현재 메시지 정보
+        retrieved_memory: 검색된 관련 메모리 내용
+        budget: 세션 컨텍스트 예산
+
+    Returns:
+        tuple: (slack_data, retrieved_memory, trimmed 여부)
+    """
+
+    def estimate() -> int:
+        state_prompt = create_state_prompt(slack_data, message_data)
+        return budget.start(create_system_prompt(state_prompt), retrieved_memory, user_query)
+
+    if estimate() < budget.limit:
+        return slack_data, retrieved_memory, False
+
+    # 1. 오래된 대화 내역부터 제거 (oldest first 정렬)
+    recent_messages = list((slack_data or {}).get("recent_messages") or [])
+    if recent_messages:
+        slack_data = dict(slack_data)
+        while recent_messages and estimate() >= budget.limit:
+            recent_messages.pop(0)
+            slack_data["recent_messages"] = recent_messages
+
+    # 2. 검색된 메모리 뒷부분 자르기
+    overflow = budget.used - budget.limit
+    if overflow > 0 and retrieved_memory:
+        keep_ratio = max(0.0, 1 - overflow / max(estimate_tokens(retrieved_memory), 1))
+        retrieved_memory = retrieved_memory[: int(len(retrieved_memory) * keep_ratio)]
+        retrieved_memory += "\n\n(컨텍스트 한도로 이후 메모리는 생략되었습니다)"
+        estimate()
+
+    return slack_data, retrieved_memory, True
+
+
+async def compact_session(client: ClaudeSDKClient, session_id: str, usage) -> None:
+    """같은 client로 /compact를 실행합니다.
+
+    Args:
+        client: 현재 세션의 ClaudeSDKClient
+        session_id: 압축할 세션 ID
+        usage: track_usage()의 UsageRecorder
+    """
+    await client.query("/compact", session_id)
+    async for msg in client.receive_response():
+        if isinstance(msg, ResultMessage):
+            usage.record(msg)
+            logging.info(f"[OPERATOR_AGENT] /compact executed successfully")
+            break
+
+
+class SessionResumeError(Exception):
+    """이어갈 세션을 재개하지 못했을 때 발생 (호출자가 새 세션으로 다시 실행)"""
+
+
 async def call_operator_agent(
-    user_query: str, slack_data: dict, message_data: dict, retrieved_memory: str = ""
+    user_query: str,
+    slack_data: dict,
+    message_data: dict,
+    retrieved_memory: str = "",
+    resume_session: Optional[dict] = None,
 ) -> None:
     """
     핵심 에이전트를 실행하여 사용자 요청을 처리하고 Slack에 메시지를 전송합니다.
@@ -459,18 +567,42 @@ async def call_operator_agent(
         slack_data: Slack API 데이터 (채널, 멤버, 메시지 히스토리)
         message_data: 현재 메시지 정보 (user_id, text, channel_id 등)
         retrieved_memory: 검색된 관련 메모리 내용
+        resume_session: 같은 스레드의 이전 세션 (session_store.claim_session() 결과, 있으면 이어서 실행)
+
+    Raises:
+        SessionResumeError: resume_session을 재개하지 못한 경우
     """
 
+    settings = get_settings()
+    channel_id = message_data.get("channel_id")
+    reply_thread_ts = get_reply_thread_ts(
+        (slack_data or {}).get("channel", {}).get("channel_type", ""),
+        message_data.get("message_ts"),
+        message_data.get("thread_ts"),
+    )
+
+    # 관련 메모리가 없으면 빈 문자열로 취급
+    if retrieved_memory == "관련된 메모리가 없습니다.":
+        retrieved_memory = ""
+
+    # 쿼리 전 컨텍스트 크기 추정 및 필요 시 입력 축소
+    budget = ContextBudget(settings.OPERATOR_CONTEXT_WINDOW_TOKENS, settings.OPERATOR_COMPACT_THRESHOLD)
+    slack_data, retrieved_memory, trimmed = fit_context_budget(
+        user_query, slack_data, message_data, retrieved_memory, budget
+    )
+    if trimmed:
+        record_compaction(
+            "operator", "preflight_trim", budget.used, budget.context_window, channel_id=channel_id
+        )
+
     state_prompt = create_state_prompt(slack_data, message_data)
 
     # 메모리가 있으면 state_prompt에 추가
-    if retrieved_memory and retrieved_memory != "관련된 메모리가 없습니다.":
+    if retrieved_memory:
         state_prompt += f"\n\n## 관련 메모리\n<retrieved_memory>\n{retrieved_memory}\n</retrieved_memory>"
 
     system_prompt = create_system_prompt(state_prompt)
 
-    settings = get_settings()
-
     # 설정에 따라 활성화된 MCP 서버만 로드
     mcp_servers = build_mcp_servers_dict(settings)
 
@@ -489,114 +621,192 @@ async def call_operator_agent(
         setting_sources=["project"],
         cwd=os.getcwd(),
         max_buffer_size=10 * 1024 * 1024,
+        resume=resume_session["session_id"] if resume_session else None,
     )
 
     # 세션 아이디 설정
     session_id = None
     final_message = ""
+    got_response = False
+    completed = False
     from devtools import pprint
 
-    # user_query에 역할 선택 지시사항 추가
-    enhanced_query = f"""{user_query}
+    if resume_session:
+        # 스레드 후속 메시지: 이전 세션에 이미 역할과 맥락이 있으므로 새 메시지만 전달
+        enhanced_query = f"""같은 대화의 후속 메시지입니다. 이전 작업 맥락을 이어서 처리하세요.
+응답 시 message_ts, thread_ts 등은 state_data의 current_message 값을 사용하세요.
+
+{user_query}"""
+    else:
+        # user_query에 역할 선택 지시사항 추가
+        enhanced_query = f"""{user_query}
 
 요청을 처리하기 전에 `it-role-expert` skill을 이용해 이 요청에 가장 적합한 IT 역할을 선택하고, 해당 역할의 전문성을 바탕으로 작업을 진행하세요.
 
 '어제', '내일', '다음주', '작년', '이번 년도' 같은 상대적 표현은 반드시 확인한 현재 시간 기준으로 정확한 날짜로 변환하여 검색/필터링해야 합니다."""
 
-    # Context overflow 시 /compact 후 재시도 (같은 client 유지, 최대 2회)
+    # 사전 압축 후 이어서 진행할 때 사용하는 쿼리
+    continue_query = f"""컨텍스트 한도에 가까워져 지금까지의 대화를 압축했습니다. 아래 원래 요청의 남은 작업을 이어서 완료하세요.
+이미 `mcp__slack__answer`나 `mcp__slack__upload_file`로 보낸 내용은 다시 보내지 마세요.
+
+원래 요청:
+{user_query}"""
+
+    budget.start(system_prompt, enhanced_query)
+    if resume_session:
+        budget.used += resume_session.get("estimated_tokens", 0)
+    current_query = enhanced_query
+
+    # 긴 작업 동안 Slack에 진행 상황 표시 (플레이스홀더 메시지를 chat.update로 갱신)
+    progress = SlackProgressStreamer(
+        get_slack_client(),
+        channel_id=channel_id,
+        message_ts=message_data.get("message_ts"),
+        thread_ts=message_data.get("thread_ts"),
+        channel_type=(slack_data or {}).get("channel", {}).get("channel_type", ""),
+        user_text=user_query,
+    )
+
+    # 컨텍스트 한도 접근/초과 시 /compact 후 재시도 (같은 client 유지, 최대 2회)
     max_retries = 2
 
-    async with ClaudeSDKClient(options=options) as client:
-        for attempt in range(max_retries + 1):
-            try:
-                # 첫 시도는 새 세션, 재시도는 compact된 세션 이어서
-                if session_id:
-                    await client.query(enhanced_query, session_id)
-                else:
-                    await client.query(enhanced_query)
-
-                async for message in client.receive_response():
-                    if hasattr(message, "subtype") and message.subtype == "init":
-                        session_id = message.data.get("session_id")
-                        logging.info(f"[OPERATOR_AGENT] Session ID: {session_id}")
-
-                    pprint(message)
-
-                    if type(message) is ResultMessage:
-                        if "API Error" in message.result and "413" in message.result:
-                            raise Exception(
-                                f"Context overflow in ResultMessage: {message.result}"
+    with track_usage("operator", channel_id=channel_id, user_id=message_data.get("user_id"), model=options.model) as usage:
+        async with ClaudeSDKClient(options=options) as client, progress:
+            for attempt in range(max_retries + 1):
+                try:
+                    # 첫 시도는 새 세션, 재시도는 compact된 세션 이어서
+                    if session_id:
+                        await client.query(current_query, session_id)
+                    else:
+                        await client.query(current_query)
+
+                    compact_requested = False
+                    async for message in client.receive_response():
+                        if hasattr(message, "subtype") and message.subtype == "init":
+                            session_id = message.data.get("session_id")
+                            logging.info(f"[OPERATOR_AGENT] Session ID: {session_id}")
+
+                        pprint(message)
+                        progress.on_message(message)
+                        if isinstance(getattr(message, "content", None), list):
+                            got_response = True
+
+                        # 누적 컨텍스트 추정치가 임계치에 도달하면 413 전에 중단하고 압축
+                        budget.add(message)
+                        if (
+                            not compact_requested
+                            and session_id
+                            and attempt < max_retries
+                            and budget.should_compact()
+                        ):
+                            compact_requested = True
+                            logging.warning(
+                                f"[OPERATOR_AGENT] Context estimate {budget.used}/{budget.context_window} tokens reached threshold, interrupting to compact..."
                             )
+                            await client.interrupt()
+
+                        if type(message) is ResultMessage:
+                            usage.record(message)
+                            if compact_requested:
+                                continue
+
+                            result_text = message.result or ""
+                            if resume_session and message.is_error and not got_response:
+                                raise Exception(f"Session resume failed: {result_text}")
+                            if "API Error" in result_text and "413" in result_text:
+                                raise Exception(
+                                    f"Context overflow in ResultMessage: {result_text}"
+                                )
 
-                        final_message = message.result
-                        logging.info(
-                            f"[OPERATOR_AGENT] Final message received: {final_message[:100]}..."
-                        )
-
-                # 최종 메시지가 설정되지 않았을 경우 처리
-                if not final_message:
-                    final_message = "Unable to generate a response."
-                    logging.warning(
-                        f"[OPERATOR_AGENT] No final message received, using default"
-                    )
-
-                # 성공하면 루프 종료
-                break
+                            final_message = result_text
+                            logging.info(
+                                f"[OPERATOR_AGENT] Final message received: {final_message[:100]}..."
+                            )
 
-            except Exception as e:
-                error_str = str(e)
-                error_msg = error_str.lower()
+                    if compact_requested:
+                        record_compaction(
+                            "operator", "proactive", budget.used, budget.context_window,
+                            channel_id=channel_id, session_id=session_id,
+                        )
+                        await compact_session(client, session_id, usage)
+                        budget.reset_after_compaction()
+                        current_query = continue_query
+                        continue
+
+                    # 최종 메시지가 설정되지 않았을 경우 처리
+                    if not final_message:
+                        final_message = "Unable to generate a response."
+                        logging.warning(
+                            f"[OPERATOR_AGENT] No final message received, using default"
+                        )
 
-                is_context_error = any(
-                    [
-                        "prompt is too long" in error_msg,
-                        "context overflow" in error_msg,
-                        "413" in error_msg,
-                    ]
-                )
+                    # 성공하면 루프 종료
+                    completed = True
+                    break
 
-                if is_context_error and attempt < max_retries:
-                    logging.warning(
-                        f"[OPERATOR_AGENT] Context overflow detected (attempt {attempt + 1}/{max_retries}), executing /compact..."
+                except Exception as e:
+                    error_str = str(e)
+                    error_msg = error_str.lower()
+
+                    # 재개한 세션이 응답 없이 실패하면 호출자가 새 세션으로 다시 실행
+                    if resume_session and not got_response:
+                        logging.warning(f"[OPERATOR_AGENT] Failed to resume session {resume_session['session_id']}: {e}")
+                        raise SessionResumeError(error_str) from e
+
+                    is_context_error = any(
+                        [
+                            "prompt is too long" in error_msg,
+                            "context overflow" in error_msg,
+                            "413" in error_msg,
+                        ]
                     )
 
-                    # 같은 client로 /compact 실행 (session_id 전달)
-                    await client.query("/compact", session_id)
-                    async for msg in client.receive_response():
-                        if isinstance(msg, ResultMessage):
-                            logging.info(f"[OPERATOR_AGENT] /compact executed successfully")
-                            break
-
-                    # 같은 client, 원래 query로 재시도
-                    continue
-                else:
-                    # 재시도 횟수 초과 또는 다른 에러
-                    logging.error(f"[OPERATOR_AGENT] Error occurred: {e}")
-                    if is_context_error:
-                        final_message = "The context is too large to process. Please start a new conversation."
-                    elif "maximum buffer size" in error_msg:
-                        final_message = "The response data is too large to process. Please request a smaller scope."
-                    elif not final_message:
-                        final_message = "An error occurred while processing the task."
-
-                    # 디버그 모드일 때만 에러 메시지를 Slack으로 전송
-                    if settings.DEBUG_SLACK_MESSAGES_ENABLED:
-                        try:
-                            slack_client = get_slack_client()
-                            channel_id = message_data.get("channel_id")
-                            thread_ts = message_data.get("thread_ts") or message_data.get("ts")
-
-                            if channel_id:
-                                await slack_client.chat_postMessage(
-                                    channel=channel_id,
-                                    text=f"⚠️ {final_message}",
-                                    thread_ts=thread_ts
-                                )
-                                logging.info(f"[OPERATOR_AGENT] Error message sent to Slack: {final_message}")
-                        except Exception as slack_error:
-                            logging.error(f"[OPERATOR_AGENT] Failed to send error to Slack: {slack_error}")
+                    if is_context_error and attempt < max_retries:
+                        logging.warning(
+                            f"[OPERATOR_AGENT] Context overflow detected (attempt {attempt + 1}/{max_retries}), executing /compact..."
+                        )
+                        record_compaction(
+                            "operator", "overflow", budget.used, budget.context_window,
+                            channel_id=channel_id, session_id=session_id,
+                        )
 
-                    break
+                        # 같은 client로 /compact 실행 (session_id 전달)
+                        await compact_session(client, session_id, usage)
+                        budget.reset_after_compaction()
+
+                        # 같은 client, 원래 query로 재시도
+                        continue
+                    else:
+                        # 재시도 횟수 초과 또는 다른 에러
+                        logging.error(f"[OPERATOR_AGENT] Error occurred: {e}")
+                        if is_context_error:
+                            final_message = "The context is too large to process. Please start a new conversation."
+                        elif "maximum buffer size" in error_msg:
+                            final_message = "The response data is too large to process. Please request a smaller scope."
+                        elif not final_message:
+                            final_message = "An error occurred while processing the task."
+
+                        # 디버그 모드일 때만 에러 메시지를 Slack으로 전송
+                        if settings.DEBUG_SLACK_MESSAGES_ENABLED:
+                            try:
+                                slack_client = get_slack_client()
+                                thread_ts = message_data.get("thread_ts") or message_data.get("ts")
+
+                                if channel_id:
+                                    await slack_client.chat_postMessage(
+                                        channel=channel_id,
+                                        text=f"⚠️ {final_message}",
+                                        thread_ts=thread_ts
+                                    )
+                                    logging.info(f"[OPERATOR_AGENT] Error message sent to Slack: {final_message}")
+                            except Exception as slack_error:
+                                logging.error(f"[OPERATOR_AGENT] Failed to send error to Slack: {slack_error}")
+
+                        break
+
+    # 같은 스레드의 후속 메시지가 이 세션을 이어서 쓸 수 있도록 저장
+    if completed:
+        save_session(channel_id, reply_thread_ts, session_id, budget.used)
 
     # Slack에 메시지 전송 (에이전트 레벨로 올림)
 
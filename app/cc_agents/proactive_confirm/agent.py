@@ -14,11 +14,13 @@ from claude_agent_sdk import (
     ResultMessage,
 )
 
+from app.cc_utils import pending_index
 from app.cc_utils.confirm_db import (
-    get_channel_pending_confirms,
-    update_confirm_response,
+    get_channel_pending_confirms_async,
+    update_confirm_response_async,
 )
 from app.config.settings import get_settings
+from app.cc_utils.usage_tracker import track_usage
 
 
 def create_system_prompt() -> str:
@@ -77,8 +79,11 @@ async def call_proactive_confirm(
     """
     settings = get_settings()
 
-    # 1. pending confirm 조회 (thread_ts로 격리)
-    pending_confirms = get_channel_pending_confirms(channel_id, user_id, thread_ts)
+    # 1. pending confirm 조회 (thread_ts로 격리, 없으면 메모리 인덱스에서 바로 종료)
+    if not pending_index.pending_confirm_ids(channel_id, user_id, thread_ts):
+        return False, None
+
+    pending_confirms = await get_channel_pending_confirms_async(channel_id, user_id, thread_ts)
 
     if not pending_confirms:
         logging.info(f"[PROACTIVE_CONFIRM] No pending confirms for user {user_id} in channel {channel_id}")
@@ -112,11 +117,12 @@ async def call_proactive_confirm(
     )
 
     try:
-        async with ClaudeSDKClient(options=options) as client:
-            # DB에서 원래 사용자 요청 텍스트 추출
-            original_user_text = confirm["original_request_text"]
+        with track_usage("proactive_confirm", channel_id=channel_id, user_id=user_id, model=options.model) as usage:
+            async with ClaudeSDKClient(options=options) as client:
+                # DB에서 원래 사용자 요청 텍스트 추출
+                original_user_text = confirm["original_request_text"]
 
-            query = f"""다음 정보를 확인하세요:
+                query = f"""다음 정보를 확인하세요:
 
 **원래 사용자 요청:** {original_user_text}
 **봇의 확인 메시지:** {confirm['confirm_message']}
@@ -128,45 +134,46 @@ async def call_proactive_confirm(
 거부이면 "false"를 반환하세요.
 """
 
-            await client.query(query)
-
-            async for message in client.receive_response():
-                if isinstance(message, ResultMessage):
-                    result_text = message.result.strip().lower()
-                    logging.info(f"[PROACTIVE_CONFIRM] Response: {result_text}")
-
-                    approved = "true" in result_text
-
-                    if approved:
-                        # 승인: DB 업데이트 + original_message 복원
-                        update_confirm_response(
-                            confirm_id=confirm_id,
-                            user_id=user_id,
-                            approved=True,
-                            response=user_text
-                        )
-
-                        # DB에서 복원한 original_message (현재 컨텍스트는 cc_slack_handlers에서 처리)
-                        reconstructed_message = {
-                            "user_text": confirm["original_request_text"],
-                            "user_id": confirm["user_id"],
-                            "user_name": confirm["user_name"],
-                            "channel_id": confirm["channel_id"]
-                            # message_ts, thread_ts는 cc_slack_handlers에서 현재 컨텍스트로 설정됨
-                        }
-
-                        logging.info(f"[PROACTIVE_CONFIRM] Approved! Returning reconstructed original_message")
-                        return True, reconstructed_message
-                    else:
-                        # 거부: DB 업데이트하여 rejected 상태로 변경
-                        update_confirm_response(
-                            confirm_id=confirm_id,
-                            user_id=user_id,
-                            approved=False,
-                            response=user_text
-                        )
-                        logging.info(f"[PROACTIVE_CONFIRM] Rejected, marked as rejected in DB")
-                        return False, None
+                await client.query(query)
+
+                async for message in client.receive_response():
+                    if isinstance(message, ResultMessage):
+                        usage.record(message)
+                        result_text = message.result.strip().lower()
+                        logging.info(f"[PROACTIVE_CONFIRM] Response: {result_text}")
+
+                        approved = "true" in result_text
+
+                        if approved:
+                            # 승인: DB 업데이트 + original_message 복원
+                            await update_confirm_response_async(
+                                confirm_id=confirm_id,
+                                user_id=user_id,
+                                approved=True,
+                                response=user_text
+                            )
+
+                            # DB에서 복원한 original_message (현재 컨텍스트는 cc_slack_handlers에서 처리)
+                            reconstructed_message = {
+                                "user_text": confirm["original_request_text"],
+                                "user_id": confirm["user_id"],
+                                "user_name": confirm["user_name"],
+                                "channel_id": confirm["channel_id"]
+                                # message_ts, thread_ts는 cc_slack_handlers에서 현재 컨텍스트로 설정됨
+                            }
+
+                            logging.info(f"[PROACTIVE_CONFIRM] Approved! Returning reconstructed original_message")
+                            return True, reconstructed_message
+                        else:
+                            # 거부: DB 업데이트하여 rejected 상태로 변경
+                            await update_confirm_response_async(
+                                confirm_id=confirm_id,
+                                user_id=user_id,
+                                approved=False,
+                                response=user_text
+                            )
+                            logging.info(f"[PROACTIVE_CONFIRM] Rejected, marked as rejected in DB")
+                            return False, None
 
     except Exception as e:
         logging.error(f"[PROACTIVE_CONFIRM] Error: {e}")
@@ -3,8 +3,10 @@ Proactive Dynamic Suggester Agent
 메모리를 기반으로 동적으로 제안하는 에이전트
 """
 
+import asyncio
 import logging
 import os
+from typing import List, Optional
 
 from claude_agent_sdk import (
     ClaudeAgentOptions,
@@ -13,16 +15,51 @@ from claude_agent_sdk import (
 )
 
 from app.cc_tools.confirm.confirm_tools import create_confirm_mcp_server
+from app.cc_tools.memory_catalog import create_memory_catalog_mcp_server
 from app.cc_tools.slack.slack_tools import create_slack_mcp_server
 from app.cc_agents.state_prompt import create_state_prompt
 from app.config.settings import get_settings
+from app.cc_utils import memory_store
+from app.cc_utils.memory_index import INDEX_FILE_NAME
+from app.cc_utils.usage_tracker import apply_budget_policy, track_usage
 
 
-def create_system_prompt(memories_path: str) -> str:
+# 메모리 변경 피드에서 이 에이전트의 커서 이름
+CURSOR_NAME = "dynamic_suggester"
+
+# 에이전트 자신이 기록하는 개입 파일 (변경으로 보지 않음)
+INTERVENTIONS_DIR = "misc/interventions/"
+
+
+def get_changed_files(cursor: int) -> Optional[List[str]]:
+    """마지막 실행 이후 변경된 메모리 파일 목록을 반환합니다.
+
+    Args:
+        cursor: 마지막으로 처리한 변경 피드 시퀀스
+
+    Returns:
+        Optional[List[str]]: 변경된 파일 경로 (삭제 제외), 저널이 잘려 알 수 없으면 None
+    """
+    changes = memory_store.changes_since(cursor)
+    if changes is None:
+        return None
+
+    changed = []
+    for change in changes:
+        path = change["path"]
+        if change["change_type"] == "deleted" or path == INDEX_FILE_NAME or path.startswith(INTERVENTIONS_DIR):
+            continue
+        if path not in changed:
+            changed.append(path)
+    return changed
+
+
+def create_system_prompt(memories_path: str, changed_files: Optional[List[str]] = None) -> str:
     """7가지 개입 패턴 감지 에이전트 프롬프트
 
     Args:
         memories_path: memories 폴더 절대 경로
+        changed_files: 마지막 실행 이후 변경된 메모리 파일 (None이면 index.md로 직접 확인)
 
     Returns:
         str: 실행 워크플로우와 도구 사용법
@@ -32,6 +69,30 @@ def create_system_prompt(memories_path: str) -> str:
 
     state_prompt = create_state_prompt()
 
+    # 변경 파일 목록을 알고 있으면 index.md 스캔 없이 해당 파일만 분석
+    if changed_files is not None:
+        changed_lines = "\n".join(f"   - {memories_path}/{path}" for path in changed_files)
+        quick_scan = f"""1. 마지막 실행 이후 변경된 메모리 파일 (변경 감지 결과, index.md 확인 불필요):
+{changed_lines}
+
+2. 위 파일만 분석 대상으로 삼고 Step 2로
+   → Step 3의 패턴 감지도 위 파일에서 출발 (관련 파일은 필요할 때만 추가로 열기)"""
+    else:
+        quick_scan = f"""1. view {memories_path}/index.md
+   → 최근 15분 내 업데이트 확인
+   
+2. 업데이트 없으면:
+   → 종료 ("false - 최근 업데이트 없음")
+   
+3. 업데이트 있으면:
+   → 파일 목록 저장, Step 2로"""
+
+    # 체크리스트의 Step 1 항목도 Quick Scan 방식에 맞춤
+    if changed_files is not None:
+        step1_check = "□ Step 1 완료 (변경 파일 목록 확인)"
+    else:
+        step1_check = "□ Step 1 완료 (index.md 스캔)"
+
     system_prompt = f"""You are {bot_name}, analyzing Slack memories to proactively provide useful suggestions to colleagues.
 CRITICAL: Respond in the same language as the target user's memory file.
 
@@ -51,14 +112,7 @@ CRITICAL: Respond in the same language as the target user's memory file.
 <workflow>
 ## Step 1: Quick Scan
 ```
-1. view {memories_path}/index.md
-   → 최근 15분 내 업데이트 확인
-   
-2. 업데이트 없으면:
-   → 종료 ("false - 최근 업데이트 없음")
-   
-3. 업데이트 있으면:
-   → 파일 목록 저장, Step 2로
+{quick_scan}
 ```
 
 ## Step 2: 필수 정보 수집 ⚠️
@@ -66,24 +120,17 @@ CRITICAL: Respond in the same language as the target user's memory file.
 **이 단계를 건너뛰면 절대 안 됩니다!**
 
 ```
-1. view {memories_path}/channels/
-   → 모든 채널 관련 파일 스캔
-   → 각 파일의 YAML frontmatter에서 추출:
-     - channel_id (예: C123, D456, G789)
-     - channel_type (dm, channel, group)
-     - user_id (DM인 경우)
-     - user_name_kr / user_name_en
-   → 매핑 생성:
+1. mcp__memory_catalog__get_memory_id_maps 호출 (파일을 직접 열지 말 것)
+   → 모든 channels/ users/ 파일의 YAML frontmatter를 미리 색인한 카탈로그에서 반환:
+   → channels 매핑:
      {{"C123": {{"name": "마케팅팀", "type": "channel"}},
        "D456": {{"name": "전지호", "user_id": "U789", "type": "dm"}}, ...}}
+   → users 매핑:
+     {{"U789": {{"name_kr": "전지호", "name_en": "Jiho"}}, ...}}
 
-2. view {memories_path}/users/
-   → 모든 유저 파일 스캔
-   → 각 파일의 YAML frontmatter에서 추출:
-     - user_id (예: U789)
-     - user_name_kr / user_name_en
-   → 매핑 생성:
-     {{"U789": "전지호", "U101": "이영희", ...}}
+2. 특정 조건의 메모리가 필요하면 mcp__memory_catalog__query_memory_catalog 사용
+   → 예: category="projects", updated_since="2025-11-03T09:00:00"
+   → 예: name="김철수" (이름으로 user_id / channel_id 찾기)
 
 💡 이 매핑은 Step 5에서 ID 확인할 때 필수!
 💡 DM(channel_type: dm)은 우선순위가 높습니다!
@@ -270,8 +317,8 @@ status: sent
 **메시지 발송 전 모두 확인:**
 
 ```
-□ Step 1 완료 (index.md 스캔)
-□ Step 2 완료 (channels/ users/ YAML 파싱하여 매핑 수집)
+{step1_check}
+□ Step 2 완료 (memory_catalog로 channels/users 매핑 수집)
 □ channel_id 확인 (C/D/G로 시작, Step 2 매핑에 있음)
 □ channel_type 확인 (dm 우선순위 높음)
 □ user_id 확인 (U로 시작, Step 2 매핑에 있음)
@@ -387,14 +434,10 @@ view {memories_path}/index.md
 → projects/신제품런칭.md 업데이트 발견 (7일 전)
 
 Step 2:
-view {memories_path}/channels/
-→ 각 파일의 YAML 파싱
-→ {{"D789": {{"name": "김철수", "user_id": "U789", "type": "dm"}},
-    "C123": {{"name": "개발팀", "type": "channel"}}}}
-
-view {memories_path}/users/
-→ 각 파일의 YAML 파싱
-→ {{"U789": "김철수", "U101": "이영희"}}
+mcp__memory_catalog__get_memory_id_maps()
+→ channels: {{"D789": {{"name": "김철수", "user_id": "U789", "type": "dm"}},
+              "C123": {{"name": "개발팀", "type": "channel"}}}}
+→ users: {{"U789": {{"name_kr": "김철수"}}, "U101": {{"name_kr": "이영희"}}}}
 
 Step 3:
 view {memories_path}/projects/신제품런칭.md
@@ -500,7 +543,31 @@ async def call_dynamic_suggester() -> str:
         logging.info("[DYNAMIC_SUGGESTER] Memories folder not found, skipping")
         return "메모리 폴더가 없습니다"
 
-    system_prompt = create_system_prompt(memories_path)
+    # 변경 피드로 마지막 실행 이후 변경 여부 확인 (변경 없으면 LLM 호출 없이 종료)
+    generation = await asyncio.to_thread(memory_store.scan_changes)
+    cursor = await asyncio.to_thread(memory_store.get_cursor, CURSOR_NAME)
+    if cursor is None:
+        # 첫 실행: 현재 시점부터 변경을 추적
+        await asyncio.to_thread(memory_store.set_cursor, CURSOR_NAME, generation)
+        logging.info("[DYNAMIC_SUGGESTER] Change cursor initialized, skipping first run")
+        return "false - 최근 업데이트 없음"
+
+    changed_files = await asyncio.to_thread(get_changed_files, cursor)
+    if changed_files is not None and not changed_files:
+        await asyncio.to_thread(memory_store.set_cursor, CURSOR_NAME, generation)
+        logging.info("[DYNAMIC_SUGGESTER] No memory changes since last run, skipping")
+        return "false - 최근 업데이트 없음"
+
+    logging.info(
+        f"[DYNAMIC_SUGGESTER] Changed files: {changed_files if changed_files is not None else 'unknown (journal truncated)'}"
+    )
+    system_prompt = create_system_prompt(memories_path, changed_files)
+
+    # 예산 상한 초과 시 다운그레이드하거나 다음 실행으로 연기
+    model = await apply_budget_policy("dynamic_suggester", settings.MODEL_FOR_MODERATE)
+    if model is None:
+        # 커서를 옮기지 않아 다음 실행에서 같은 변경을 다시 처리
+        return "예산 초과로 제안을 연기했습니다"
 
     options = ClaudeAgentOptions(
         # MCP 서버 설정
@@ -510,10 +577,11 @@ async def call_dynamic_suggester() -> str:
                 "args": ["-y", "@mcpcentral/mcp-time"]
             },
             "confirm": create_confirm_mcp_server(),
+            "memory_catalog": create_memory_catalog_mcp_server(),
             "slack": create_slack_mcp_server()
         },
         system_prompt=system_prompt,
-        model=settings.MODEL_FOR_MODERATE,
+        model=model,
         permission_mode="bypassPermissions",
         allowed_tools=["*"],
         disallowed_tools=[
@@ -545,29 +613,37 @@ async def call_dynamic_suggester() -> str:
     )
 
     try:
-        async with ClaudeSDKClient(options=options) as client:
-            query = f"""
-최근 15분간 업데이트된 메모리를 분석하여, 동료들에게 유용한 정보를 제안하세요.
+        with track_usage("dynamic_suggester", model=options.model) as usage:
+            async with ClaudeSDKClient(options=options) as client:
+                query = f"""
+{"마지막 실행 이후 변경된 메모리" if changed_files is not None else "최근 15분간 업데이트된 메모리"}를 분석하여, 동료들에게 유용한 정보를 제안하세요.
 
 제안할 경우: 누구에게 제안할지 결정하여 confirm 메시지 전송 후 그 이유를 간단히 정리하세요.
 제안하지 않을 경우: 그 이유를 간단히 정리하세요.
 
 '어제', '내일', '다음주', '작년', '이번 년도' 같은 상대적 표현은 반드시 확인한 현재 시간 기준으로 정확한 날짜로 변환하여 검색/필터링해야 합니다."""
             
-            await client.query(query)
+                await client.query(query)
 
-            result_message = ""
-            async for message in client.receive_response():
+                result_message = ""
+                succeeded = False
+                async for message in client.receive_response():
                
-                from devtools import pprint
-                pprint(message)
+                    from devtools import pprint
+                    pprint(message)
+
+                    if isinstance(message, ResultMessage):
+                        usage.record(message)
+                        result_message = message.result
+                        succeeded = not message.is_error
+                        logging.info(f"[DYNAMIC_SUGGESTER] Result: {result_message[:100]}...")
+                        break
 
-                if isinstance(message, ResultMessage):
-                    result_message = message.result
-                    logging.info(f"[DYNAMIC_SUGGESTER] Result: {result_message[:100]}...")
-                    break
+                # 처리 완료한 변경까지 커서 이동 (실행 중 기록된 개입 파일은 다음 실행에서 제외됨)
+                if succeeded:
+                    await asyncio.to_thread(memory_store.set_cursor, CURSOR_NAME, generation)
 
-            return result_message if result_message else "제안할 내용이 없습니다"
+                return result_message if result_message else "제안할 내용이 없습니다"
 
     except Exception as e:
         logging.error(f"[DYNAMIC_SUGGESTER] Error: {e}")
@@ -16,6 +16,7 @@ from claude_agent_sdk import (
 
 from app.cc_tools.confirm import create_confirm_mcp_server
 from app.config.settings import get_settings
+from app.cc_utils.usage_tracker import track_usage
 
 
 def create_system_prompt(state_prompt: str) -> str:
@@ -147,21 +148,23 @@ async def call_proactive_suggester(
     )
 
     try:
-        async with ClaudeSDKClient(options=options) as client:
-            query = f"""다음 메시지가 도움을 제안할 만한지 판단하세요.
+        with track_usage("proactive_suggester", channel_id=message_data.get("channel_id"), user_id=message_data.get("user_id"), model=options.model) as usage:
+            async with ClaudeSDKClient(options=options) as client:
+                query = f"""다음 메시지가 도움을 제안할 만한지 판단하세요.
 
 메시지: {user_text}
 
 제안할 경우: confirm 메시지 전송 후 "true"를 반환하세요.
 제안하지 않을 경우: "false"를 반환하세요."""
 
-            await client.query(query)
+                await client.query(query)
 
-            async for message in client.receive_response():
-                if isinstance(message, ResultMessage):
-                    result_text = message.result.strip().lower()
-                    logging.info(f"[PROACTIVE_SUGGESTER] Response: {result_text}")
-                    return "true" in result_text
+                async for message in client.receive_response():
+                    if isinstance(message, ResultMessage):
+                        usage.record(message)
+                        result_text = message.result.strip().lower()
+                        logging.info(f"[PROACTIVE_SUGGESTER] Response: {result_text}")
+                        return "true" in result_text
 
     except Exception as e:
         logging.error(f"[PROACTIVE_SUGGESTER] Error: {e}")
@@ -0,0 +1,7 @@
+"""
+요청 라우팅 에이전트
+"""
+
+from app.cc_agents.request_router.agent import call_request_router, classify_locally
+
+__all__ = ["call_request_router", "classify_locally"]
@@ -0,0 +1,168 @@
+"""
+요청 라우팅 에이전트 (Request Router Agent)
+
+이 모듈은 요청을 simple(간단한 대화), complex(작업), ignore(응답 불필요) 중 하나로 분류합니다.
+로컬 규칙으로 판단할 수 있으면 LLM을 호출하지 않고, 애매한 경우에만 도구 없는 저렴한 호출 1회로 판단합니다.
+"""
+
+import logging
+import os
+import re
+from typing import Optional
+
+from claude_agent_sdk import (
+    ClaudeAgentOptions,
+    ClaudeSDKClient,
+    ResultMessage,
+)
+
+from app.config.settings import get_settings
+from app.cc_utils.usage_tracker import track_usage
+
+ROUTE_SIMPLE = "simple"
+ROUTE_COMPLEX = "complex"
+ROUTE_IGNORE = "ignore"
+
+# 작업 요청임이 분명한 표현 (있으면 바로 complex)
+COMPLEX_KEYWORDS = [
+    "작성", "만들어", "분석", "정리해", "요약", "검색", "찾아", "조사", "보내", "전달해",
+    "예약", "일정", "등록", "번역", "보고서", "문서", "엑셀", "ppt", "pdf", "파일",
+    "업로드", "다운로드", "스케줄", "리마인드", "알려줘", "확인해", "티켓", "위키",
+    "jira", "confluence", "github", "gitlab", "메일", "이메일",
+    "create", "write", "analyze", "summarize", "search", "find", "send", "schedule",
+    "remind", "translate", "report", "document", "upload", "download", "check",
+]
+
+# 인사/감사 등 간단한 대화 표현 (짧은 메시지에서만 simple)
+SIMPLE_PATTERNS = [
+    r"^(안녕|하이|헬로|좋은 ?(아침|하루|저녁))",
+    r"^(고마워|고맙|감사|땡큐|수고)",
+    r"^(hi|hello|hey|good (morning|afternoon|evening)|thanks|thank you|thx)\b",
+]
+
+# 간단한 대화로 볼 최대 글자 수
+SIMPLE_MAX_LENGTH = 30
+
+# 길이만으로 작업 요청으로 볼 글자 수
+COMPLEX_MIN_LENGTH = 200
+
+
+def classify_locally(user_text: str, message_data: Optional[dict] = None) -> Optional[str]:
+    """LLM 호출 없이 판단 가능한 요청을 분류합니다.
+
+    Args:
+        user_text: 사용자 메시지
+        message_data: 메시지 정보 (첨부 파일 확인용)
+
+    Returns:
+        Optional[str]: "simple", "complex", "ignore" 중 하나, 판단할 수 없으면 None
+    """
+    has_files = bool((message_data or {}).get("files"))
+
+    # 멘션 표기 "(@U...)" 제거 후 판단
+    text = re.sub(r"\(@[A-Z0-9]+\)", "", user_text or "").strip()
+    lowered = text.lower()
+
+    if not text and not has_files:
+        return ROUTE_IGNORE
+
+    if has_files or "http://" in lowered or "https://" in lowered:
+        return ROUTE_COMPLEX
+
+    if len(text) >= COMPLEX_MIN_LENGTH:
+        return ROUTE_COMPLEX
+
+    if any(keyword in lowered for keyword in COMPLEX_KEYWORDS):
+        return ROUTE_COMPLEX
+
+    if len(text) <= SIMPLE_MAX_LENGTH:
+        # 봇 이름으로 시작하는 호출은 이름을 떼고 판단
+        bot_name = (get_settings().BOT_NAME or "").lower()
+        if bot_name and lowered.startswith(bot_name):
+            lowered = lowered[len(bot_name):].lstrip(" ,.!~야아씨님")
+        if any(re.search(pattern, lowered) for pattern in SIMPLE_PATTERNS):
+            return ROUTE_SIMPLE
+
+    return None
+
+
+def create_system_prompt() -> str:
+    """요청 라우팅을 위한 system prompt 생성
+
+    Returns:
+        str: 요청 분류를 위한 system prompt
+    """
+    system_prompt = """You are a router that classifies a message sent to a virtual coworker on Slack.
+
+## Core Behavior Rules
+<important_actions>
+1. simple: small talk, greetings, thanks, or a question that can be answered in one short reply without any tools or lookups.
+2. complex: anything that needs tools, lookups, files, external services, memory of past work, scheduling, writing documents, or multiple steps.
+3. ignore: the message needs no reply at all (e.g. only an acknowledgement like "ok", an emoji, or a message addressed to someone else).
+4. If unsure between simple and complex, choose complex.
+</important_actions>
+
+## Output Format
+<output_format>
+Output exactly one word: simple, complex or ignore
+</output_format>"""
+
+    return system_prompt
+
+
+async def call_request_router(user_text: str, message_data: Optional[dict] = None) -> str:
+    """
+    요청을 simple / complex / ignore 중 하나로 분류합니다.
+
+    Args:
+        user_text: 사용자 메시지
+        message_data: 메시지 정보 (channel_id, user_id, files 등)
+
+    Returns:
+        str: "simple", "complex", "ignore" 중 하나 (오류 시 "complex")
+    """
+    message_data = message_data or {}
+
+    # 1. 로컬 규칙으로 판단 가능하면 LLM 호출 생략
+    route = classify_locally(user_text, message_data)
+    if route:
+        logging.info(f"[REQUEST_ROUTER] Local route: {route}")
+        return route
+
+    # 2. 애매한 경우 저렴한 모델로 1회 판단
+    settings = get_settings()
+
+    options = ClaudeAgentOptions(
+        system_prompt=create_system_prompt(),
+        model=settings.MODEL_FOR_SIMPLE,
+        permission_mode="bypassPermissions",
+        allowed_tools=[],
+        disallowed_tools=[
+            "Bash",
+            "Read",
+            "Write",
+            "Edit",
+            "WebFetch",
+            "WebSearch",
+        ],
+        cwd=os.getcwd(),
+        max_turns=1,
+    )
+
+    try:
+        with track_usage("request_router", channel_id=message_data.get("channel_id"), user_id=message_data.get("user_id"), model=options.model) as usage:
+            async with ClaudeSDKClient(options=options) as client:
+                await client.query(f"Message: {user_text}")
+
+                async for message in client.receive_response():
+                    if isinstance(message, ResultMessage):
+                        usage.record(message)
+                        result_text = (message.result or "").strip().lower()
+                        logging.info(f"[REQUEST_ROUTER] Response: {result_text}")
+                        for route in (ROUTE_IGNORE, ROUTE_SIMPLE, ROUTE_COMPLEX):
+                            if route in result_text:
+                                return route
+    except Exception as e:
+        logging.error(f"[REQUEST_ROUTER] Error: {e}")
+
+    return ROUTE_COMPLEX
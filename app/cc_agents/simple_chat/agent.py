@@ -17,6 +17,7 @@ from claude_agent_sdk import (
 from app.cc_tools.slack.slack_tools import create_slack_mcp_server
 from app.config.settings import get_settings
 from app.cc_agents.state_prompt import create_state_prompt
+from app.cc_utils.usage_tracker import track_usage
 
 
 def create_system_prompt(state_prompt: str) -> str:
@@ -176,8 +177,9 @@ async def call_simple_chat(
     )
 
     try:
-        async with ClaudeSDKClient(options=options) as client:
-            query = f"""다음 메시지가 간단한 대화인지 복잡한 작업인지 판단하세요.
+        with track_usage("simple_chat", channel_id=message_data.get("channel_id"), user_id=message_data.get("user_id"), model=options.model) as usage:
+            async with ClaudeSDKClient(options=options) as client:
+                query = f"""다음 메시지가 간단한 대화인지 복잡한 작업인지 판단하세요.
 
 메시지: {user_text}
 
@@ -186,13 +188,14 @@ async def call_simple_chat(
 
 '어제', '내일', '다음주', '작년', '이번 년도' 같은 상대적 표현은 반드시 확인한 현재 시간 기준으로 정확한 날짜로 변환하여 검색/필터링해야 합니다."""
             
-            await client.query(query)
-
-            async for message in client.receive_response():
-                if isinstance(message, ResultMessage):
-                    result_text = message.result.strip().lower()
-                    logging.info(f"[SIMPLE_CHAT] Response: {result_text}")
-                    return "true" in result_text
+                await client.query(query)
+
+                async for message in client.receive_response():
+                    if isinstance(message, ResultMessage):
+                        usage.record(message)
+                        result_text = message.result.strip().lower()
+                        logging.info(f"[SIMPLE_CHAT] Response: {result_text}")
+                        return "true" in result_text
 
     except Exception as e:
         logging.error(f"[SIMPLE_CHAT] Error: {e}")
@@ -14,6 +14,8 @@ from claude_agent_sdk import (
     ResultMessage,
 )
 
+from app.cc_utils.usage_tracker import apply_budget_policy, track_usage
+
 
 async def save_to_memory(content: str) -> None:
     """
@@ -33,9 +35,10 @@ async def save_to_memory(content: str) -> None:
 소속 팀 동료와 관련된 사항은 반드시 저장합니다.
 """
 
-        # 메모리 큐에 작업 추가 (순차 처리됨)
+        # 메모리 큐에 작업 추가 (직접 수정할 파일 없이, 저장할 내용을 대상 파일별 작업으로 넘김)
         await enqueue_memory_job({
-            "memory_query": memory_query
+            "memory_query": memory_query,
+            "shard_key": "confluence"
         })
         logging.info(f"[CONFLUENCE_SUMMARIZER] Memory job enqueued")
     except Exception as e:
@@ -197,9 +200,14 @@ URL: {page_url}
         }
     }
 
+    # 예산 상한 초과 시 다운그레이드하거나 다음 실행으로 연기
+    model = await apply_budget_policy("confluence_summarizer", settings.MODEL_FOR_SIMPLE)
+    if model is None:
+        return None
+
     options = ClaudeAgentOptions(
         system_prompt=system_prompt,
-        model=settings.MODEL_FOR_SIMPLE,
+        model=model,
         permission_mode="bypassPermissions",
         allowed_tools=["*"],
         disallowed_tools=[
@@ -225,57 +233,60 @@ URL: {page_url}
     # Context overflow 시 /compact 후 재시도 (같은 client 유지, 최대 2회)
     max_retries = 2
 
-    async with ClaudeSDKClient(options=options) as client:
-        for attempt in range(max_retries + 1):
-            try:
-                # 첫 시도는 새 세션, 재시도는 compact된 세션 이어서
-                if session_id:
-                    await client.query(user_query, session_id)
-                else:
-                    await client.query(user_query)
-
-                async for message in client.receive_response():
-                    if hasattr(message, 'subtype') and message.subtype == 'init':
-                        session_id = message.data.get('session_id')
-                        logging.info(f"[CONFLUENCE_SUMMARIZER] Session ID: {session_id}")
-
-                    if isinstance(message, ResultMessage):
-                        if "API Error" in message.result and "413" in message.result:
-                            raise Exception(f"Context overflow in ResultMessage: {message.result}")
-
-                        result_message = message.result.strip()
-                        logging.info(f"[CONFLUENCE_SUMMARIZER] Result: {result_message[:100]}...")
-                        break
-
-                # 성공하면 루프 종료
-                break
-
-            except Exception as e:
-                error_str = str(e)
-                error_msg = error_str.lower()
-
-                is_context_error = any([
-                    "prompt is too long" in error_msg,
-                    "context overflow" in error_msg,
-                    "413" in error_msg,
-                ])
-
-                if is_context_error and attempt < max_retries:
-                    logging.warning(f"[CONFLUENCE_SUMMARIZER] Context overflow detected (attempt {attempt + 1}/{max_retries}), executing /compact...")
-
-                    # 같은 client로 /compact 실행 (session_id 전달)
-                    await client.query("/compact", session_id)
-                    async for msg in client.receive_response():
-                        if isinstance(msg, ResultMessage):
-                            logging.info(f"[CONFLUENCE_SUMMARIZER] /compact executed successfully")
+    with track_usage("confluence_summarizer", model=options.model) as usage:
+        async with ClaudeSDKClient(options=options) as client:
+            for attempt in range(max_retries + 1):
+                try:
+                    # 첫 시도는 새 세션, 재시도는 compact된 세션 이어서
+                    if session_id:
+                        await client.query(user_query, session_id)
+                    else:
+                        await client.query(user_query)
+
+                    async for message in client.receive_response():
+                        if hasattr(message, 'subtype') and message.subtype == 'init':
+                            session_id = message.data.get('session_id')
+                            logging.info(f"[CONFLUENCE_SUMMARIZER] Session ID: {session_id}")
+
+                        if isinstance(message, ResultMessage):
+                            usage.record(message)
+                            if "API Error" in message.result and "413" in message.result:
+                                raise Exception(f"Context overflow in ResultMessage: {message.result}")
+
+                            result_message = message.result.strip()
+                            logging.info(f"[CONFLUENCE_SUMMARIZER] Result: {result_message[:100]}...")
                             break
 
-                    # 같은 client, 원래 query로 재시도
-                    continue
-                else:
-                    # 재시도 횟수 초과 또는 다른 에러
-                    logging.error(f"[CONFLUENCE_SUMMARIZER] Error occurred: {e}")
-                    return None
+                    # 성공하면 루프 종료
+                    break
+
+                except Exception as e:
+                    error_str = str(e)
+                    error_msg = error_str.lower()
+
+                    is_context_error = any([
+                        "prompt is too long" in error_msg,
+                        "context overflow" in error_msg,
+                        "413" in error_msg,
+                    ])
+
+                    if is_context_error and attempt < max_retries:
+                        logging.warning(f"[CONFLUENCE_SUMMARIZER] Context overflow detected (attempt {attempt + 1}/{max_retries}), executing /compact...")
+
+                        # 같은 client로 /compact 실행 (session_id 전달)
+                        await client.query("/compact", session_id)
+                        async for msg in client.receive_response():
+                            if isinstance(msg, ResultMessage):
+                                usage.record(msg)
+                                logging.info(f"[CONFLUENCE_SUMMARIZER] /compact executed successfully")
+                                break
+
+                        # 같은 client, 원래 query로 재시도
+                        continue
+                    else:
+                        # 재시도 횟수 초과 또는 다른 에러
+                        logging.error(f"[CONFLUENCE_SUMMARIZER] Error occurred: {e}")
+                        return None
 
     # while 루프 정상 종료 후 결과 반환
     if result_message == "중요한 페이지 업데이트가 없습니다." or not result_message:
@@ -12,6 +12,7 @@ from datetime import datetime, timedelta, timezone
 
 from claude_agent_sdk import ClaudeAgentOptions, ClaudeSDKClient, ResultMessage
 from app.config.settings import get_settings
+from app.cc_utils.usage_tracker import apply_budget_policy, track_usage
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
@@ -69,9 +70,14 @@ JSON 배열로만 응답 (설명 없이):
         }
     }
 
+    # 예산 상한 초과 시 다운그레이드하거나 다음 실행으로 연기
+    model = await apply_budget_policy("confluence_fetcher", settings.MODEL_FOR_SIMPLE)
+    if model is None:
+        return []
+
     options = ClaudeAgentOptions(
         system_prompt=prompt,
-        model=settings.MODEL_FOR_SIMPLE,
+        model=model,
         permission_mode="bypassPermissions",
         allowed_tools=["*"],
         disallowed_tools=[
@@ -92,64 +98,66 @@ JSON 배열로만 응답 (설명 없이):
     )
 
     try:
-        async with ClaudeSDKClient(options=options) as client:
-            await client.query("페이지 목록을 조회하세요.")
-
-            result_message = ""
-            async for message in client.receive_response():
-                pprint(message)
-                if isinstance(message, ResultMessage):
-                    result_message = message.result.strip()
-                    logger.info(f"[CONFLUENCE_CHECKER] MCP result received: {len(result_message)} chars")
-                    break
-
-            if not result_message:
-                logger.info("[CONFLUENCE_CHECKER] No result from MCP")
-                return []
-
-            # JSON 파싱
-            import json
-
-            # ```json ``` 블록 제거
-            if "```json" in result_message:
-                result_message = result_message.split("```json")[1].split("```")[0].strip()
-            elif "```" in result_message:
-                result_message = result_message.split("```")[1].split("```")[0].strip()
-
-            pages = json.loads(result_message)
-
-            if not isinstance(pages, list):
-                logger.error(f"[CONFLUENCE_CHECKER] Invalid response format: expected list, got {type(pages)}")
-                return []
-
-            # Python에서 시간 및 봇 필터링 (Legacy와 동일)
-            filtered_pages = []
-            for page in pages:
-                version = page.get("version", {})
-                modified_date_str = version.get("createdAt")
-                author_id = version.get("authorId")
-                author_email = version.get("authorEmail")
-
-                if modified_date_str:
-                    try:
-                        # ISO 8601 형식 파싱
-                        modified_date = datetime.fromisoformat(modified_date_str.replace('Z', '+00:00'))
-
-                        # 시간 재검증 (MCP가 잘못 필터링했을 수 있음)
-                        if modified_date >= cutoff_time:
-                            # 봇 본인이 작성한 글 제외 (Legacy와 동일)
-                            if author_email and author_email == settings.BOT_EMAIL:
-                                logger.info(f"[CONFLUENCE_CHECKER] Skipping page by bot: {page.get('title')}")
-                                continue
-
-                            filtered_pages.append(page)
-                            logger.debug(f"[CONFLUENCE_CHECKER] Added page: {page.get('title')} by {author_email or author_id}")
-                    except (ValueError, TypeError) as e:
-                        logger.warning(f"[CONFLUENCE_CHECKER] Failed to parse date: {modified_date_str}, error: {e}")
-                        continue
-
-            logger.info(f"[CONFLUENCE_CHECKER] Fetched {len(filtered_pages)} pages modified in last {hours} hours (after Python filtering)")
-            return filtered_pages
+        with track_usage("confluence_fetcher", model=options.model) as usage:
+            async with ClaudeSDKClient(options=options) as client:
+                await client.query("페이지 목록을 조회하세요.")
+
+                result_message = ""
+                async for message in client.receive_response():
+                    pprint(message)
+                    if isinstance(message, ResultMessage):
+                        usage.record(message)
+                        result_message = message.result.strip()
+                        logger.info(f"[CONFLUENCE_CHECKER] MCP result received: {len(result_message)} chars")
+                        break
+
+                if not result_message:
+                    logger.info("[CONFLUENCE_CHECKER] No result from MCP")
+                    return []
+
+                # JSON 파싱
+                import json
+
+                # ```json ``` 블록 제거
+                if "```json" in result_message:
+                    result_message = result_message.split("```json")[1].split("```")[0].strip()
+                elif "```" in result_message:
+                    result_message = result_message.split("```")[1].split("```")[0].strip()
+
+                pages = json.loads(result_message)
+
+                if not isinstance(pages, list):
+                    logger.error(f"[CONFLUENCE_CHECKER] Invalid response format: expected list, got {type(pages)}")
+                    return []
+
+                # Python에서 시간 및 봇 필터링 (Legacy와 동일)
+                filtered_pages = []
+                for page in pages:
+                    version = page.get("version", {})
+                    modified_date_str = version.get("createdAt")
+                    author_id = version.get("authorId")
+                    author_email = version.get("authorEmail")
+
+                    if modified_date_str:
+                        try:
+                            # ISO 8601 형식 파싱
+                            modified_date = datetime.fromisoformat(modified_date_str.replace('Z', '+00:00'))
+
+                            # 시간 재검증 (MCP가 잘못 필터링했을 수 있음)
+                            if modified_date >= cutoff_time:
+                                # 봇 본인이 작성한 글 제외 (Legacy와 동일)
+                                if author_email and author_email == settings.BOT_EMAIL:
+                                    logger.info(f"[CONFLUENCE_CHECKER] Skipping page by bot: {page.get('title')}")
+                                    continue
+
+                                filtered_pages.append(page)
+                                logger.debug(f"[CONFLUENCE_CHECKER] Added page: {page.get('title')} by {author_email or author_id}")
+                        except (ValueError, TypeError) as e:
+                            logger.warning(f"[CONFLUENCE_CHECKER] Failed to parse date: {modified_date_str}, error: {e}")
+                            continue
+
+                logger.info(f"[CONFLUENCE_CHECKER] Fetched {len(filtered_pages)} pages modified in last {hours} hours (after Python filtering)")
+                return filtered_pages
 
     except json.JSONDecodeError as e:
         logger.error(f"[CONFLUENCE_CHECKER] JSON parsing error: {e}")
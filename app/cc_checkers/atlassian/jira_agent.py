@@ -9,6 +9,7 @@ import os
 from typing import Any, Dict, List, Optional
 from app.cc_agents.memory_retriever.agent import call_memory_retriever
 from app.cc_tools.jira_tasks import create_jira_tasks_mcp_server
+from app.cc_utils.usage_tracker import apply_budget_policy, track_usage
 from claude_agent_sdk import (
     ClaudeAgentOptions,
     ClaudeSDKClient,
@@ -171,9 +172,14 @@ URL: {issue_url}
         "jira_tasks": create_jira_tasks_mcp_server(),
     }
 
+    # 예산 상한 초과 시 다운그레이드하거나 다음 실행으로 연기
+    model = await apply_budget_policy("jira_task_extractor", settings.MODEL_FOR_SIMPLE)
+    if model is None:
+        return None
+
     options = ClaudeAgentOptions(
         system_prompt=system_prompt,
-        model=settings.MODEL_FOR_SIMPLE,
+        model=model,
         permission_mode="bypassPermissions",
         allowed_tools=["*"],
         disallowed_tools=[
@@ -194,26 +200,28 @@ URL: {issue_url}
     )
 
     try:
-        async with ClaudeSDKClient(options=options) as client:
-            await client.query(query)
-
-            result_message = ""
-            async for message in client.receive_response():
-                if isinstance(message, ResultMessage):
-                    result_message = message.result.strip()
-                    logging.info(
-                        f"[JIRA_TASK_EXTRACTOR] Result: {result_message[:100]}..."
-                    )
-                    break
-
-            # Return None if no tasks
-            if not result_message or (
-                "no task" in result_message.lower() and "found" in result_message.lower()
-            ):
-                logging.info("[JIRA_TASK_EXTRACTOR] No tasks extracted")
-                return None
-
-            return result_message
+        with track_usage("jira_task_extractor", model=options.model) as usage:
+            async with ClaudeSDKClient(options=options) as client:
+                await client.query(query)
+
+                result_message = ""
+                async for message in client.receive_response():
+                    if isinstance(message, ResultMessage):
+                        usage.record(message)
+                        result_message = message.result.strip()
+                        logging.info(
+                            f"[JIRA_TASK_EXTRACTOR] Result: {result_message[:100]}..."
+                        )
+                        break
+
+                # Return None if no tasks
+                if not result_message or (
+                    "no task" in result_message.lower() and "found" in result_message.lower()
+                ):
+                    logging.info("[JIRA_TASK_EXTRACTOR] No tasks extracted")
+                    return None
+
+                return result_message
 
     except Exception as e:
         logging.error(f"[JIRA_TASK_EXTRACTOR] Error: {e}")
@@ -11,6 +11,7 @@ from typing import List, Dict, Any
 
 from claude_agent_sdk import ClaudeAgentOptions, ClaudeSDKClient, ResultMessage
 from app.config.settings import get_settings
+from app.cc_utils.usage_tracker import apply_budget_policy, track_usage
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
@@ -66,9 +67,14 @@ JSON 배열로만 응답 (설명 없이):
         }
     }
 
+    # 예산 상한 초과 시 다운그레이드하거나 다음 실행으로 연기
+    model = await apply_budget_policy("jira_fetcher", settings.MODEL_FOR_SIMPLE)
+    if model is None:
+        return []
+
     options = ClaudeAgentOptions(
         system_prompt=prompt,
-        model=settings.MODEL_FOR_SIMPLE,
+        model=model,
         permission_mode="bypassPermissions",
         allowed_tools=["*"],
         disallowed_tools=[
@@ -89,40 +95,42 @@ JSON 배열로만 응답 (설명 없이):
     )
 
     try:
-        async with ClaudeSDKClient(options=options) as client:
-            await client.query("mcp__atlassian__* 도구를 사용해서 할당된 Jira 티켓을 조회하고 JSON으로 반환해주세요.")
-
-            result_message = ""
-            async for message in client.receive_response():
-                pprint(message)
-                if isinstance(message, ResultMessage):
-                    result_message = message.result.strip()
-                    logger.info(f"[JIRA_CHECKER] MCP result received: {len(result_message)} chars")
-                    break
-
-            if not result_message:
-                logger.info("[JIRA_CHECKER] No result from MCP")
-                return []
-
-            # JSON 파싱
-            import json
-
-            # ```json ``` 블록 제거
-            if "```json" in result_message:
-                result_message = result_message.split("```json")[1].split("```")[0].strip()
-            elif "```" in result_message:
-                result_message = result_message.split("```")[1].split("```")[0].strip()
-
-            issues = json.loads(result_message)
-
-            if not isinstance(issues, list):
-                logger.error(f"[JIRA_CHECKER] Invalid response format: expected list, got {type(issues)}")
-                return []
-
-            logger.info(f"[JIRA_CHECKER] Fetched {len(issues)} assigned issues")
-            if len(issues) == 0:
-                logger.info(f"[JIRA_CHECKER] Raw response (empty): {result_message[:500]}")
-            return issues
+        with track_usage("jira_fetcher", model=options.model) as usage:
+            async with ClaudeSDKClient(options=options) as client:
+                await client.query("mcp__atlassian__* 도구를 사용해서 할당된 Jira 티켓을 조회하고 JSON으로 반환해주세요.")
+
+                result_message = ""
+                async for message in client.receive_response():
+                    pprint(message)
+                    if isinstance(message, ResultMessage):
+                        usage.record(message)
+                        result_message = message.result.strip()
+                        logger.info(f"[JIRA_CHECKER] MCP result received: {len(result_message)} chars")
+                        break
+
+                if not result_message:
+                    logger.info("[JIRA_CHECKER] No result from MCP")
+                    return []
+
+                # JSON 파싱
+                import json
+
+                # ```json ``` 블록 제거
+                if "```json" in result_message:
+                    result_message = result_message.split("```json")[1].split("```")[0].strip()
+                elif "```" in result_message:
+                    result_message = result_message.split("```")[1].split("```")[0].strip()
+
+                issues = json.loads(result_message)
+
+                if not isinstance(issues, list):
+                    logger.error(f"[JIRA_CHECKER] Invalid response format: expected list, got {type(issues)}")
+                    return []
+
+                logger.info(f"[JIRA_CHECKER] Fetched {len(issues)} assigned issues")
+                if len(issues) == 0:
+                    logger.info(f"[JIRA_CHECKER] Raw response (empty): {result_message[:500]}")
+                return issues
 
     except json.JSONDecodeError as e:
         logger.error(f"[JIRA_CHECKER] JSON parsing error: {e}")
@@ -164,13 +172,13 @@ async def process_issues_batch(issues: List[Dict[str, Any]]):
     # 1. DB에 이미 있는 티켓 제외
     from app.cc_checkers.atlassian.jira_agent import call_jira_task_extractor
     from app.cc_utils.jira_tasks_db import (
-        get_pending_tasks,
-        complete_task,
-        get_existing_issue_keys,
+        get_pending_tasks_async,
+        complete_tasks_async,
+        get_existing_issue_keys_async,
     )
-    from app.queueing_extended import enqueue_message
+    from app.queueing_extended import enqueue_internal_job
 
-    existing_issue_keys = get_existing_issue_keys()
+    existing_issue_keys = await get_existing_issue_keys_async()
     new_issues = [
         issue for issue in issues if issue.get("key") not in existing_issue_keys
     ]
@@ -194,12 +202,13 @@ async def process_issues_batch(issues: List[Dict[str, Any]]):
             logger.info(f"[JIRA_PROCESSOR] No tasks extracted from tickets")
 
     # 3. DB에서 pending tasks 조회 (항상 수행)
-    pending_tasks = get_pending_tasks()
+    pending_tasks = await get_pending_tasks_async()
 
     if pending_tasks:
         logger.info(f"[JIRA_PROCESSOR] Found {len(pending_tasks)} pending tasks")
 
         # 4. Slack 큐에 메시지 enqueue
+        completed_ids = []
         for task in pending_tasks:
             task_id = task["id"]
             user_id = task.get("user")
@@ -208,23 +217,24 @@ async def process_issues_batch(issues: List[Dict[str, Any]]):
 
             # user, text, channel이 모두 있는 경우에만 큐에 추가
             if user_id and text and channel_id:
-                # Slack 큐에 추가 (웹 인터페이스와 동일한 패턴)
-                await enqueue_message({
-                    "text": text,
-                    "channel": channel_id,
-                    "ts": "",
-                    "user": user_id,
-                    "thread_ts": None,
-                })
+                # 내부 작업으로 바로 operator에 전달 (Slack 메시지 감지 파이프라인 생략)
+                await enqueue_internal_job(
+                    source="jira",
+                    text=text,
+                    channel_id=channel_id,
+                    user_id=user_id,
+                )
                 logger.info(f"[JIRA_PROCESSOR] Enqueued task {task_id} to user {user_id}")
 
-                # 5. Task를 완료 처리
-                complete_task(task_id)
+                completed_ids.append(task_id)
             else:
                 logger.warning(
                     f"[JIRA_PROCESSOR] Task {task_id} missing user/text/channel, skipping"
                 )
 
+        # 5. 큐에 넣은 Task를 한 번에 완료 처리
+        await complete_tasks_async(completed_ids)
+
         logger.info(f"[JIRA_PROCESSOR] Processed {len(pending_tasks)} tasks")
     else:
         logger.info(f"[JIRA_PROCESSOR] No pending tasks to process")
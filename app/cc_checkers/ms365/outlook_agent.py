@@ -6,9 +6,10 @@
 
 import logging
 import os
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from app.cc_agents.memory_retriever.agent import call_memory_retriever
 from app.cc_tools.email_tasks import create_email_tasks_mcp_server
+from app.cc_utils.usage_tracker import apply_budget_policy, track_usage
 from claude_agent_sdk import (
     ClaudeAgentOptions,
     ClaudeSDKClient,
@@ -66,7 +67,7 @@ def create_system_prompt(state_prompt: str, bot_name: str) -> str:
 
 async def call_email_task_extractor(
     emails: List[Dict[str, Any]]
-) -> Optional[str]:
+) -> Tuple[bool, Optional[str]]:
     """
     이메일 배치를 분석하여 할 일을 추출하고 DB에 저장합니다.
 
@@ -74,10 +75,11 @@ async def call_email_task_extractor(
         emails: 이메일 리스트 (from, subject, body, receivedDateTime 포함)
 
     Returns:
-        Optional[str]: 처리 결과 요약 (할 일이 없으면 None)
+        Tuple[bool, Optional[str]]: (추출 완료 여부, 처리 결과 요약 (할 일이 없으면 None))
+            에러가 나거나 예산 초과로 연기되면 False이며, 이메일은 다음 확인 때 다시 처리해야 합니다.
     """
     if not emails:
-        return None
+        return True, None
 
     # 이메일 리스트를 텍스트로 변환
     emails_text = ""
@@ -162,9 +164,15 @@ async def call_email_task_extractor(
         "email_tasks": create_email_tasks_mcp_server()
     }
 
+    # 예산 상한 초과 시 다운그레이드하거나 다음 실행으로 연기
+    model = await apply_budget_policy("email_task_extractor", settings.MODEL_FOR_SIMPLE)
+    if model is None:
+        logging.info("[EMAIL_TASK_EXTRACTOR] Deferred by budget policy")
+        return False, None
+
     options = ClaudeAgentOptions(
         system_prompt=system_prompt,
-        model=settings.MODEL_FOR_SIMPLE,
+        model=model,
         permission_mode="bypassPermissions",
         allowed_tools=["*"],
         disallowed_tools=[
@@ -185,23 +193,32 @@ async def call_email_task_extractor(
     )
 
     try:
-        async with ClaudeSDKClient(options=options) as client:
-            await client.query(query)
-
-            result_message = ""
-            async for message in client.receive_response():
-                if isinstance(message, ResultMessage):
-                    result_message = message.result.strip()
-                    logging.info(f"[EMAIL_TASK_EXTRACTOR] Result: {result_message[:100]}...")
-                    break
-
-            # 할 일이 없으면 None 반환
-            if not result_message or ("할 일" in result_message and "없" in result_message):
-                logging.info("[EMAIL_TASK_EXTRACTOR] No tasks extracted")
-                return None
-
-            return result_message
+        with track_usage("email_task_extractor", model=options.model) as usage:
+            async with ClaudeSDKClient(options=options) as client:
+                await client.query(query)
+
+                result_message = None
+                async for message in client.receive_response():
+                    if isinstance(message, ResultMessage):
+                        usage.record(message)
+                        if message.is_error:
+                            logging.error(f"[EMAIL_TASK_EXTRACTOR] Session ended with an error: {message.result}")
+                            return False, None
+                        result_message = (message.result or "").strip()
+                        logging.info(f"[EMAIL_TASK_EXTRACTOR] Result: {result_message[:100]}...")
+                        break
+
+                if result_message is None:
+                    logging.error("[EMAIL_TASK_EXTRACTOR] Session ended without a result")
+                    return False, None
+
+                # 할 일이 없으면 None 반환
+                if not result_message or ("할 일" in result_message and "없" in result_message):
+                    logging.info("[EMAIL_TASK_EXTRACTOR] No tasks extracted")
+                    return True, None
+
+                return True, result_message
 
     except Exception as e:
         logging.error(f"[EMAIL_TASK_EXTRACTOR] Error: {e}")
-        return None
+        return False, None
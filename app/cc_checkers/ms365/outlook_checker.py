@@ -16,6 +16,8 @@ from typing import List, Dict, Any
 from claude_agent_sdk import ClaudeAgentOptions, ClaudeSDKClient, ResultMessage
 
 from app.config.settings import get_settings
+from app.cc_utils.usage_tracker import apply_budget_policy, track_usage
+from app.cc_utils.email_ledger_db import get_fetch_window_start
 
 settings = get_settings()
 
@@ -95,9 +97,14 @@ Lokka MCP (Microsoft 365 MCP)를 사용하여 읽지 않은 이메일 목록을
 **주의:** 읽지 않은 이메일이 없으면 빈 배열 [] 반환"""
 
     try:
+        # 예산 상한 초과 시 다운그레이드하거나 다음 실행으로 연기
+        model = await apply_budget_policy("email_fetcher", settings.MODEL_FOR_SIMPLE)
+        if model is None:
+            return []
+
         options = ClaudeAgentOptions(
             system_prompt=system_prompt,
-            model=settings.MODEL_FOR_SIMPLE,
+            model=model,
             permission_mode="bypassPermissions",
             allowed_tools=["*"],
             disallowed_tools=[
@@ -117,23 +124,29 @@ Lokka MCP (Microsoft 365 MCP)를 사용하여 읽지 않은 이메일 목록을
             mcp_servers=mcp_servers,
         )
 
-        async with ClaudeSDKClient(options=options) as client:
-            await client.query("mcp__ms365__* 도구를 사용해서 받은편지함의 읽지 않은 이메일을 최신 10개까지 조회하고 JSON으로 반환해주세요.")
-
-            async for message in client.receive_response():
-                if isinstance(message, ResultMessage):
-                    result_text = message.result.strip()
-
-                    # JSON 추출 (```json ... ``` 제거)
-                    if "```json" in result_text or "```" in result_text:
-                        json_start = result_text.find("[")
-                        json_end = result_text.rfind("]") + 1
-                        if json_start != -1 and json_end > json_start:
-                            result_text = result_text[json_start:json_end]
-
-                    emails = json.loads(result_text)
-                    logging.info(f"[EMAIL_CHECKER] Fetched {len(emails)} new emails via Lokka MCP")
-                    return emails
+        with track_usage("email_fetcher", model=options.model) as usage:
+            async with ClaudeSDKClient(options=options) as client:
+                # 처리 기록(ledger) 보존 기간보다 오래된 메일은 조회하지 않음 (다시 처리되지 않도록)
+                since = get_fetch_window_start().strftime("%Y-%m-%dT%H:%M:%SZ")
+                await client.query(
+                    f"mcp__ms365__* 도구를 사용해서 받은편지함의 읽지 않은 이메일 중 {since} 이후에 받은 메일(receivedDateTime ge {since})을 최신 10개까지 조회하고 JSON으로 반환해주세요."
+                )
+
+                async for message in client.receive_response():
+                    if isinstance(message, ResultMessage):
+                        usage.record(message)
+                        result_text = message.result.strip()
+
+                        # JSON 추출 (```json ... ``` 제거)
+                        if "```json" in result_text or "```" in result_text:
+                            json_start = result_text.find("[")
+                            json_end = result_text.rfind("]") + 1
+                            if json_start != -1 and json_end > json_start:
+                                result_text = result_text[json_start:json_end]
+
+                        emails = json.loads(result_text)
+                        logging.info(f"[EMAIL_CHECKER] Fetched {len(emails)} new emails via Lokka MCP")
+                        return emails
 
         return []
 
@@ -153,13 +166,20 @@ async def process_emails_batch(emails: List[Dict[str, Any]]):
         emails: 처리할 이메일 목록
     """
     from app.cc_checkers.ms365.outlook_agent import call_email_task_extractor
-    from app.cc_utils.email_tasks_db import get_pending_tasks, complete_task
-    from app.queueing_extended import enqueue_message
+    from app.cc_utils.email_tasks_db import get_pending_tasks_async, complete_tasks_async
+    from app.cc_utils.email_ledger_db import filter_new_emails_async, record_emails_async
+    from app.queueing_extended import enqueue_internal_job
 
     if not emails:
         logging.info("[EMAIL_PROCESSOR] No emails to process")
         return
 
+    # 이미 처리한 이메일(읽음 표시 실패로 다시 조회된 메일 등)은 에이전트 호출 전에 제외
+    emails = await filter_new_emails_async(emails)
+    if not emails:
+        logging.info("[EMAIL_PROCESSOR] All fetched emails were already processed")
+        return
+
     logging.info(f"[EMAIL_PROCESSOR] Processing {len(emails)} emails...")
 
     # 로그 출력
@@ -176,10 +196,15 @@ async def process_emails_batch(emails: List[Dict[str, Any]]):
 
     # 1. 에이전트 호출하여 이메일 분석 및 할 일 추출 (DB에 저장)
     # 에이전트가 읽음 표시도 같이 처리함
-    await call_email_task_extractor(emails)
+    # 추출이 끝난 이메일만 처리 완료로 기록 (실패/예산 초과 연기 시 다음 확인 때 다시 처리)
+    extracted, _ = await call_email_task_extractor(emails)
+    if extracted:
+        await record_emails_async(emails)
+    else:
+        logging.warning(f"[EMAIL_PROCESSOR] Task extraction did not complete, {len(emails)} emails will be retried")
 
     # 2. DB에서 Pending 상태인 작업 가져오기
-    pending_tasks = get_pending_tasks()
+    pending_tasks = await get_pending_tasks_async()
 
     if not pending_tasks:
         logging.info("[EMAIL_PROCESSOR] No pending tasks found")
@@ -188,6 +213,7 @@ async def process_emails_batch(emails: List[Dict[str, Any]]):
     # 3. Slack 채널 큐에 추가
     logging.info(f"[EMAIL_PROCESSOR] Found {len(pending_tasks)} pending tasks")
 
+    completed_ids = []
     for task in pending_tasks:
         task_id = task["id"]
         user_id = task.get("user")
@@ -199,19 +225,20 @@ async def process_emails_batch(emails: List[Dict[str, Any]]):
             logging.warning(f"[EMAIL_PROCESSOR] Task {task_id} missing user/channel/text, skipping")
             continue
 
-        # Add to Slack queue (same pattern as web interface)
-        await enqueue_message({
-            "text": text,
-            "channel": channel_id,
-            "ts": "",
-            "user": user_id,
-            "thread_ts": None,
-        })
-
-        # 작업 완료 표시
-        complete_task(task_id)
+        # 내부 작업으로 바로 operator에 전달 (Slack 메시지 감지 파이프라인 생략)
+        await enqueue_internal_job(
+            source="email",
+            text=text,
+            channel_id=channel_id,
+            user_id=user_id,
+        )
+
+        completed_ids.append(task_id)
         logging.info(f"[EMAIL_PROCESSOR] Queued task {task_id} to user {user_id}")
 
+    # 큐에 넣은 작업을 한 번에 완료 표시
+    await complete_tasks_async(completed_ids)
+
 
 async def check_email_updates():
     """
@@ -1,14 +1,17 @@
+import asyncio
 import logging
 import random
 import re
 from app.queueing_extended import debounced_enqueue_message, enqueue_orchestrator_job
 from app.cc_utils.language_helper import detect_language
 from app.cc_utils.slack_helper import get_slack_context_data
+from app.cc_utils.session_store import claim_session, get_reply_thread_ts
 from app.cc_agents.bot_call_detector import call_bot_call_detector
 from app.cc_agents.bot_thread_context_detector import call_bot_thread_context_detector
 from app.cc_agents.answer_aggregator import call_answer_aggregator
 from app.cc_agents.memory_retriever import call_memory_retriever
 from app.cc_agents.simple_chat import call_simple_chat
+from app.cc_agents.request_router import call_request_router, classify_locally
 from app.cc_agents.proactive_suggester import call_proactive_suggester
 from app.cc_agents.proactive_confirm import call_proactive_confirm
 from app.config.settings import get_settings
@@ -135,6 +138,11 @@ async def _process_message_logic(message, client):
     if channel_id in IGNORED_CHANNELS:
         return
 
+    # Trusted internal job (schedule / email / jira / voice): skip the detector pipeline
+    if message.get("internal"):
+        await _process_internal_job(message, client)
+        return
+
     # Message received log
     logging.info(f"[MESSAGE_RECEIVED] channel={channel_id}, user={user_id}, text='{user_text[:50]}...', ts={message_ts}")
 
@@ -217,9 +225,8 @@ async def _process_message_logic(message, client):
         original_user_id = original_message["user_id"]
         original_user_name = original_message["user_name"]
 
-        memory_query = f"""Please gather and provide the memory needed to fulfill user {original_user_name}({original_user_id})'s request '{original_user_text}' in channel {channel_id}.
-Be sure to include **guidelines** and information (channel_id, user_id, user_name) about this channel and requesting user."""
-        
+        memory_query = build_memory_query(original_user_name, original_user_id, original_user_text, channel_id)
+
         retrieved_memory = await call_memory_retriever(
             memory_query,
             slack_data,
@@ -343,16 +350,96 @@ Be sure to include **guidelines** and information (channel_id, user_id, user_nam
             await client.chat_postMessage(**post_params)
         return
 
+    # Route the request (simple / complex / ignore) before running any heavy agent
+    route = classify_locally(user_text, message_data)
+    if route == "ignore":
+        logging.info(f"[RESPONSE_SKIPPED] Message needs no reply (user={user_id})")
+        return
+
+    # Thread follow-up: resume the operator session that answered this thread
+    # (skips memory retrieval, simple_chat and the full role selection).
+    # Small talk such as "thanks" goes to simple_chat and keeps the session for later.
+    resume_session = claim_session(channel_id, thread_ts) if route != "simple" else None
+    if resume_session:
+        logging.info(f"[SESSION_RESUME] Resuming session {resume_session['session_id']} for thread {thread_ts} (user={user_id})")
+        orchestrator_job = {
+            "query": user_text,
+            "slack_data": slack_data,
+            "message_data": message_data,
+            "retrieved_memory": "",
+            "resume_session": resume_session
+        }
+        await enqueue_orchestrator_job(orchestrator_job)
+        return
+
+    memory_query = build_memory_query(user_name, user_id, user_text, channel_id)
+
+    retrieved_memory = None
+    if route is None:
+        # Ambiguous: run the cheap router and memory retrieval concurrently
+        logging.info(f"[REQUEST_ROUTER] Routing with LLM while retrieving memory (user={user_id}, channel={channel_id})")
+        route, retrieved_memory = await asyncio.gather(
+            call_request_router(user_text, message_data),
+            call_memory_retriever(memory_query, slack_data, message_data)
+        )
+    logging.info(f"[REQUEST_ROUTER_RESULT] route={route} (user={user_id})")
+
+    if route == "ignore":
+        logging.info(f"[RESPONSE_SKIPPED] Message needs no reply (user={user_id})")
+        return
+
+    if route == "complex":
+        # Likely-complex request → start the operator right away (it retrieves memory itself if needed)
+        if not skip_ack_messages:
+            lang = detect_language(user_text)
+
+            if lang == "Korean":
+                ack_messages = [
+                    "확인했습니다. 바로 진행할게요.",
+                    "넵, 확인해보고 알려드릴게요.",
+                    "알겠습니다. 잠시만 기다려주세요.",
+                    "네, 처리해드릴게요."
+                ]
+            else:
+                ack_messages = [
+                    "Got it. I'll get started right away.",
+                    "Sure, let me look into it.",
+                    "Understood. Give me a moment.",
+                    "Okay, I'll take care of it."
+                ]
+
+            ack_params = {
+                "channel": channel_id,
+                "text": random.choice(ack_messages)
+            }
+            ack_thread_ts = get_reply_thread_ts(
+                slack_data.get("channel", {}).get("channel_type", ""), message_ts, thread_ts
+            )
+            if ack_thread_ts:
+                ack_params["thread_ts"] = ack_thread_ts
+
+            await client.chat_postMessage(**ack_params)
+
+        logging.info(f"[ORCHESTRATOR_ENQUEUE] Enqueuing orchestrator job (user={user_id}, channel={channel_id})")
+        orchestrator_job = {
+            "query": user_text,
+            "slack_data": slack_data,
+            "message_data": message_data,
+            "retrieved_memory": retrieved_memory,
+            "memory_query": memory_query
+        }
+        await enqueue_orchestrator_job(orchestrator_job)
+        logging.info(f"[ORCHESTRATOR_ENQUEUED] Orchestrator job enqueued successfully (user={user_id})")
+        return
+
     # Memory retrieval (shared by simple_chat and orchestrator)
-    logging.info(f"[MEMORY_RETRIEVER] Retrieving memory (user={user_id}, channel={channel_id})")
-    memory_query = f"""Please gather and provide the memory needed to fulfill user {user_name}({user_id})'s request '{user_text}' in channel {channel_id}.
-Be sure to include **guidelines** and information (channel_id, user_id, user_name) about this channel and requesting user."""
-    
-    retrieved_memory = await call_memory_retriever(
-        memory_query,
-        slack_data,
-        message_data
-    )
+    if retrieved_memory is None:
+        logging.info(f"[MEMORY_RETRIEVER] Retrieving memory (user={user_id}, channel={channel_id})")
+        retrieved_memory = await call_memory_retriever(
+            memory_query,
+            slack_data,
+            message_data
+        )
     logging.info(f"[MEMORY_RETRIEVER] Memory retrieved: {retrieved_memory[:100] if retrieved_memory else 'None'}...")
 
     logging.info(f"[SIMPLE_CHAT] Calling simple_chat agent (user={user_id}, channel={channel_id})")
@@ -375,6 +462,136 @@ Be sure to include **guidelines** and information (channel_id, user_id, user_nam
     await enqueue_orchestrator_job(orchestrator_job)
     logging.info(f"[ORCHESTRATOR_ENQUEUED] Orchestrator job enqueued successfully (user={user_id})")
     
+def build_memory_query(user_name: str, user_id: str, user_text: str, channel_id: str) -> str:
+    """Memory retriever query for fulfilling a user's request"""
+    return f"""Please gather and provide the memory needed to fulfill user {user_name}({user_id})'s request '{user_text}' in channel {channel_id}.
+Be sure to include **guidelines** and information (channel_id, user_id, user_name) about this channel and requesting user."""
+
+
+async def prepare_internal_context(
+    channel_id: str,
+    user_id: str,
+    user_text: str,
+    user_name: str = None,
+    retrieve_memory: bool = False,
+    message_limit: int = 0,
+) -> dict:
+    """
+    Build the context an internal job needs before it reaches the operator.
+    Also used by the scheduler to prefetch context for upcoming schedules.
+
+    Args:
+        channel_id: Channel ID
+        user_id: User ID
+        user_text: Request text
+        user_name: Known user name (otherwise taken from the channel members, if present)
+        retrieve_memory: Also run the memory retriever
+        message_limit: Recent messages to include (0 = channel info and members only)
+
+    Returns:
+        {"slack_data", "user_name", "memory_query", "retrieved_memory"} (user_name/retrieved_memory may be None)
+    """
+    slack_data = await asyncio.to_thread(get_slack_context_data, channel_id, message_limit)
+
+    if not user_name:
+        for member in slack_data.get("members", []):
+            if member.get("user_id") == user_id:
+                user_name = member.get("display_name") or member.get("real_name")
+                break
+
+    context = {
+        "slack_data": slack_data,
+        "user_name": user_name,
+        "memory_query": build_memory_query(user_name or user_id, user_id, user_text, channel_id),
+        "retrieved_memory": None,
+    }
+    if retrieve_memory:
+        context["retrieved_memory"] = await retrieve_internal_memory(context, channel_id, user_id, user_text)
+    return context
+
+
+async def retrieve_internal_memory(context: dict, channel_id: str, user_id: str, user_text: str):
+    """
+    Run the memory retriever for a context from prepare_internal_context
+    (the scheduler re-runs only this when memory changed after a prefetch)
+
+    Returns:
+        Retrieved memory
+    """
+    message_data = {
+        "user_id": user_id,
+        "user_name": context["user_name"] or user_id,
+        "user_text": user_text,
+        "channel_id": channel_id,
+        "thread_ts": None,
+        "message_ts": "",
+    }
+    return await call_memory_retriever(context["memory_query"], context["slack_data"], message_data)
+
+
+async def _process_internal_job(job, client):
+    """
+    Run an internal job from enqueue_internal_job at its precomputed route.
+
+    The text is already a complete request from a trusted producer, so no mention
+    conversion, channel history, proactive confirm, bot call detection, answer
+    aggregation or routing is needed. Only the authorization check is kept.
+    Scheduled jobs may carry a prefetched context (slack_data, retrieved memory).
+    """
+    channel_id = job.get("channel")
+    user_id = job.get("user")
+    user_text = job.get("text", "")
+    source = job.get("source")
+    route = job.get("route", "operator")
+
+    logging.info(f"[INTERNAL_JOB] source={source}, route={route}, channel={channel_id}, user={user_id}, text='{user_text[:50]}...'")
+
+    context = job.get("context")
+    if context:
+        logging.info(f"[INTERNAL_JOB] Using prefetched context ({source}, user={user_id})")
+    else:
+        # Voice is a conversation in the user's DM and needs its recent turns;
+        # other sources send self-contained requests (channel info and members only)
+        message_limit = 10 if source == "voice" else 0
+        context = await prepare_internal_context(
+            channel_id, user_id, user_text, job.get("user_name"), message_limit=message_limit
+        )
+
+    user_name = context["user_name"] or await get_user_name(user_id, client)
+    if not is_authorized_user(user_name):
+        logging.info(f"[INTERNAL_JOB] User '{user_name}'({user_id}) is not authorized, dropping {source} job")
+        return
+
+    slack_data = context["slack_data"]
+    message_data = {
+        "user_id": user_id,
+        "user_name": user_name,
+        "user_text": user_text,
+        "channel_id": channel_id,
+        "thread_ts": None,
+        "message_ts": job.get("ts", ""),
+        "source": source,
+    }
+
+    retrieved_memory = context["retrieved_memory"]
+    if route == "simple":
+        if retrieved_memory is None:
+            retrieved_memory = await call_memory_retriever(context["memory_query"], slack_data, message_data)
+        if await call_simple_chat(user_text, slack_data, message_data, retrieved_memory):
+            logging.info(f"[INTERNAL_JOB] Simple chat processed the {source} job (user={user_id})")
+            return
+
+    orchestrator_job = {
+        "query": user_text,
+        "slack_data": slack_data,
+        "message_data": message_data,
+        "retrieved_memory": retrieved_memory,
+        "memory_query": context["memory_query"]
+    }
+    await enqueue_orchestrator_job(orchestrator_job)
+    logging.info(f"[INTERNAL_JOB] Orchestrator job enqueued ({source}, user={user_id})")
+
+
 # =============================================
 # Slack Event Handler Registration
 # =============================================
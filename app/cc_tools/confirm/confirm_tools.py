@@ -12,7 +12,7 @@ from slack_sdk.web.async_client import AsyncWebClient
 from slack_sdk.errors import SlackApiError
 
 from app.config.settings import get_settings
-from app.cc_utils.confirm_db import add_confirm_request
+from app.cc_utils.confirm_db import add_confirm_request_async
 
 
 def get_slack_client() -> AsyncWebClient:
@@ -98,7 +98,7 @@ async def confirm_request_confirmation(args: Dict[str, Any]) -> Dict[str, Any]:
         final_thread_ts = thread_ts or message_ts
 
         # Save to DB (including thread_ts)
-        success = add_confirm_request(
+        success = await add_confirm_request_async(
             confirm_id=confirm_id,
             channel_id=channel_id,
             user_id=user_id,
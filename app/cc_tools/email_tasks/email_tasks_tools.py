@@ -8,7 +8,7 @@ from typing import Any, Dict
 
 from claude_agent_sdk import create_sdk_mcp_server, tool
 
-from app.cc_utils.email_tasks_db import add_task
+from app.cc_utils.email_tasks_db import add_task_async
 
 
 @tool(
@@ -87,7 +87,7 @@ async def email_tasks_add_task(args: Dict[str, Any]) -> Dict[str, Any]:
         }
 
     try:
-        task_id = add_task(
+        task_id = await add_task_async(
             email_id=email_id,
             sender=sender,
             subject=subject,
@@ -8,7 +8,7 @@ from typing import Any, Dict
 
 from claude_agent_sdk import create_sdk_mcp_server, tool
 
-from app.cc_utils.jira_tasks_db import add_task
+from app.cc_utils.jira_tasks_db import add_task_async
 
 
 @tool(
@@ -94,7 +94,7 @@ async def jira_tasks_add_task(args: Dict[str, Any]) -> Dict[str, Any]:
         }
 
     try:
-        task_id = add_task(
+        task_id = await add_task_async(
             issue_key=issue_key,
             issue_url=issue_url,
             summary=summary,
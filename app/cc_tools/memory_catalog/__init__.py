@@ -0,0 +1,7 @@
+"""
+Memory Catalog MCP Server
+"""
+
+from app.cc_tools.memory_catalog.memory_catalog_tools import create_memory_catalog_mcp_server
+
+__all__ = ["create_memory_catalog_mcp_server"]
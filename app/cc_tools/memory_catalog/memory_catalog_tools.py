@@ -0,0 +1,108 @@
+"""
+Memory Catalog Tools for Claude Code SDK
+MCP tools for looking up memory file metadata without opening the files
+"""
+
+import asyncio
+import json
+from typing import Any, Dict
+
+from claude_agent_sdk import create_sdk_mcp_server, tool
+
+from app.cc_utils.memory_catalog_db import get_id_maps, query_catalog, sync_catalog
+
+
+@tool(
+    "query_memory_catalog",
+    "Searches the frontmatter of all memory files (path, category, channel_id, channel_type, names, user_id, tags, related_to, updated_at) without reading the files. All filters are optional.",
+    {
+        "type": "object",
+        "properties": {
+            "category": {
+                "type": "string",
+                "description": "Top-level memory folder (e.g., channels, users, projects, tasks, decisions, meetings)"
+            },
+            "channel_id": {"type": "string", "description": "Exact channel ID (C/D/G...)"},
+            "user_id": {"type": "string", "description": "Exact user ID (U...)"},
+            "channel_type": {
+                "type": "string",
+                "description": "Channel type",
+                "enum": ["public_channel", "private_channel", "dm", "group_dm"]
+            },
+            "name": {"type": "string", "description": "Part of a channel name, user name or title"},
+            "tag": {"type": "string", "description": "Exact tag"},
+            "updated_since": {
+                "type": "string",
+                "description": "ISO timestamp (e.g., 2025-11-03T09:00:00); only entries updated at or after it"
+            },
+            "limit": {"type": "integer", "description": "Maximum number of entries (default 100)"}
+        },
+        "required": []
+    }
+)
+async def memory_catalog_query(args: Dict[str, Any]) -> Dict[str, Any]:
+    """Query memory catalog"""
+    try:
+        await asyncio.to_thread(sync_catalog)
+        entries = await asyncio.to_thread(
+            query_catalog,
+            category=args.get("category"),
+            channel_id=args.get("channel_id"),
+            user_id=args.get("user_id"),
+            channel_type=args.get("channel_type"),
+            name=args.get("name"),
+            tag=args.get("tag"),
+            updated_since=args.get("updated_since"),
+            limit=args.get("limit") or 100,
+        )
+        result = {"success": True, "count": len(entries), "entries": entries}
+    except Exception as e:
+        result = {"success": False, "error": str(e)}
+
+    return {
+        "content": [
+            {
+                "type": "text",
+                "text": json.dumps(result, ensure_ascii=False, indent=2),
+            }
+        ]
+    }
+
+
+@tool(
+    "get_memory_id_maps",
+    "Returns channel_id -> {name, type, user_id} and user_id -> {name, name_kr, name_en} maps built from the frontmatter of all channel and user memory files.",
+    {
+        "type": "object",
+        "properties": {},
+        "required": []
+    }
+)
+async def memory_catalog_get_id_maps(args: Dict[str, Any]) -> Dict[str, Any]:
+    """Return channel/user ID maps"""
+    try:
+        await asyncio.to_thread(sync_catalog)
+        result = {"success": True, **await asyncio.to_thread(get_id_maps)}
+    except Exception as e:
+        result = {"success": False, "error": str(e)}
+
+    return {
+        "content": [
+            {
+                "type": "text",
+                "text": json.dumps(result, ensure_ascii=False, indent=2),
+            }
+        ]
+    }
+
+
+# Create MCP server
+tools_list = [
+    memory_catalog_query,
+    memory_catalog_get_id_maps,
+]
+
+
+def create_memory_catalog_mcp_server():
+    """Create Memory Catalog MCP server"""
+    return create_sdk_mcp_server(name="memory_catalog", version="1.0.0", tools=tools_list)
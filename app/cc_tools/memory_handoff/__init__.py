@@ -0,0 +1,7 @@
+"""
+Memory Handoff MCP Server
+"""
+
+from app.cc_tools.memory_handoff.memory_handoff_tools import create_memory_handoff_mcp_server
+
+__all__ = ["create_memory_handoff_mcp_server"]
@@ -0,0 +1,82 @@
+"""
+Memory Handoff Tools for Claude Code SDK
+MCP tool letting a scoped memory manager session pass content meant for another
+entity's file to a separate memory job on that entity's shard
+"""
+
+import asyncio
+import json
+from typing import Any, Dict
+
+from claude_agent_sdk import create_sdk_mcp_server, tool
+
+from app.cc_utils.memory_index import INDEX_FILE_NAME
+from app.cc_utils.memory_scope import normalize_path, shard_key_for_path
+
+
+def _result(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "content": [
+            {
+                "type": "text",
+                "text": json.dumps(result, ensure_ascii=False, indent=2),
+            }
+        ]
+    }
+
+
+def create_memory_handoff_mcp_server(shard_key: str):
+    """
+    Create Memory Handoff MCP server for one memory job
+
+    Args:
+        shard_key: Write scope of the calling session (handoffs to it are refused)
+    """
+
+    @tool(
+        "hand_off_memory",
+        "Saves content to a memory file outside this session's write scope (e.g. users/U123.md, projects/kira.md) by starting a separate memory job for that file. Give the full information to save; the other job cannot see this conversation.",
+        {
+            "type": "object",
+            "properties": {
+                "target_path": {
+                    "type": "string",
+                    "description": "Memory file path relative to the memories folder (e.g. users/U123.md, projects/kira.md)"
+                },
+                "content": {
+                    "type": "string",
+                    "description": "Information to save in that file, including channel/user IDs and names it refers to"
+                }
+            },
+            "required": ["target_path", "content"]
+        }
+    )
+    async def memory_handoff(args: Dict[str, Any]) -> Dict[str, Any]:
+        """Enqueue a memory job for another entity's file"""
+        from app.queueing_extended import enqueue_memory_job_nowait
+
+        rel_path = normalize_path(args.get("target_path", ""))
+        content = (args.get("content") or "").strip()
+        if not rel_path or not rel_path.endswith(".md") or rel_path == INDEX_FILE_NAME or "/" not in rel_path:
+            return _result({"success": False, "error": "target_path must be a category/file.md path inside the memories folder (not index.md)"})
+        if not content:
+            return _result({"success": False, "error": "content is empty"})
+
+        target_key = await asyncio.to_thread(shard_key_for_path, rel_path)
+        if target_key == shard_key:
+            return _result({"success": False, "error": f"{rel_path} is in this session's scope; edit it directly"})
+
+        memory_query = f"""다른 메모리 작업에서 {rel_path}에 저장하도록 넘겨받은 내용입니다. 기존 내용과 중복되지 않게 반영하세요.
+
+{content}
+"""
+        enqueued = enqueue_memory_job_nowait({
+            "memory_query": memory_query,
+            "shard_key": target_key,
+            "handoff": True,
+        })
+        if not enqueued:
+            return _result({"success": False, "error": "memory queue is full, try again later"})
+        return _result({"success": True, "target_path": rel_path, "scope": target_key})
+
+    return create_sdk_mcp_server(name="memory_handoff", version="1.0.0", tools=[memory_handoff])
@@ -12,9 +12,10 @@ from typing import Any, Dict
 from claude_agent_sdk import create_sdk_mcp_server, tool
 
 from app import scheduler
+from app.cc_utils import schedule_db
 
-# Lock to prevent concurrent access to schedule file
-_schedule_file_lock = asyncio.Lock()
+# Lock so a DB change and its APScheduler job operation are applied together
+_schedule_lock = asyncio.Lock()
 
 
 @tool(
@@ -51,6 +52,11 @@ _schedule_file_lock = asyncio.Lock()
             "is_enabled": {
                 "type": "boolean",
                 "description": "Whether schedule is enabled (default: true)"
+            },
+            "misfire_policy": {
+                "type": "string",
+                "enum": ["run_once", "coalesce", "skip"],
+                "description": "What to do with runs missed while the bot was down - 'run_once' (run once late, default for date), 'coalesce' (run once late only if within the grace window, default for cron), 'skip' (drop missed runs)"
             }
         },
         "required": ["name", "schedule_type", "schedule_value", "user_id", "text", "channel_id"]
@@ -65,8 +71,22 @@ async def scheduler_add_schedule(args: Dict[str, Any]) -> Dict[str, Any]:
     text = args["text"]
     channel_id = args["channel_id"]
     is_enabled = args.get("is_enabled", True)
+    misfire_policy = args.get("misfire_policy")
 
     try:
+        if misfire_policy and misfire_policy not in scheduler.MISFIRE_POLICIES:
+            return {
+                "content": [{
+                    "type": "text",
+                    "text": json.dumps({
+                        "success": False,
+                        "error": True,
+                        "message": "Invalid misfire_policy. Only 'run_once', 'coalesce' or 'skip' can be used."
+                    }, ensure_ascii=False, indent=2)
+                }],
+                "error": True
+            }
+
         if schedule_type not in ["cron", "date"]:
             return {
                 "content": [{
@@ -115,12 +135,9 @@ async def scheduler_add_schedule(args: Dict[str, Any]) -> Dict[str, Any]:
                 }
 
         # Use Lock to prevent concurrent access
-        async with _schedule_file_lock:
-            schedules = scheduler.read_schedules_from_file()
-
+        async with _schedule_lock:
             # Check for duplicate names (warning only, not blocked)
-            duplicate_names = [s.get("name") for s in schedules if s.get("name") == name and s.get("is_enabled")]
-            if duplicate_names:
+            if await schedule_db.has_enabled_name_async(name):
                 logging.warning(f"[SCHEDULER_TOOLS] Duplicate schedule name detected: {name}")
             new_schedule = {
                 "id": str(uuid.uuid4()),
@@ -131,10 +148,10 @@ async def scheduler_add_schedule(args: Dict[str, Any]) -> Dict[str, Any]:
                 "text": text,
                 "channel": channel_id,
                 "is_enabled": is_enabled,
+                "misfire_policy": misfire_policy,
             }
-            schedules.append(new_schedule)
-            scheduler.write_schedules_to_file(schedules)
-            await scheduler.reload_schedules_from_file()
+            new_schedule = await schedule_db.add_schedule_async(new_schedule)
+            scheduler.sync_schedule_job(new_schedule)
 
         return {
             "content": [{
@@ -181,12 +198,8 @@ async def scheduler_remove_schedule(args: Dict[str, Any]) -> Dict[str, Any]:
 
     try:
         # Use Lock to prevent concurrent access
-        async with _schedule_file_lock:
-            schedules = scheduler.read_schedules_from_file()
-            original_count = len(schedules)
-            schedules = [s for s in schedules if s.get("id") != schedule_id]
-
-            if len(schedules) == original_count:
+        async with _schedule_lock:
+            if not await schedule_db.remove_schedule_async(schedule_id):
                 return {
                     "content": [{
                         "type": "text",
@@ -199,8 +212,7 @@ async def scheduler_remove_schedule(args: Dict[str, Any]) -> Dict[str, Any]:
                     "error": True
                 }
 
-            scheduler.write_schedules_to_file(schedules)
-            await scheduler.reload_schedules_from_file()
+            scheduler.unschedule_job(schedule_id)
 
         return {
             "content": [{
@@ -245,7 +257,7 @@ async def scheduler_list_schedules(args: Dict[str, Any]) -> Dict[str, Any]:
         from datetime import datetime
 
         channel_id_filter = args.get("channel_id")
-        schedules = scheduler.read_schedules_from_file()
+        schedules = await schedule_db.list_schedules_async(channel_id=channel_id_filter)
 
         if not schedules:
             return {
@@ -262,10 +274,6 @@ async def scheduler_list_schedules(args: Dict[str, Any]) -> Dict[str, Any]:
         schedule_list = []
 
         for s in schedules:
-            # Filter by channel_id
-            if channel_id_filter and s.get("channel") != channel_id_filter:
-                continue
-
             # Exclude date-type schedules that have already passed
             if s.get("schedule_type") == "date":
                 try:
@@ -286,7 +294,8 @@ async def scheduler_list_schedules(args: Dict[str, Any]) -> Dict[str, Any]:
                 "user": s.get("user"),
                 "channel": s.get("channel"),
                 "text": s.get("text"),
-                "is_enabled": s.get("is_enabled")
+                "is_enabled": s.get("is_enabled"),
+                "misfire_policy": s.get("misfire_policy")
             })
 
         return {
@@ -339,6 +348,11 @@ async def scheduler_list_schedules(args: Dict[str, Any]) -> Dict[str, Any]:
             "is_enabled": {
                 "type": "boolean",
                 "description": "Whether schedule is enabled (optional)"
+            },
+            "misfire_policy": {
+                "type": "string",
+                "enum": ["run_once", "coalesce", "skip"],
+                "description": "What to do with runs missed while the bot was down - 'run_once' (run once late, default for date), 'coalesce' (run once late only if within the grace window, default for cron), 'skip' (drop missed runs) (optional)"
             }
         },
         "required": ["schedule_id"]
@@ -349,24 +363,27 @@ async def scheduler_update_schedule(args: Dict[str, Any]) -> Dict[str, Any]:
     schedule_id = args["schedule_id"]
 
     try:
-        schedules = scheduler.read_schedules_from_file()
-        schedule_found = False
+        # Only change fields being updated
+        fields = {key: args[key] for key in ("name", "schedule_value", "text", "is_enabled", "misfire_policy") if key in args}
+        if fields.get("misfire_policy") not in (None, *scheduler.MISFIRE_POLICIES):
+            return {
+                "content": [{
+                    "type": "text",
+                    "text": json.dumps({
+                        "success": False,
+                        "error": True,
+                        "message": "Invalid misfire_policy. Only 'run_once', 'coalesce' or 'skip' can be used."
+                    }, ensure_ascii=False, indent=2)
+                }],
+                "error": True
+            }
 
-        for s in schedules:
-            if s.get("id") == schedule_id:
-                schedule_found = True
-                # Only change fields being updated
-                if "name" in args:
-                    s["name"] = args["name"]
-                if "schedule_value" in args:
-                    s["schedule_value"] = args["schedule_value"]
-                if "text" in args:
-                    s["text"] = args["text"]
-                if "is_enabled" in args:
-                    s["is_enabled"] = args["is_enabled"]
-                break
-
-        if not schedule_found:
+        async with _schedule_lock:
+            schedule = await schedule_db.update_schedule_async(schedule_id, fields)
+            if schedule is not None:
+                scheduler.sync_schedule_job(schedule)
+
+        if schedule is None:
             return {
                 "content": [{
                     "type": "text",
@@ -379,9 +396,6 @@ async def scheduler_update_schedule(args: Dict[str, Any]) -> Dict[str, Any]:
                 "error": True
             }
 
-        scheduler.write_schedules_to_file(schedules)
-        await scheduler.reload_schedules_from_file()
-
         return {
             "content": [{
                 "type": "text",
@@ -378,7 +378,7 @@ async def slack_forward_message(args: Dict[str, Any]) -> Dict[str, Any]:
 
             # Generate a single request_id
             import uuid
-            from app.cc_utils.waiting_answer_db import add_request
+            from app.cc_utils.waiting_answer_db import add_request_async
 
             request_id = str(uuid.uuid4())[:8]
 
@@ -398,7 +398,7 @@ async def slack_forward_message(args: Dict[str, Any]) -> Dict[str, Any]:
                 sent_channels.append(dm_channel_id)
 
             # Register in waiting_answer (all respondents under one request_id)
-            count = add_request(
+            count = await add_request_async(
                 request_id=request_id,
                 channel_id=sent_channels[0] if sent_channels else "unknown",
                 requester_id=requester_id,
@@ -10,10 +10,10 @@ from typing import Any, Dict
 from claude_agent_sdk import create_sdk_mcp_server, tool
 
 from app.cc_utils.waiting_answer_db import (
-    update_response,
-    get_request_by_id,
-    get_all_responses_for_request,
-    get_request_progress,
+    update_response_async,
+    get_request_by_id_async,
+    get_all_responses_for_request_async,
+    get_request_progress_async,
 )
 
 
@@ -47,7 +47,7 @@ async def waiting_answer_update_request(args: Dict[str, Any]) -> Dict[str, Any]:
 
     try:
         # Get query info before update
-        request_info = get_request_by_id(request_id, user_id)
+        request_info = await get_request_by_id_async(request_id, user_id)
 
         if not request_info:
             return {
@@ -63,7 +63,7 @@ async def waiting_answer_update_request(args: Dict[str, Any]) -> Dict[str, Any]:
             }
 
         # Update response
-        success = update_response(request_id, user_id, response)
+        success = await update_response_async(request_id, user_id, response)
 
         if not success:
             return {
@@ -79,7 +79,7 @@ async def waiting_answer_update_request(args: Dict[str, Any]) -> Dict[str, Any]:
             }
 
         # Check progress
-        progress = get_request_progress(request_id)
+        progress = await get_request_progress_async(request_id)
         all_completed = progress["total"] == progress["completed"]
 
         # Build result data
@@ -96,7 +96,7 @@ async def waiting_answer_update_request(args: Dict[str, Any]) -> Dict[str, Any]:
 
         # Include all responses if all completed
         if all_completed:
-            result["all_responses"] = get_all_responses_for_request(request_id)
+            result["all_responses"] = await get_all_responses_for_request_async(request_id)
 
         return {
             "content": [{
@@ -0,0 +1,97 @@
+"""
+Context Budget
+Local token estimation for agent sessions so that compaction or trimming
+happens before the model context limit is hit (instead of after a 413)
+"""
+
+import json
+from typing import Any
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Roughly estimate the token count of a text without calling the API
+
+    ASCII text averages ~4 characters per token, while Hangul/CJK characters
+    are close to one token each, so both are counted separately
+    (errs on the high side so the budget trips early rather than late)
+
+    Args:
+        text: Text to estimate
+
+    Returns:
+        Estimated token count
+    """
+    if not text:
+        return 0
+
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    other_chars = len(text) - ascii_chars
+    return ascii_chars // 4 + other_chars + 1
+
+
+def estimate_message_tokens(message: Any) -> int:
+    """
+    Estimate the tokens a streamed SDK message adds to the session context
+
+    Args:
+        message: Message yielded by ClaudeSDKClient.receive_response()
+
+    Returns:
+        Estimated token count (0 for messages without content)
+    """
+    content = getattr(message, "content", None)
+    if content is None:
+        return 0
+    if isinstance(content, str):
+        return estimate_tokens(content)
+
+    total = 0
+    for block in content:
+        # TextBlock / ThinkingBlock / ToolUseBlock / ToolResultBlock
+        for attr in ("text", "thinking", "input", "content"):
+            value = getattr(block, attr, None)
+            if value is None:
+                continue
+            if not isinstance(value, str):
+                value = json.dumps(value, ensure_ascii=False, default=str)
+            total += estimate_tokens(value)
+    return total
+
+
+class ContextBudget:
+    """Rolling context size estimate for one agent session"""
+
+    def __init__(self, context_window: int, compact_threshold: float):
+        """
+        Args:
+            context_window: Model context window in tokens
+            compact_threshold: Fraction of the window at which to compact (e.g. 0.75)
+        """
+        self.context_window = context_window
+        self.limit = int(context_window * compact_threshold)
+        self.baseline = 0
+        self.used = 0
+
+    def start(self, *texts: str) -> int:
+        """Set the baseline (system prompt + query) and reset the rolling estimate"""
+        self.baseline = sum(estimate_tokens(text) for text in texts)
+        self.used = self.baseline
+        return self.used
+
+    def add(self, message: Any) -> int:
+        """Add a streamed message to the rolling estimate"""
+        self.used += estimate_message_tokens(message)
+        return self.used
+
+    def reset_after_compaction(self) -> None:
+        """After /compact only the baseline and a short summary remain"""
+        self.used = self.baseline
+
+    def remaining(self) -> int:
+        """Tokens left before the compaction threshold"""
+        return self.limit - self.used
+
+    def should_compact(self) -> bool:
+        """Whether the rolling estimate has reached the compaction threshold"""
+        return self.used >= self.limit
@@ -0,0 +1,182 @@
+"""
+Processed Email Ledger
+processed_emails table of the bot state database (state_db) recording every email
+the task extractor finished with, keyed by message ID and by content hash.
+
+The fetcher asks the MCP agent to mark fetched mail as read, but when it fails to,
+the same unread emails come back on every tick. filter_new_emails() drops known
+emails before any agent (memory retriever, task extractor) is called. The content
+hash also catches the same message returned under a different ID.
+
+Ledger rows are purged after PROCESSED_EMAILS_RETENTION_DAYS (state_retention),
+so only mail received within a shorter window is fetched and processed: a mail
+whose row was purged is always older than the window and never comes back in.
+"""
+
+import hashlib
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from app.config.settings import get_settings
+from app.cc_utils import sqlite_pool, state_db
+from app.cc_utils.state_retention import MIN_RETENTION_DAYS
+
+_stats_lock = threading.Lock()
+_stats = {
+    "fetched": 0,
+    "new": 0,
+    "skipped_known_id": 0,
+    "skipped_known_content": 0,
+    "skipped_batch_duplicate": 0,
+    "skipped_too_old": 0,
+}
+
+
+def content_hash(email: Dict[str, Any]) -> str:
+    """Hash of the fields that identify an email independently of its message ID"""
+    sender = (email.get("from") or {}).get("emailAddress", {}).get("address", "")
+    parts = [
+        sender.lower(),
+        email.get("subject", "") or "",
+        email.get("receivedDateTime", "") or "",
+        email.get("bodyPreview", "") or "",
+    ]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def get_fetch_window_start() -> datetime:
+    """
+    Oldest receivedDateTime (UTC) of mail that is processed
+
+    One day shorter than the ledger retention, which also covers the purge
+    cutoff being a local date while received times are UTC.
+    """
+    days = max(get_settings().PROCESSED_EMAILS_RETENTION_DAYS, MIN_RETENTION_DAYS) - 1
+    return datetime.now(timezone.utc) - timedelta(days=days)
+
+
+def _received_before(email: Dict[str, Any], since: datetime) -> bool:
+    """Whether an email was received before since (False if its time is missing or unreadable)"""
+    received = email.get("receivedDateTime") or ""
+    try:
+        received_at = datetime.fromisoformat(received.replace("Z", "+00:00"))
+    except ValueError:
+        return False
+    if received_at.tzinfo is None:
+        received_at = received_at.replace(tzinfo=timezone.utc)
+    return received_at < since
+
+
+def _count(key: str, amount: int = 1) -> None:
+    with _stats_lock:
+        _stats[key] += amount
+
+
+def filter_new_emails(emails: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Drop emails already in the ledger, repeated within the batch, or received
+    before the fetch window (their ledger rows may have been purged)
+
+    Args:
+        emails: Fetched emails
+
+    Returns:
+        Emails not processed before, in fetch order
+    """
+    if not emails:
+        return []
+
+    _count("fetched", len(emails))
+    since = get_fetch_window_start()
+    recent = [email for email in emails if not _received_before(email, since)]
+    if len(recent) < len(emails):
+        _count("skipped_too_old", len(emails) - len(recent))
+        logging.info(f"[EMAIL_LEDGER] Skipped {len(emails) - len(recent)} emails received before {since:%Y-%m-%d}")
+        emails = recent
+    if not emails:
+        return []
+
+    keyed = [(email, email.get("id") or "", content_hash(email)) for email in emails]
+
+    message_ids = [message_id for _, message_id, _ in keyed if message_id]
+    hashes = [digest for _, _, digest in keyed]
+
+    with state_db.connection() as conn:
+        known_ids = set()
+        if message_ids:
+            known_ids = {
+                row["message_id"]
+                for row in conn.execute(
+                    f"SELECT message_id FROM processed_emails "
+                    f"WHERE message_id IN ({', '.join('?' * len(message_ids))})",
+                    message_ids,
+                )
+            }
+        known_hashes = {
+            row["content_hash"]
+            for row in conn.execute(
+                f"SELECT content_hash FROM processed_emails "
+                f"WHERE content_hash IN ({', '.join('?' * len(hashes))})",
+                hashes,
+            )
+        }
+
+    new_emails = []
+    seen_ids = set()
+    seen_hashes = set()
+    for email, message_id, digest in keyed:
+        if message_id and message_id in known_ids:
+            _count("skipped_known_id")
+        elif digest in known_hashes:
+            _count("skipped_known_content")
+        elif (message_id and message_id in seen_ids) or digest in seen_hashes:
+            _count("skipped_batch_duplicate")
+        else:
+            new_emails.append(email)
+        seen_ids.add(message_id)
+        seen_hashes.add(digest)
+
+    _count("new", len(new_emails))
+    skipped = len(emails) - len(new_emails)
+    if skipped:
+        logging.info(f"[EMAIL_LEDGER] Skipped {skipped} already processed emails ({len(new_emails)} new)")
+    return new_emails
+
+
+def record_emails(emails: List[Dict[str, Any]]) -> int:
+    """
+    Add emails to the ledger once the task extractor finished with them
+
+    Args:
+        emails: Emails returned by filter_new_emails()
+
+    Returns:
+        Number of emails recorded
+    """
+    if not emails:
+        return 0
+
+    rows = [(email.get("id") or content_hash(email), content_hash(email), email.get("subject", "")) for email in emails]
+    with state_db.transaction() as conn:
+        before = conn.total_changes
+        conn.executemany(
+            "INSERT OR IGNORE INTO processed_emails (message_id, content_hash, subject) VALUES (?, ?, ?)",
+            rows,
+        )
+        recorded = conn.total_changes - before
+
+    logging.info(f"[EMAIL_LEDGER] Recorded {recorded} processed emails")
+    return recorded
+
+
+def get_stats() -> Dict[str, int]:
+    """Return counters of fetched, new and skipped emails since startup"""
+    with _stats_lock:
+        return dict(_stats)
+
+
+# Async variants for the event loop (run on the shared DB thread pool)
+filter_new_emails_async = sqlite_pool.to_async(filter_new_emails)
+record_emails_async = sqlite_pool.to_async(record_emails)
@@ -1,51 +1,11 @@
 """
 Email Tasks Database Manager
-SQLite database for managing tasks extracted from emails
+email_tasks table of the bot state database (state_db) for managing tasks extracted from emails
 """
-import sqlite3
 import logging
-from pathlib import Path
 from typing import List, Dict, Any, Optional
 
-from app.config.settings import get_settings
-
-settings = get_settings()
-
-
-def get_db_path() -> Path:
-    """Return database file path"""
-    base_dir = settings.FILESYSTEM_BASE_DIR or "."
-    db_dir = Path(base_dir) / "db"
-    db_dir.mkdir(parents=True, exist_ok=True)
-    return db_dir / "email_tasks.db"
-
-
-def init_db():
-    """Initialize database and create tables"""
-    db_path = get_db_path()
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS email_tasks (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            email_id TEXT NOT NULL,
-            sender TEXT NOT NULL,
-            subject TEXT NOT NULL,
-            task_description TEXT NOT NULL,
-            priority TEXT DEFAULT 'medium',
-            user TEXT,
-            text TEXT,
-            channel TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            status TEXT DEFAULT 'pending'
-        )
-    """)
-
-    conn.commit()
-    conn.close()
-    logging.info(f"[EMAIL_TASKS_DB] Database initialized at {db_path}")
+from app.cc_utils import sqlite_pool, state_db
 
 
 def add_task(
@@ -74,19 +34,16 @@ def add_task(
     Returns:
         ID of created task
     """
-    db_path = get_db_path()
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    with state_db.transaction() as conn:
+        cursor = conn.cursor()
 
-    cursor.execute("""
-        INSERT INTO email_tasks
-        (email_id, sender, subject, task_description, priority, user, text, channel)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    """, (email_id, sender, subject, task_description, priority, user_id, text, channel_id))
+        cursor.execute("""
+            INSERT INTO email_tasks
+            (email_id, sender, subject, task_description, priority, user, text, channel)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (email_id, sender, subject, task_description, priority, user_id, text, channel_id))
 
-    task_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+        task_id = cursor.lastrowid
 
     logging.info(f"[EMAIL_TASKS_DB] Added task {task_id}: {task_description[:50]}...")
     return task_id
@@ -102,26 +59,23 @@ def get_pending_tasks(limit: int = 100) -> List[Dict[str, Any]]:
     Returns:
         List of tasks (list of dictionaries)
     """
-    db_path = get_db_path()
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT * FROM email_tasks
-        WHERE status = 'pending'
-        ORDER BY
-            CASE priority
-                WHEN 'high' THEN 1
-                WHEN 'medium' THEN 2
-                WHEN 'low' THEN 3
-            END,
-            created_at ASC
-        LIMIT ?
-    """, (limit,))
-
-    rows = cursor.fetchall()
-    conn.close()
+    with state_db.connection() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            SELECT * FROM email_tasks
+            WHERE status = 'pending'
+            ORDER BY
+                CASE priority
+                    WHEN 'high' THEN 1
+                    WHEN 'medium' THEN 2
+                    WHEN 'low' THEN 3
+                END,
+                created_at ASC
+            LIMIT ?
+        """, (limit,))
+
+        rows = cursor.fetchall()
 
     tasks = [dict(row) for row in rows]
     return tasks
@@ -137,19 +91,16 @@ def complete_task(task_id: int) -> bool:
     Returns:
         Whether successful
     """
-    db_path = get_db_path()
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    with state_db.transaction() as conn:
+        cursor = conn.cursor()
 
-    cursor.execute("""
-        UPDATE email_tasks
-        SET status = 'completed'
-        WHERE id = ?
-    """, (task_id,))
+        cursor.execute("""
+            UPDATE email_tasks
+            SET status = 'completed'
+            WHERE id = ?
+        """, (task_id,))
 
-    affected = cursor.rowcount
-    conn.commit()
-    conn.close()
+        affected = cursor.rowcount
 
     if affected > 0:
         logging.info(f"[EMAIL_TASKS_DB] Completed task {task_id}")
@@ -157,3 +108,35 @@ def complete_task(task_id: int) -> bool:
     else:
         logging.warning(f"[EMAIL_TASKS_DB] Task {task_id} not found")
         return False
+
+
+
+def complete_tasks(task_ids: List[int]) -> int:
+    """
+    Mark several tasks as complete in one transaction
+
+    Args:
+        task_ids: Task IDs
+
+    Returns:
+        Number of tasks updated
+    """
+    if not task_ids:
+        return 0
+
+    with state_db.transaction() as conn:
+        cursor = conn.executemany(
+            "UPDATE email_tasks SET status = 'completed' WHERE id = ?",
+            [(task_id,) for task_id in task_ids],
+        )
+        affected = cursor.rowcount
+
+    logging.info(f"[EMAIL_TASKS_DB] Completed {affected} tasks")
+    return affected
+
+
+# Async variants for the event loop (run on the shared DB thread pool)
+add_task_async = sqlite_pool.to_async(add_task)
+get_pending_tasks_async = sqlite_pool.to_async(get_pending_tasks)
+complete_task_async = sqlite_pool.to_async(complete_task)
+complete_tasks_async = sqlite_pool.to_async(complete_tasks)
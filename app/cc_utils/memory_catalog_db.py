@@ -0,0 +1,315 @@
+"""
+Memory Catalog SQLite Database Manager
+Catalog of memory file frontmatter (channel/user IDs, names, tags, related_to)
+kept in sync with the memories folder through the memory change feed
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.config.settings import get_settings
+from app.cc_utils import memory_store
+from app.cc_utils.memory_index import INDEX_FILE_NAME, parse_frontmatter
+
+_sync_lock = threading.Lock()
+
+
+def get_db_path() -> Path:
+    """Return SQLite database file path"""
+    settings = get_settings()
+    base_dir = settings.FILESYSTEM_BASE_DIR or os.getcwd()
+    db_dir = Path(base_dir) / "db"
+    db_dir.mkdir(parents=True, exist_ok=True)
+    return db_dir / "memory_catalog.db"
+
+
+def get_connection() -> sqlite3.Connection:
+    """Return SQLite connection (with Row factory set)"""
+    conn = sqlite3.connect(get_db_path())
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def init_db():
+    """Initialize database and create tables"""
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS memory_catalog (
+            path TEXT PRIMARY KEY,
+            category TEXT,
+            type TEXT,
+            channel_id TEXT,
+            channel_type TEXT,
+            channel_name TEXT,
+            name TEXT,
+            user_id TEXT,
+            user_name_kr TEXT,
+            user_name_en TEXT,
+            title TEXT,
+            tags TEXT,
+            related_to TEXT,
+            updated_at TEXT,
+            mtime REAL
+        )
+    """)
+
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_catalog_channel_id
+        ON memory_catalog(channel_id)
+    """)
+
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_catalog_user_id
+        ON memory_catalog(user_id)
+    """)
+
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_catalog_category_updated_at
+        ON memory_catalog(category, updated_at)
+    """)
+
+    # Change feed cursor the catalog has been synced to
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS catalog_state (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        )
+    """)
+
+    conn.commit()
+    conn.close()
+
+
+def _as_list(value: Any) -> List[str]:
+    """Normalize a frontmatter value into a list of strings"""
+    if not value:
+        return []
+    if isinstance(value, list):
+        return [str(v) for v in value if v]
+    return [v.strip() for v in str(value).split(",") if v.strip()]
+
+
+def _build_entry(rel_path: str, content: str, mtime: float) -> Dict[str, Any]:
+    """Extract catalog columns from a memory file"""
+    fields, body = parse_frontmatter(content)
+
+    title = fields.get("title")
+    if not title:
+        heading = next((line for line in body.splitlines() if line.startswith("#")), "")
+        title = heading.lstrip("#").strip()
+
+    updated_at = (
+        fields.get("updated_at") or fields.get("updated") or fields.get("last_updated")
+        or datetime.fromtimestamp(mtime).isoformat(timespec="seconds")
+    )
+
+    return {
+        "path": rel_path,
+        "category": rel_path.split("/", 1)[0] if "/" in rel_path else "",
+        "type": fields.get("type"),
+        "channel_id": fields.get("channel_id"),
+        "channel_type": fields.get("channel_type"),
+        "channel_name": fields.get("channel_name"),
+        "name": fields.get("name"),
+        "user_id": fields.get("user_id"),
+        "user_name_kr": fields.get("user_name_kr"),
+        "user_name_en": fields.get("user_name_en"),
+        "title": title,
+        "tags": json.dumps(_as_list(fields.get("tags")), ensure_ascii=False),
+        "related_to": json.dumps(_as_list(fields.get("related_to")), ensure_ascii=False),
+        "updated_at": str(updated_at),
+        "mtime": mtime,
+    }
+
+
+def _upsert_file(cursor: sqlite3.Cursor, memories_path: Path, rel_path: str) -> None:
+    """Insert/update one file's catalog row, or delete it if the file is gone"""
+    path = memories_path / rel_path
+    try:
+        mtime = path.stat().st_mtime
+        content = path.read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+        cursor.execute("DELETE FROM memory_catalog WHERE path = ?", (rel_path,))
+        return
+
+    entry = _build_entry(rel_path, content, mtime)
+    columns = ", ".join(entry.keys())
+    placeholders = ", ".join("?" for _ in entry)
+    cursor.execute(
+        f"INSERT OR REPLACE INTO memory_catalog ({columns}) VALUES ({placeholders})",
+        tuple(entry.values()),
+    )
+
+
+def sync_catalog() -> int:
+    """
+    Apply memory changes since the last sync (full rebuild if the journal was truncated)
+
+    Returns:
+        Number of files updated or removed
+    """
+    memories_path = memory_store.get_memories_path()
+    generation = memory_store.sync()
+
+    with _sync_lock:
+        return _apply_changes(memories_path, generation)
+
+
+def _apply_changes(memories_path: Path, generation: int) -> int:
+    """Bring the catalog from its stored cursor up to generation (caller holds _sync_lock)"""
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT value FROM catalog_state WHERE key = 'cursor'")
+        row = cursor.fetchone()
+        synced = row["value"] if row else 0
+        if synced >= generation:
+            return 0
+
+        changes = memory_store.changes_since(synced)
+        if changes is None:
+            # Journal no longer covers our cursor: rebuild from the folder
+            cursor.execute("DELETE FROM memory_catalog")
+            paths = [
+                p.relative_to(memories_path).as_posix()
+                for p in memories_path.rglob("*.md")
+            ] if memories_path.exists() else []
+        else:
+            paths = sorted({change["path"] for change in changes})
+            generation = changes[-1]["seq"] if changes else generation
+
+        for rel_path in paths:
+            if rel_path == INDEX_FILE_NAME:
+                continue
+            _upsert_file(cursor, memories_path, rel_path)
+
+        cursor.execute(
+            "INSERT OR REPLACE INTO catalog_state (key, value) VALUES ('cursor', ?)",
+            (generation,),
+        )
+        conn.commit()
+        if paths:
+            logging.info(f"[MEMORY_CATALOG] Synced {len(paths)} files (cursor {generation})")
+        return len(paths)
+    finally:
+        conn.close()
+
+
+def _row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+    entry = dict(row)
+    entry["tags"] = json.loads(entry["tags"] or "[]")
+    entry["related_to"] = json.loads(entry["related_to"] or "[]")
+    entry.pop("mtime", None)
+    return {k: v for k, v in entry.items() if v not in (None, "", [])}
+
+
+def query_catalog(
+    category: Optional[str] = None,
+    channel_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+    channel_type: Optional[str] = None,
+    name: Optional[str] = None,
+    tag: Optional[str] = None,
+    updated_since: Optional[str] = None,
+    limit: int = 100,
+) -> List[Dict[str, Any]]:
+    """
+    Query the memory catalog (all filters are optional and combined with AND)
+
+    Args:
+        category: Top-level folder (channels, users, projects, ...)
+        channel_id: Exact channel ID
+        user_id: Exact user ID
+        channel_type: public_channel, private_channel, dm or group_dm
+        name: Substring of channel name, user name or title
+        tag: Exact tag
+        updated_since: ISO timestamp; only entries updated at or after it
+        limit: Maximum number of rows
+
+    Returns:
+        List of catalog entries, most recently updated first
+    """
+    conditions = []
+    params: List[Any] = []
+
+    for column, value in (
+        ("category", category),
+        ("channel_id", channel_id),
+        ("user_id", user_id),
+        ("channel_type", channel_type),
+    ):
+        if value:
+            conditions.append(f"{column} = ?")
+            params.append(value)
+
+    if name:
+        conditions.append("(channel_name LIKE ? OR name LIKE ? OR user_name_kr LIKE ? OR user_name_en LIKE ? OR title LIKE ?)")
+        params.extend([f"%{name}%"] * 5)
+
+    if tag:
+        conditions.append("EXISTS (SELECT 1 FROM json_each(memory_catalog.tags) WHERE json_each.value = ?)")
+        params.append(tag)
+
+    if updated_since:
+        conditions.append("updated_at >= ?")
+        params.append(updated_since)
+
+    query = "SELECT * FROM memory_catalog"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY updated_at DESC LIMIT ?"
+    params.append(limit)
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+    conn.close()
+
+    return [_row_to_dict(row) for row in rows]
+
+
+def get_id_maps() -> Dict[str, Dict[str, Any]]:
+    """
+    Build channel_id and user_id lookup maps from channels/ and users/ entries
+
+    Returns:
+        {"channels": {channel_id: {"name", "type", "user_id"}}, "users": {user_id: {"name", "name_kr", "name_en"}}}
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT category, channel_id, channel_type, channel_name, name, user_id, user_name_kr, user_name_en
+        FROM memory_catalog
+        WHERE channel_id IS NOT NULL OR user_id IS NOT NULL
+    """)
+    rows = cursor.fetchall()
+    conn.close()
+
+    channels: Dict[str, Dict[str, Any]] = {}
+    users: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        if row["channel_id"]:
+            channel = channels.setdefault(row["channel_id"], {})
+            channel.update({k: v for k, v in {
+                "name": row["channel_name"] or row["name"] or row["user_name_kr"] or row["user_name_en"],
+                "type": row["channel_type"],
+                "user_id": row["user_id"],
+            }.items() if v})
+        if row["user_id"]:
+            user = users.setdefault(row["user_id"], {})
+            user.update({k: v for k, v in {
+                "name": row["name"] if row["category"] == "users" else None,
+                "name_kr": row["user_name_kr"],
+                "name_en": row["user_name_en"],
+            }.items() if v})
+
+    return {"channels": channels, "users": users}
@@ -0,0 +1,362 @@
+"""
+Memory Compaction
+Finds near-duplicate memory files within each category (top-level folder) with
+MinHash + LSH and compacts them:
+
+- similarity >= MEMORY_COMPACTION_MERGE_THRESHOLD: merged into the most recently
+  updated file (paragraphs only the duplicate had are appended, and the source
+  path is recorded in a `merged_from` frontmatter field); the duplicate is moved
+  to {FILESYSTEM_BASE_DIR}/memories_archive/<run>/ so nothing is lost
+- similarity >= MEMORY_COMPACTION_FLAG_THRESHOLD: only listed in the run report
+
+Every duplicate must itself reach the merge threshold against the file it is
+merged into (similarity is not chained through a third file), and files about
+different entities (channel_id/user_id frontmatter differs, e.g. channels/C1.md
+and channels/C2.md) are never merged, only flagged.
+
+Runs on the memory worker so it never races the memory manager.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Set, Tuple
+
+import numpy as np
+
+from app.config.settings import get_settings
+from app.cc_utils.memory_index import INDEX_FILE_NAME, parse_frontmatter, tokenize
+from app.cc_utils.memory_snapshots import write_memory_file
+
+# MinHash signature = BANDS * ROWS permutations
+BANDS = 16
+ROWS = 4
+NUM_PERM = BANDS * ROWS
+
+# Consecutive tokens per shingle; files with fewer shingles are too short to judge
+SHINGLE_SIZE = 3
+MIN_SHINGLES = 5
+
+# Mersenne prime for the universal hash family (31-bit keeps a*x+b inside uint64)
+_PRIME = (1 << 31) - 1
+
+# Agent bookkeeping folders that are similar by design
+EXCLUDED_PREFIXES = ("misc/interventions/",)
+
+# Frontmatter fields naming the entity a file is about
+IDENTITY_FIELDS = ("channel_id", "user_id")
+
+_rng = np.random.default_rng(20251103)
+_PERM_A = _rng.integers(1, _PRIME, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, _PRIME, size=NUM_PERM, dtype=np.uint64)
+
+
+def get_archive_root() -> Path:
+    """Return the folder where merged-away duplicates and reports are kept"""
+    settings = get_settings()
+    base_dir = settings.FILESYSTEM_BASE_DIR or os.getcwd()
+    return Path(base_dir) / "memories_archive"
+
+
+def shingles(text: str) -> Set[str]:
+    """Word shingles of the body text"""
+    tokens = tokenize(text)
+    if len(tokens) < SHINGLE_SIZE:
+        return set(tokens)
+    return {" ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+
+
+def minhash(shingle_set: Set[str]) -> np.ndarray:
+    """MinHash signature of a shingle set"""
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little") & _PRIME for s in shingle_set),
+        dtype=np.uint64,
+        count=len(shingle_set),
+    )
+    permuted = (np.outer(hashes, _PERM_A) + _PERM_B) % _PRIME
+    return permuted.min(axis=0)
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    """Exact Jaccard similarity"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def find_similar_pairs(docs: Dict[str, Set[str]], threshold: float) -> List[Tuple[str, str, float]]:
+    """
+    Find document pairs whose Jaccard similarity is at least threshold
+
+    LSH buckets on signature bands produce candidates; candidates are verified
+    with the exact Jaccard similarity of their shingle sets.
+
+    Args:
+        docs: path -> shingle set (one category)
+        threshold: Minimum similarity
+
+    Returns:
+        List of (path_a, path_b, similarity)
+    """
+    buckets: Dict[Tuple[int, bytes], List[str]] = {}
+    for path, shingle_set in docs.items():
+        signature = minhash(shingle_set)
+        for band in range(BANDS):
+            key = (band, signature[band * ROWS:(band + 1) * ROWS].tobytes())
+            buckets.setdefault(key, []).append(path)
+
+    candidates: Set[Tuple[str, str]] = set()
+    for paths in buckets.values():
+        if len(paths) < 2:
+            continue
+        for i, a in enumerate(paths):
+            for b in paths[i + 1:]:
+                candidates.add((a, b) if a < b else (b, a))
+
+    pairs = []
+    for a, b in candidates:
+        similarity = jaccard(docs[a], docs[b])
+        if similarity >= threshold:
+            pairs.append((a, b, round(similarity, 3)))
+    return sorted(pairs, key=lambda pair: pair[2], reverse=True)
+
+
+def _identity(fields: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Entity identifiers of a file (files with different identities are never merged)"""
+    identity = []
+    for field in IDENTITY_FIELDS:
+        value = fields.get(field) or None
+        if isinstance(value, list):
+            value = tuple(sorted(value))
+        identity.append(value)
+    return tuple(identity)
+
+
+def _merge_groups(
+    pairs: List[Tuple[str, str, float]], mtimes: Dict[str, float]
+) -> Tuple[List[Tuple[str, List[str]]], List[Tuple[str, str, float]]]:
+    """
+    Pick canonical files and the duplicates merged into each
+
+    Files are visited newest first; each unused file absorbs the unused files
+    paired with it directly, so a duplicate always meets the merge threshold
+    against its canonical file (A~B and B~C never merge A with C through B).
+
+    Args:
+        pairs: (path_a, path_b, similarity) at or above the merge threshold
+        mtimes: path -> modification time
+
+    Returns:
+        ([(canonical, [duplicates])], pairs left unmerged)
+    """
+    neighbours: Dict[str, Set[str]] = {}
+    for a, b, _ in pairs:
+        neighbours.setdefault(a, set()).add(b)
+        neighbours.setdefault(b, set()).add(a)
+
+    used: Set[str] = set()
+    groups = []
+    for canonical in sorted(neighbours, key=lambda p: (mtimes.get(p, 0), p), reverse=True):
+        if canonical in used:
+            continue
+        duplicates = sorted(p for p in neighbours[canonical] if p not in used)
+        if not duplicates:
+            continue
+        used.add(canonical)
+        used.update(duplicates)
+        groups.append((canonical, duplicates))
+
+    merged_pairs = {frozenset((canonical, d)) for canonical, duplicates in groups for d in duplicates}
+    leftover = [pair for pair in pairs if frozenset(pair[:2]) not in merged_pairs]
+    return groups, leftover
+
+
+def _corpus_size(memories_path: Path) -> Dict[str, int]:
+    """Count memory files and bytes"""
+    files = 0
+    size = 0
+    for path in memories_path.rglob("*.md"):
+        try:
+            size += path.stat().st_size
+            files += 1
+        except OSError:
+            continue
+    return {"files": files, "bytes": size}
+
+
+def _paragraphs(body: str) -> List[str]:
+    return [p.strip() for p in re.split(r"\n\s*\n", body) if p.strip()]
+
+
+def _merge_into(canonical: Path, duplicate: Path, canonical_rel: str, duplicate_rel: str) -> None:
+    """Append paragraphs only the duplicate has and record provenance in frontmatter"""
+    content = canonical.read_text(encoding="utf-8")
+    duplicate_content = duplicate.read_text(encoding="utf-8")
+    fields, body = parse_frontmatter(content)
+    _, duplicate_body = parse_frontmatter(duplicate_content)
+
+    known = {re.sub(r"\s+", " ", p) for p in _paragraphs(body)}
+    extra = [p for p in _paragraphs(duplicate_body) if re.sub(r"\s+", " ", p) not in known]
+
+    merged_from = fields.get("merged_from") or []
+    if not isinstance(merged_from, list):
+        merged_from = [merged_from]
+    merged_from.append(duplicate_rel)
+    provenance = f"merged_from: [{', '.join(merged_from)}]"
+
+    if content.startswith("---") and content.find("\n---", 3) != -1:
+        end = content.find("\n---", 3)
+        header_lines = []
+        in_merged_from = False
+        for line in content[3:end].strip("\n").splitlines():
+            # Drop the old merged_from key and its "- item" continuation lines
+            if line.startswith("merged_from:"):
+                in_merged_from = True
+                continue
+            if in_merged_from and line.strip().startswith("- "):
+                continue
+            in_merged_from = False
+            header_lines.append(line)
+        header = "\n".join(header_lines)
+        content = f"---\n{header}\n{provenance}\n---\n{body}"
+    else:
+        content = f"---\n{provenance}\n---\n{content}"
+
+    if extra:
+        content = content.rstrip("\n") + f"\n\n## Merged from {duplicate_rel}\n\n" + "\n\n".join(extra) + "\n"
+
+    write_memory_file(canonical_rel, content)
+
+
+def _rewrite_index(memories_path: Path, replacements: Dict[str, str]) -> None:
+    """Point index.md lines at the canonical files (dropping lines that become duplicates)"""
+    index_path = memories_path / INDEX_FILE_NAME
+    if not replacements or not index_path.exists():
+        return
+
+    lines = []
+    seen = set()
+    for line in index_path.read_text(encoding="utf-8").splitlines():
+        for old, new in replacements.items():
+            if old in line:
+                line = line.replace(old, new)
+                if line in seen:
+                    line = None
+                break
+        if line is None:
+            continue
+        if line.strip():
+            seen.add(line)
+        lines.append(line)
+
+    write_memory_file(INDEX_FILE_NAME, "\n".join(lines) + "\n")
+
+
+def compact_memories() -> Dict[str, Any]:
+    """
+    Run one compaction pass over the memories folder
+
+    Returns:
+        Summary: {"before", "after", "merged", "flagged", "report"}
+    """
+    settings = get_settings()
+    base_dir = settings.FILESYSTEM_BASE_DIR or os.getcwd()
+    memories_path = Path(base_dir) / "memories"
+    if not memories_path.exists():
+        return {}
+
+    before = _corpus_size(memories_path)
+
+    # Shingle every file, grouped by category
+    categories: Dict[str, Dict[str, Set[str]]] = {}
+    mtimes: Dict[str, float] = {}
+    identities: Dict[str, Tuple[Any, ...]] = {}
+    for path in memories_path.rglob("*.md"):
+        rel_path = path.relative_to(memories_path).as_posix()
+        if rel_path == INDEX_FILE_NAME or "/" not in rel_path or rel_path.startswith(EXCLUDED_PREFIXES):
+            continue
+        try:
+            content = path.read_text(encoding="utf-8")
+            mtimes[rel_path] = path.stat().st_mtime
+        except (OSError, UnicodeDecodeError):
+            continue
+        fields, body = parse_frontmatter(content)
+        shingle_set = shingles(body)
+        if len(shingle_set) < MIN_SHINGLES:
+            continue
+        identities[rel_path] = _identity(fields)
+        categories.setdefault(rel_path.split("/", 1)[0], {})[rel_path] = shingle_set
+
+    flagged = []
+    merge_pairs = []
+    for category, docs in categories.items():
+        for a, b, similarity in find_similar_pairs(docs, settings.MEMORY_COMPACTION_FLAG_THRESHOLD):
+            if identities[a] != identities[b]:
+                flagged.append({"paths": [a, b], "similarity": similarity, "reason": "different channel_id/user_id"})
+            elif similarity >= settings.MEMORY_COMPACTION_MERGE_THRESHOLD:
+                merge_pairs.append((a, b, similarity))
+            else:
+                flagged.append({"paths": [a, b], "similarity": similarity})
+
+    groups, leftover = _merge_groups(merge_pairs, mtimes)
+    for a, b, similarity in leftover:
+        flagged.append({"paths": [a, b], "similarity": similarity, "reason": "merged with another file"})
+
+    run_dir = get_archive_root() / f"compaction_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    merged = []
+    replacements: Dict[str, str] = {}
+    for canonical_rel, duplicates in groups:
+        canonical = memories_path / canonical_rel
+        for duplicate_rel in duplicates:
+            duplicate = memories_path / duplicate_rel
+            try:
+                _merge_into(canonical, duplicate, canonical_rel, duplicate_rel)
+                archived = run_dir / duplicate_rel
+                archived.parent.mkdir(parents=True, exist_ok=True)
+                shutil.move(str(duplicate), str(archived))
+            except (OSError, UnicodeDecodeError) as e:
+                logging.warning(f"[MEMORY_COMPACTION] Failed to merge {duplicate_rel} into {canonical_rel}: {e}")
+                continue
+            replacements[duplicate_rel] = canonical_rel
+            merged.append({"into": canonical_rel, "from": duplicate_rel})
+
+    _rewrite_index(memories_path, replacements)
+    after = _corpus_size(memories_path)
+
+    report_path = None
+    if merged or flagged:
+        run_dir.mkdir(parents=True, exist_ok=True)
+        report_path = run_dir / "report.md"
+        lines = [
+            f"# Memory compaction {run_dir.name}",
+            "",
+            f"- Before: {before['files']} files, {before['bytes']} bytes",
+            f"- After: {after['files']} files, {after['bytes']} bytes",
+            "",
+            "## Merged (duplicates archived in this folder)",
+            *[f"- {m['from']} -> {m['into']}" for m in merged],
+            "",
+            "## Flagged (similar, not merged)",
+            *[
+                f"- {f['paths'][0]} ~ {f['paths'][1]} ({f['similarity']}"
+                + (f", {f['reason']})" if f.get("reason") else ")")
+                for f in flagged
+            ],
+        ]
+        report_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    logging.info(
+        f"[MEMORY_COMPACTION] {before['files']} files / {before['bytes']} bytes -> "
+        f"{after['files']} files / {after['bytes']} bytes (merged {len(merged)}, flagged {len(flagged)})"
+    )
+    return {
+        "before": before,
+        "after": after,
+        "merged": merged,
+        "flagged": flagged,
+        "report": str(report_path) if report_path else None,
+    }
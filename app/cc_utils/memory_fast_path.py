@@ -0,0 +1,183 @@
+"""
+Memory Save Fast Path
+Deterministic pre-classifier for operator memory saves, so only conversations
+worth summarizing start a memory manager session:
+
+- drop: greetings, thanks and acknowledgements answered with the same carry
+  nothing to remember (a short "네" whose turn did real work is not dropped)
+- direct: a single short statement of a channel guideline or a user preference
+  is appended to the channel / user memory file as a bullet, without an LLM
+- agent: everything else goes to the memory manager as before
+
+Rules are intentionally conservative; anything ambiguous goes to the agent.
+"""
+
+import logging
+import re
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from app.cc_utils import memory_store
+from app.cc_utils.memory_index import parse_frontmatter
+from app.cc_utils.memory_index_md import insert_under_heading
+from app.cc_utils.memory_snapshots import write_memory_file
+
+# Longest request (characters) still treated as a single structured fact
+MAX_DIRECT_CHARS = 200
+
+CHANNEL_GUIDELINE_HEADING = "## 채널 가이드라인"
+USER_PREFERENCE_HEADING = "## 선호 사항"
+
+# Slack mentions, emoji shortcodes and links
+_NOISE_RE = re.compile(r"<[@#!][^>]*>|<https?://[^>]*>|:[a-z0-9_+\-]+:")
+_PUNCT_RE = re.compile(r"[\s~!?.,^()\[\]\"'ㅠㅜ]+")
+
+# Whole messages that are only a greeting, thanks or acknowledgement
+_TRIVIAL_RE = re.compile(
+    r"^((안녕|하이|헬로|좋은아침|고마워|고맙|감사|땡큐|수고|넵|네|넹|예|응|웅|ㅇㅇ|ㅇㅋ|오케이|알겠|좋아|굿|"
+    r"천만에|별말씀을?|ㅋ+|ㅎ+|hi|hello|hey|thanks|thankyou|thx|ty|ok|okay|good|great|nice|cool|lgtm|"
+    r"yourewelcome|welcome|noproblem|np)"
+    r"(요|어요|아요|습니다|합니다|해요|해|했어요|하셨습니다|세요|하세요|니다|다)*)+$",
+    re.IGNORECASE,
+)
+
+# Requests that must not become a standing fact (scheduling is never stored)
+_SCHEDULE_RE = re.compile(r"매일|매주|매달|매월|시마다|분마다|리마인드|알림|스케줄|예약|remind|schedule", re.IGNORECASE)
+
+# A rule or instruction ("...받아야 해", "...하세요", "...하지 마", "...금지", "...로 해줘")
+_INSTRUCTION_RE = re.compile(r"(야 ?(해|합|돼|됩)|하세요|주세요|해 ?줘|지 ?(마|말)|금지|로 해|할 것|합시다)")
+# Standing rules, not one-off tasks ("이 채널에서는 ...", not "이 채널 대화 요약해줘")
+_CHANNEL_RULE_RE = re.compile(r"(이 ?채널|여기)(에서는|에선|서는|선)|채널 ?(규칙|가이드)")
+_STANDING_RE = re.compile(r"^(앞으로|다음부터|항상)\s")
+_PREFERENCE_RE = re.compile(r"선호|좋아해|싫어해")
+
+
+def _clean(text: str) -> str:
+    """Strip mentions, emoji and surrounding whitespace"""
+    return _NOISE_RE.sub(" ", text or "").strip()
+
+
+def _is_trivial(text: str) -> bool:
+    """Whether a message is only a greeting, thanks or acknowledgement (or empty)"""
+    compact = _PUNCT_RE.sub("", _clean(text))
+    return not compact or bool(_TRIVIAL_RE.match(compact))
+
+
+def classify_save(query: str, final_message: str) -> Dict[str, Any]:
+    """
+    Decide how a finished conversation is saved
+
+    Args:
+        query: User request
+        final_message: Final answer / work log of the operator
+
+    Returns:
+        {"action": "drop"}, {"action": "agent"}, or
+        {"action": "direct", "kind": "channel_guideline" | "user_preference", "text": str}
+    """
+    text = _clean(query)
+
+    # A short follow-up ("네") can still have done real work in its turn
+    if _is_trivial(text) and _is_trivial(final_message):
+        return {"action": "drop"}
+
+    # Multi-line requests, long answers with work done, or scheduling go to the agent
+    if (
+        "\n" in text
+        or len(text) > MAX_DIRECT_CHARS
+        or len(final_message or "") > MAX_DIRECT_CHARS * 2
+        or _SCHEDULE_RE.search(text)
+    ):
+        return {"action": "agent"}
+
+    if _CHANNEL_RULE_RE.search(text) and _INSTRUCTION_RE.search(text):
+        return {"action": "direct", "kind": "channel_guideline", "text": text}
+    # Preferences also need the standing form: "선호하는 회식 장소 찾아줘" is a task, not a preference
+    if _STANDING_RE.search(text) and (_INSTRUCTION_RE.search(text) or _PREFERENCE_RE.search(text)):
+        return {"action": "direct", "kind": "user_preference", "text": text}
+
+    return {"action": "agent"}
+
+
+def _find_existing(category: str, id_field: str, id_value: str) -> Optional[str]:
+    """Return the memory file already describing this channel / user, if any"""
+    from app.cc_utils.memory_catalog_db import query_catalog
+
+    try:
+        entries = query_catalog(category=category, **{id_field: id_value}, limit=1)
+    except Exception as e:
+        logging.warning(f"[MEMORY_FAST_PATH] Catalog lookup failed: {e}")
+        return None
+    return entries[0]["path"] if entries else None
+
+
+def _new_file(fields: Dict[str, Any], title: str) -> str:
+    header = "\n".join(
+        f"{key}: [{', '.join(value)}]" if isinstance(value, list) else f"{key}: {value}"
+        for key, value in fields.items()
+        if value
+    )
+    return f"---\n{header}\n---\n# {title}\n"
+
+
+def write_fact(fact: Dict[str, Any]) -> Optional[str]:
+    """
+    Append a classified fact to its channel / user memory file (runs on the memory worker)
+
+    Args:
+        fact: {"kind", "text", "channel_id", "channel_name", "channel_type", "user_id", "user_name"}
+
+    Returns:
+        Relative path of the written file, or None if the fact was already stored
+    """
+    today = datetime.now().strftime("%Y-%m-%d")
+
+    if fact["kind"] == "channel_guideline":
+        rel_path = _find_existing("channels", "channel_id", fact["channel_id"]) or f"channels/{fact['channel_id']}.md"
+        heading = CHANNEL_GUIDELINE_HEADING
+        template = _new_file(
+            {
+                "type": "channel",
+                "channel_id": fact["channel_id"],
+                "channel_name": fact.get("channel_name"),
+                "channel_type": fact.get("channel_type"),
+                "title": f"{fact.get('channel_name') or fact['channel_id']} 채널",
+                "tags": ["guideline"],
+                "updated_at": today,
+            },
+            f"{fact.get('channel_name') or fact['channel_id']} 채널",
+        )
+        author = f", {fact['user_name']}" if fact.get("user_name") else ""
+        entry = f"- {fact['text']} ({today}{author})"
+    else:
+        rel_path = _find_existing("users", "user_id", fact["user_id"]) or f"users/{fact['user_id']}.md"
+        heading = USER_PREFERENCE_HEADING
+        template = _new_file(
+            {
+                "type": "user",
+                "user_id": fact["user_id"],
+                "name": fact.get("user_name"),
+                "title": fact.get("user_name") or fact["user_id"],
+                "tags": ["preference"],
+                "updated_at": today,
+            },
+            fact.get("user_name") or fact["user_id"],
+        )
+        entry = f"- {fact['text']} ({today})"
+
+    path = memory_store.get_memories_path() / rel_path
+    content = path.read_text(encoding="utf-8") if path.exists() else template
+
+    # The same statement saved again adds nothing
+    _, body = parse_frontmatter(content)
+    if f"- {fact['text']} (" in body:
+        return None
+
+    if content.startswith("---"):
+        content = re.sub(r"^updated_at:.*$", f"updated_at: {today}", content, count=1, flags=re.MULTILINE)
+    lines = content.rstrip("\n").splitlines()
+    insert_under_heading(lines, heading, entry)
+
+    write_memory_file(rel_path, "\n".join(lines) + "\n")
+    logging.info(f"[MEMORY_FAST_PATH] {fact['kind']} written to {rel_path}")
+    return rel_path
@@ -0,0 +1,412 @@
+"""
+Memory BM25 Index
+Local inverted index over the memories folder (markdown body + YAML frontmatter)
+so the memory retriever gets candidate files without browsing with tool calls
+"""
+
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.config.settings import get_settings
+from app.cc_utils import memory_store
+
+# BM25 parameters
+K1 = 1.5
+B = 0.75
+
+# Frontmatter and path tokens count more than body tokens
+FIELD_WEIGHT = 3
+
+# Hangul syllables are indexed as character bigrams (no morphological analyzer needed)
+_HANGUL_RE = re.compile(r"[가-힣]+")
+_TOKEN_RE = re.compile(r"[가-힣]+|[A-Za-z0-9_]+")
+
+# Words from the fixed retrieval query templates that carry no meaning
+STOPWORDS = {
+    "the", "a", "an", "and", "or", "of", "to", "in", "on", "for", "with", "about", "is", "are",
+    "be", "this", "that", "please", "gather", "provide", "memory", "memories", "needed",
+    "fulfill", "user", "users", "request", "channel", "sure", "include", "guidelines",
+    "information", "requesting", "id", "name", "s", "made", "check", "if", "i", "ve",
+    "done", "similar", "work", "before",
+}
+
+INDEX_FILE_NAME = "index.md"
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into index terms
+
+    - ASCII words are lowercased (Slack IDs like U123ABC become u123abc)
+    - Hangul words become character bigrams plus the word itself, so
+      "회식장소를" still matches "회식" and "장소"
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of terms
+    """
+    terms = []
+    for word in _TOKEN_RE.findall(text or ""):
+        if _HANGUL_RE.fullmatch(word):
+            if len(word) == 1:
+                terms.append(word)
+                continue
+            terms.extend(word[i:i + 2] for i in range(len(word) - 1))
+            if len(word) > 2:
+                terms.append(word)
+        else:
+            lowered = word.lower()
+            if lowered not in STOPWORDS:
+                terms.append(lowered)
+    return terms
+
+
+def parse_frontmatter(content: str) -> Tuple[Dict[str, Any], str]:
+    """
+    Split a memory file into frontmatter fields and body
+
+    Only the flat "key: value" and "key: [a, b]" / "- item" list forms used by
+    memory files are supported.
+
+    Args:
+        content: Full markdown file content
+
+    Returns:
+        (frontmatter dict, body)
+    """
+    if not content.startswith("---"):
+        return {}, content
+
+    end = content.find("\n---", 3)
+    if end == -1:
+        return {}, content
+
+    fields: Dict[str, Any] = {}
+    current_key = None
+    for line in content[3:end].strip("\n").splitlines():
+        if not line.strip():
+            continue
+        stripped = line.strip()
+        if stripped.startswith("- ") and current_key:
+            if not isinstance(fields.get(current_key), list):
+                fields[current_key] = []
+            fields[current_key].append(stripped[2:].strip().strip("'\""))
+            continue
+        if ":" not in line:
+            continue
+        key, value = line.split(":", 1)
+        current_key = key.strip()
+        value = value.strip()
+        if value.startswith("[") and value.endswith("]"):
+            fields[current_key] = [v.strip().strip("'\"") for v in value[1:-1].split(",") if v.strip()]
+        else:
+            fields[current_key] = value.strip("'\"")
+
+    body = content[end + 4:].lstrip("\n")
+    return fields, body
+
+
+def frontmatter_text(fields: Dict[str, Any]) -> str:
+    """Flatten frontmatter values into one string"""
+    parts = []
+    for value in fields.values():
+        if isinstance(value, list):
+            parts.extend(str(v) for v in value)
+        else:
+            parts.append(str(value))
+    return " ".join(parts)
+
+
+class MemoryIndex:
+    """BM25 index over {FILESYSTEM_BASE_DIR}/memories, refreshed incrementally from the change feed"""
+
+    def __init__(self, memories_path: str):
+        self.memories_path = Path(memories_path)
+        # relative path -> {"mtime", "length", "tf", "frontmatter", "size"}
+        self.docs: Dict[str, Dict[str, Any]] = {}
+        # Inverted index: term -> {relative path: term frequency}
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.total_length = 0
+        # Last memory change journal sequence applied (None until the first full scan)
+        self.cursor: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _add_doc(self, rel_path: str, mtime: float, content: str) -> None:
+        fields, body = parse_frontmatter(content)
+        field_terms = tokenize(frontmatter_text(fields)) + tokenize(rel_path.replace("/", " ").replace(".md", ""))
+        terms = tokenize(body) + field_terms * FIELD_WEIGHT
+        tf = Counter(terms)
+
+        self.docs[rel_path] = {
+            "mtime": mtime,
+            "length": len(terms),
+            "tf": tf,
+            "frontmatter": fields,
+            "size": len(content),
+        }
+        for term, freq in tf.items():
+            self.postings.setdefault(term, {})[rel_path] = freq
+        self.total_length += len(terms)
+
+    def _remove_doc(self, rel_path: str) -> None:
+        doc = self.docs.pop(rel_path, None)
+        if not doc:
+            return
+        for term in doc["tf"]:
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            posting.pop(rel_path, None)
+            if not posting:
+                del self.postings[term]
+        self.total_length -= doc["length"]
+
+    def _reindex(self, rel_path: str, path: Path, mtime: float) -> bool:
+        """(Re)index one file if its mtime changed (caller holds _lock)"""
+        doc = self.docs.get(rel_path)
+        if doc and doc["mtime"] == mtime:
+            return False
+
+        try:
+            content = path.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError) as e:
+            logging.warning(f"[MEMORY_INDEX] Failed to read {rel_path}: {e}")
+            return False
+
+        self._remove_doc(rel_path)
+        self._add_doc(rel_path, mtime, content)
+        return True
+
+    def _apply_changes(self, paths: Set[str]) -> int:
+        """Update only the given files (caller holds _lock)"""
+        changed = 0
+        for rel_path in paths:
+            if rel_path == INDEX_FILE_NAME:
+                continue
+            path = self.memories_path / rel_path
+            try:
+                mtime = path.stat().st_mtime
+            except OSError:
+                if rel_path in self.docs:
+                    self._remove_doc(rel_path)
+                    changed += 1
+                continue
+            if self._reindex(rel_path, path, mtime):
+                changed += 1
+        return changed
+
+    def refresh(self) -> int:
+        """
+        Re-index files added, changed or removed since the last refresh
+
+        While the memory change feed is running only the journaled changes are
+        applied; otherwise (or if the journal was truncated) the folder is rescanned.
+
+        Returns:
+            Number of files (re)indexed or removed
+        """
+        if not self.memories_path.exists():
+            return 0
+
+        with self._lock:
+            changes = None
+            if self.cursor is not None and memory_store.is_watching():
+                changes = memory_store.changes_since(self.cursor)
+
+            if changes is not None:
+                if not changes:
+                    return 0
+                changed = self._apply_changes({change["path"] for change in changes})
+                self.cursor = changes[-1]["seq"]
+            else:
+                self.cursor = memory_store.get_generation()
+                changed = self._rescan()
+
+            if changed:
+                logging.info(f"[MEMORY_INDEX] Indexed {changed} changed files ({len(self.docs)} total)")
+            return changed
+
+    def _rescan(self) -> int:
+        """Walk the whole folder and compare mtimes (caller holds _lock)"""
+        seen = set()
+        changed = 0
+        for path in self.memories_path.rglob("*.md"):
+            rel_path = path.relative_to(self.memories_path).as_posix()
+            if rel_path == INDEX_FILE_NAME:
+                continue
+            seen.add(rel_path)
+
+            try:
+                mtime = path.stat().st_mtime
+            except OSError:
+                continue
+
+            if self._reindex(rel_path, path, mtime):
+                changed += 1
+
+        for rel_path in list(self.docs.keys()):
+            if rel_path not in seen:
+                self._remove_doc(rel_path)
+                changed += 1
+        return changed
+
+    def search(self, query: str, top_k: int = 8, boost_terms: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Rank memory files for a query with BM25
+
+        Args:
+            query: Search query
+            top_k: Number of results
+            boost_terms: Exact identifiers (channel/user IDs) whose files should rank first
+
+        Returns:
+            List of {"path", "score", "boosted", "frontmatter", "size"} sorted by (boosted, score)
+        """
+        self.refresh()
+
+        with self._lock:
+            if not self.docs:
+                return []
+
+            query_terms = Counter(tokenize(query))
+            boost = {term.lower() for term in (boost_terms or []) if term}
+            query_terms.update({term: 1 for term in boost})
+
+            n_docs = len(self.docs)
+            avg_length = self.total_length / n_docs if n_docs else 0
+
+            # Only documents listed in the query terms' postings are scored
+            doc_scores: Dict[str, float] = {}
+            for term, query_count in query_terms.items():
+                posting = self.postings.get(term)
+                if not posting:
+                    continue
+                df = len(posting)
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                for rel_path, freq in posting.items():
+                    length = self.docs[rel_path]["length"]
+                    norm = freq * (K1 + 1) / (freq + K1 * (1 - B + B * length / (avg_length or 1)))
+                    doc_scores[rel_path] = doc_scores.get(rel_path, 0.0) + idf * norm * query_count
+
+            # Files named after the current channel/user are always relevant
+            # (their path terms put them in the boost terms' postings)
+            scores = [
+                (Path(rel_path).stem.lower() in boost, score, rel_path)
+                for rel_path, score in doc_scores.items()
+            ]
+
+            scores.sort(reverse=True)
+            return [
+                {
+                    "path": rel_path,
+                    "score": round(score, 3),
+                    "boosted": boosted,
+                    "frontmatter": self.docs[rel_path]["frontmatter"],
+                    "size": self.docs[rel_path]["size"],
+                }
+                for boosted, score, rel_path in scores[:top_k]
+            ]
+
+
+_index: Optional[MemoryIndex] = None
+
+
+def get_memory_index() -> MemoryIndex:
+    """Return the process-wide memory index for FILESYSTEM_BASE_DIR/memories"""
+    global _index
+    settings = get_settings()
+    base_dir = settings.FILESYSTEM_BASE_DIR or os.getcwd()
+    memories_path = os.path.join(base_dir, "memories")
+    if _index is None or str(_index.memories_path) != memories_path:
+        _index = MemoryIndex(memories_path)
+    return _index
+
+
+def search_memories(query: str, top_k: int = 8, boost_terms: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Search memories (never raises; empty list on failure)
+
+    Lexical BM25 results are merged with semantic results from the optional
+    embedding index: both scores are normalized to 0..1 and combined with
+    MEMORY_HYBRID_LEXICAL_WEIGHT. Boosted (current channel/user) files stay first.
+
+    Args:
+        query: Search query
+        top_k: Number of results
+        boost_terms: Exact identifiers (channel/user IDs) whose files should rank first
+
+    Returns:
+        List of {"path", "score", "boosted", "frontmatter", "size"}
+    """
+    try:
+        index = get_memory_index()
+        lexical = index.search(query, top_k=top_k * 2, boost_terms=boost_terms)
+
+        semantic = []
+        if get_settings().MEMORY_EMBEDDING_ENABLED:
+            from app.cc_utils import memory_vectors
+
+            semantic = memory_vectors.search(query, top_k=top_k * 2)
+        if not semantic:
+            return lexical[:top_k]
+
+        weight = get_settings().MEMORY_HYBRID_LEXICAL_WEIGHT
+        max_lexical = max((r["score"] for r in lexical), default=0) or 1.0
+        combined: Dict[str, Dict[str, Any]] = {}
+        for result in lexical:
+            combined[result["path"]] = dict(result, score=weight * result["score"] / max_lexical)
+        for result in semantic:
+            doc = index.docs.get(result["path"])
+            if not doc:
+                continue
+            entry = combined.setdefault(result["path"], {
+                "path": result["path"],
+                "score": 0.0,
+                "boosted": False,
+                "frontmatter": doc["frontmatter"],
+                "size": doc["size"],
+            })
+            entry["score"] += (1 - weight) * max(result["score"], 0.0)
+
+        ranked = sorted(combined.values(), key=lambda r: (r["boosted"], r["score"]), reverse=True)[:top_k]
+        for result in ranked:
+            result["score"] = round(result["score"], 3)
+        return ranked
+    except Exception as e:
+        logging.warning(f"[MEMORY_INDEX] Search failed: {e}")
+        return []
+
+
+def read_memory_files(paths: List[str], max_chars: int, memories_path: Optional[str] = None) -> Optional[str]:
+    """
+    Concatenate candidate memory files if they fit in max_chars
+
+    Args:
+        paths: Relative paths under the memories folder
+        max_chars: Character budget for all files together
+        memories_path: Folder to read from (a memory snapshot; defaults to the live folder)
+
+    Returns:
+        Formatted memory text, or None if the files do not fit
+    """
+    base_path = Path(memories_path) if memories_path else get_memory_index().memories_path
+    sections = []
+    total = 0
+    for rel_path in paths:
+        try:
+            content = (base_path / rel_path).read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            continue
+        total += len(content)
+        if total > max_chars:
+            return None
+        sections.append(f"### {rel_path}\n{content.strip()}")
+    return "\n\n".join(sections) if sections else None
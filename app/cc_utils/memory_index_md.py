@@ -0,0 +1,134 @@
+"""
+Memory index.md Updater
+Applies memory changes to index.md incrementally, so parallel memory writers
+never regenerate (and overwrite) the index at the same time.
+
+Only lines that reference changed files are touched: a changed file's line is
+replaced, a deleted file's line is removed and a new file gets a line under its
+category heading. Everything else in index.md is left as is.
+"""
+
+import logging
+import threading
+from pathlib import Path
+from typing import List, Optional
+
+from app.cc_utils import memory_store
+from app.cc_utils.memory_index import INDEX_FILE_NAME, parse_frontmatter
+from app.cc_utils.memory_snapshots import write_memory_file
+
+# Change feed consumer name for the index updater
+CURSOR_NAME = "index_md"
+
+_lock = threading.Lock()
+
+
+def format_entry(rel_path: str, content: str) -> str:
+    """Build the index line for a memory file"""
+    fields, body = parse_frontmatter(content)
+    title = fields.get("title") or fields.get("name")
+    if not title:
+        heading = next((line for line in body.splitlines() if line.startswith("#")), "")
+        title = heading.lstrip("#").strip() or Path(rel_path).stem
+
+    line = f"- {rel_path}: {title}"
+    tags = fields.get("tags")
+    if tags:
+        line += f" (tags: {', '.join(tags) if isinstance(tags, list) else tags})"
+    return line
+
+
+def insert_under_heading(lines: List[str], heading: str, entry: str) -> None:
+    """Append an entry at the end of a "## " section (creating the heading if missing)"""
+    try:
+        start = next(i for i, line in enumerate(lines) if line.strip() == heading)
+    except StopIteration:
+        if lines and lines[-1].strip():
+            lines.append("")
+        lines.extend([heading, entry])
+        return
+
+    end = start + 1
+    while end < len(lines) and not lines[end].startswith("#"):
+        end += 1
+    # Keep trailing blank lines after the entries
+    while end > start + 1 and not lines[end - 1].strip():
+        end -= 1
+    lines.insert(end, entry)
+
+
+def apply_index_updates() -> int:
+    """
+    Bring index.md up to date with memory changes since the last update
+
+    Returns:
+        Number of index entries added, replaced or removed
+    """
+    memories_path = memory_store.get_memories_path()
+    index_path = memories_path / INDEX_FILE_NAME
+
+    with _lock:
+        generation = memory_store.sync()
+        cursor = memory_store.get_cursor(CURSOR_NAME)
+        if cursor is None:
+            # Start from the index as it exists now
+            memory_store.set_cursor(CURSOR_NAME, generation)
+            return 0
+
+        changes = memory_store.changes_since(cursor)
+        if changes == []:
+            return 0
+
+        if changes is None:
+            # Journal truncated: reconcile every file against the index
+            paths = {p.relative_to(memories_path).as_posix() for p in memories_path.rglob("*.md")}
+        else:
+            paths = {change["path"] for change in changes}
+            generation = changes[-1]["seq"]
+        paths.discard(INDEX_FILE_NAME)
+
+        try:
+            lines = index_path.read_text(encoding="utf-8").splitlines() if index_path.exists() else ["# Memory Index"]
+        except (OSError, UnicodeDecodeError) as e:
+            logging.warning(f"[MEMORY_INDEX_MD] Failed to read index.md: {e}")
+            return 0
+
+        if changes is None:
+            # Also drop entries of files that no longer exist
+            for line in lines:
+                for token in line.split():
+                    token = token.strip("[]()`:,")
+                    if token.endswith(".md") and "/" in token and not (memories_path / token).exists():
+                        paths.add(token)
+
+        updated = 0
+        for rel_path in sorted(paths):
+            path = memories_path / rel_path
+            entry: Optional[str] = None
+            if path.exists():
+                try:
+                    entry = format_entry(rel_path, path.read_text(encoding="utf-8"))
+                except (OSError, UnicodeDecodeError):
+                    continue
+
+            matches = [i for i, line in enumerate(lines) if rel_path in line]
+            if entry is None:
+                for i in reversed(matches):
+                    del lines[i]
+                updated += bool(matches)
+            elif matches:
+                if lines[matches[0]] != entry:
+                    lines[matches[0]] = entry
+                    updated += 1
+                for i in reversed(matches[1:]):
+                    del lines[i]
+            elif "/" in rel_path:
+                insert_under_heading(lines, f"## {rel_path.split('/', 1)[0]}", entry)
+                updated += 1
+
+        if updated:
+            write_memory_file(INDEX_FILE_NAME, "\n".join(lines) + "\n")
+            logging.info(f"[MEMORY_INDEX_MD] Updated {updated} index entries")
+
+        memory_store.set_cursor(CURSOR_NAME, generation)
+        return updated
@@ -0,0 +1,149 @@
+"""
+Memory Write Scopes
+Limits each memory manager session to the files of one entity, so sessions on
+different memory shards never edit the same file:
+
+- "channel:<id>": the channel's file (channels/<id>.md or the file cataloged for it)
+- "user:<id>": the user's file (users/<id>.md or the file cataloged for it)
+- "file:<path>": one topic file (projects/, tasks/, decisions/, ...)
+- any other key (e.g. "confluence"): no files; every write is handed off
+
+The scope doubles as the memory shard key, so all writes to an entity run in
+order on one shard. Writes to other entities are handed off as separate jobs
+keyed by shard_key_for_path().
+
+Enforced with PreToolUse hooks: Write/Edit/MultiEdit outside the scope are
+denied, and Bash may not write into the memories folder (add_memory.py picks
+its own target files, so it cannot honor a scope).
+"""
+
+import re
+from pathlib import Path
+from typing import Any, Dict, Optional, Set
+
+from app.cc_utils import memory_store
+from app.cc_utils.memory_index import INDEX_FILE_NAME, parse_frontmatter
+
+CHANNEL_PREFIX = "channel:"
+USER_PREFIX = "user:"
+FILE_PREFIX = "file:"
+
+# Folders whose files belong to one channel / user
+_ENTITY_CATEGORIES = {"channels": ("channel_id", CHANNEL_PREFIX), "users": ("user_id", USER_PREFIX)}
+
+# Shell commands that write files (reads such as cat/ls/grep stay allowed)
+_BASH_WRITE_RE = re.compile(r"add_memory\.py|update_index\.py|(?<![0-9&])>(?!&)|\btee\b|\bmv\b|\bcp\b|\brm\b|\btouch\b|\bsed\s+-i|\bmkdir\b|\bln\b")
+
+_FILE_TOOLS = ("Write", "Edit", "MultiEdit")
+
+
+def normalize_path(path: str) -> Optional[str]:
+    """
+    Relative memory path for an absolute or relative file path
+
+    Returns:
+        Path relative to the memories folder, or None if it is outside of it
+    """
+    memories_path = memory_store.get_memories_path().resolve()
+    candidate = Path(path)
+    if not candidate.is_absolute():
+        candidate = memories_path / candidate
+    try:
+        return candidate.resolve().relative_to(memories_path).as_posix()
+    except ValueError:
+        return None
+
+
+def shard_key_for_path(rel_path: str) -> str:
+    """Scope / shard key of the entity a memory file belongs to"""
+    category, _, name = rel_path.partition("/")
+    if category in _ENTITY_CATEGORIES and name:
+        id_field, prefix = _ENTITY_CATEGORIES[category]
+        entity_id = Path(name).stem
+        path = memory_store.get_memories_path() / rel_path
+        if path.exists():
+            try:
+                fields, _ = parse_frontmatter(path.read_text(encoding="utf-8"))
+                entity_id = fields.get(id_field) or entity_id
+            except (OSError, UnicodeDecodeError):
+                pass
+        return f"{prefix}{entity_id}"
+    return f"{FILE_PREFIX}{rel_path}"
+
+
+def writable_paths(shard_key: Optional[str]) -> Set[str]:
+    """
+    Memory files a session with this scope may write (blocking: reads the catalog)
+
+    Args:
+        shard_key: Scope / shard key of the job
+
+    Returns:
+        Relative paths under the memories folder
+    """
+    from app.cc_utils.memory_catalog_db import query_catalog
+
+    if not shard_key:
+        return set()
+    if shard_key.startswith(FILE_PREFIX):
+        rel_path = shard_key[len(FILE_PREFIX):]
+        return {rel_path} if rel_path != INDEX_FILE_NAME else set()
+
+    for category, (id_field, prefix) in _ENTITY_CATEGORIES.items():
+        if shard_key.startswith(prefix):
+            entity_id = shard_key[len(prefix):]
+            paths = {f"{category}/{entity_id}.md"}
+            paths.update(entry["path"] for entry in query_catalog(category=category, **{id_field: entity_id}))
+            return paths
+    return set()
+
+
+def _deny(reason: str) -> Dict[str, Any]:
+    return {
+        "hookSpecificOutput": {
+            "hookEventName": "PreToolUse",
+            "permissionDecision": "deny",
+            "permissionDecisionReason": reason,
+        }
+    }
+
+
+def create_scope_hooks(allowed: Set[str]) -> Dict[str, Any]:
+    """
+    PreToolUse hooks enforcing a write scope (for ClaudeAgentOptions.hooks)
+
+    Args:
+        allowed: Relative memory paths the session may write
+
+    Returns:
+        Hooks dict
+    """
+    from claude_agent_sdk import HookMatcher
+
+    memories_path = str(memory_store.get_memories_path().resolve())
+    handoff_hint = "다른 파일에 저장할 내용은 hand_off_memory 도구로 넘기세요."
+
+    async def check_file_write(input_data, tool_use_id, context):
+        file_path = (input_data.get("tool_input") or {}).get("file_path")
+        if not file_path:
+            return {}
+        rel_path = normalize_path(file_path)
+        if rel_path is None or rel_path in allowed:
+            return {}
+        if allowed:
+            return _deny(f"이 메모리 작업은 {', '.join(sorted(allowed))}만 수정할 수 있습니다. {handoff_hint}")
+        return _deny(f"이 메모리 작업은 파일을 직접 수정할 수 없습니다. {handoff_hint}")
+
+    async def check_bash(input_data, tool_use_id, context):
+        command = (input_data.get("tool_input") or {}).get("command", "")
+        touches_memories = memories_path in command or "memories/" in command or "add_memory.py" in command
+        if touches_memories and _BASH_WRITE_RE.search(command):
+            return _deny(f"memories 폴더는 Bash로 수정할 수 없습니다. 허용된 파일은 Edit/Write 도구로 수정하세요. {handoff_hint}")
+        return {}
+
+    return {
+        "PreToolUse": [
+            HookMatcher(matcher="|".join(_FILE_TOOLS), hooks=[check_file_write]),
+            HookMatcher(matcher="Bash", hooks=[check_bash]),
+        ]
+    }
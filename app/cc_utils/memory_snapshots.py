@@ -0,0 +1,178 @@
+"""
+Memory Snapshots
+Generation-numbered, read-only snapshots of the memories folder so readers
+(memory retriever sessions) see a consistent view while writers keep working
+on the live folder without locks.
+
+A snapshot is published after each memory write completes:
+{FILESYSTEM_BASE_DIR}/memories_snapshots/<generation>/. Unchanged files are
+hard-linked from the previous snapshot and changed files are copied from the
+live folder, so publishing copies only what changed. Writers never touch snapshot
+inodes (live files are always copied, never linked), and a snapshot directory
+is built under a temporary name and renamed into place.
+"""
+
+import logging
+import os
+import shutil
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+from app.config.settings import get_settings
+from app.cc_utils import memory_store
+
+_lock = threading.Lock()
+# Serializes publishers; readers only take _lock briefly
+_publish_lock = threading.Lock()
+# (generation, path) of the newest published snapshot
+_current: Optional[Tuple[int, Path]] = None
+# Readers currently holding each snapshot generation
+_refs: Counter = Counter()
+
+
+def get_snapshots_root() -> Path:
+    """Return the folder holding all snapshots"""
+    settings = get_settings()
+    base_dir = settings.FILESYSTEM_BASE_DIR or os.getcwd()
+    return Path(base_dir) / "memories_snapshots"
+
+
+def _published() -> list:
+    """Return published snapshot generations on disk, oldest first"""
+    root = get_snapshots_root()
+    if not root.exists():
+        return []
+    return sorted(int(p.name) for p in root.iterdir() if p.is_dir() and p.name.isdigit())
+
+
+def _latest() -> Optional[Tuple[int, Path]]:
+    """Return the newest snapshot (loaded from disk on first use; caller holds _lock)"""
+    global _current
+    if _current is None:
+        generations = _published()
+        if generations:
+            _current = (generations[-1], get_snapshots_root() / str(generations[-1]))
+    return _current
+
+
+def publish_snapshot() -> Optional[int]:
+    """
+    Publish a snapshot of the live memories folder at the current generation
+
+    Called by the memory worker while no memory job is writing (exclusive memory slot).
+
+    Returns:
+        Published generation, or None if snapshots are disabled
+    """
+    global _current
+    settings = get_settings()
+    if not settings.MEMORY_SNAPSHOTS_ENABLED:
+        return None
+
+    generation = memory_store.sync()
+    memories_path = memory_store.get_memories_path()
+    root = get_snapshots_root()
+
+    with _publish_lock:
+        with _lock:
+            previous = _latest()
+        if previous and previous[0] == generation and previous[1].exists():
+            return generation
+
+        root.mkdir(parents=True, exist_ok=True)
+        building = root / f".building_{generation}"
+        if building.exists():
+            shutil.rmtree(building)
+
+        linked = copied = 0
+        for live_file in memories_path.rglob("*"):
+            # Skip folders and in-progress temp files of atomic writers
+            if not live_file.is_file() or live_file.name.startswith("."):
+                continue
+            rel_path = live_file.relative_to(memories_path)
+            target = building / rel_path
+            target.parent.mkdir(parents=True, exist_ok=True)
+
+            # Reuse the previous snapshot's (never written) inode if the file is unchanged
+            if previous:
+                prev_file = previous[1] / rel_path
+                try:
+                    if prev_file.stat().st_mtime == live_file.stat().st_mtime:
+                        os.link(prev_file, target)
+                        linked += 1
+                        continue
+                except OSError:
+                    pass
+            try:
+                shutil.copy2(live_file, target)
+                copied += 1
+            except OSError as e:
+                logging.warning(f"[MEMORY_SNAPSHOT] Failed to copy {rel_path}: {e}")
+
+        final = root / str(generation)
+        if final.exists():
+            shutil.rmtree(final)
+        os.replace(building, final)
+
+        with _lock:
+            _current = (generation, final)
+            _prune(settings.MEMORY_SNAPSHOT_KEEP)
+        logging.info(f"[MEMORY_SNAPSHOT] Published generation {generation} ({copied} copied, {linked} linked)")
+        return generation
+
+
+def _prune(keep: int) -> None:
+    """Delete old snapshots nobody is reading (caller holds _lock)"""
+    generations = _published()
+    for generation in generations[:-keep] if keep > 0 else []:
+        if _refs.get(generation):
+            continue
+        shutil.rmtree(get_snapshots_root() / str(generation), ignore_errors=True)
+
+
+@contextmanager
+def open_snapshot() -> Iterator[Path]:
+    """
+    Hold the newest snapshot for the duration of a read
+
+    Yields:
+        Snapshot folder (the live memories folder if no snapshot was published)
+    """
+    with _lock:
+        current = _latest() if get_settings().MEMORY_SNAPSHOTS_ENABLED else None
+        if current:
+            _refs[current[0]] += 1
+
+    try:
+        yield current[1] if current else memory_store.get_memories_path()
+    finally:
+        if current:
+            with _lock:
+                _refs[current[0]] -= 1
+                if _refs[current[0]] <= 0:
+                    del _refs[current[0]]
+
+
+def write_memory_file(rel_path: str, content: str) -> Path:
+    """
+    Write a memory file atomically (temp file in the same folder, fsync, rename)
+
+    Args:
+        rel_path: Path relative to the memories folder
+        content: Full file content
+
+    Returns:
+        Absolute path of the written file
+    """
+    path = memory_store.get_memories_path() / rel_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return path
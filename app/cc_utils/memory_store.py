@@ -0,0 +1,380 @@
+"""
+Memory Change Feed
+Journal of memory file changes (added / modified / deleted) stored in SQLite.
+Every change gets a sequence number; the latest sequence is the memory store's
+generation, and consumers keep a cursor and poll changes_since(cursor) or
+subscribe() to change batches.
+
+Changes are detected by diffing file mtimes against the last known state
+(persisted, so edits made while the bot was down are picked up on start).
+A watchdog observer triggers the diff as soon as files change; without
+watchdog a background thread scans every MEMORY_CHANGE_SCAN_INTERVAL_SECONDS.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from app.config.settings import get_settings
+
+# Wait this long after a filesystem event so a burst of writes becomes one batch
+DEBOUNCE_SECONDS = 0.5
+
+_lock = threading.Lock()
+_generation: Optional[int] = None
+_files: Optional[Dict[str, float]] = None
+_subscribers: List[Callable[[List[Dict[str, Any]]], None]] = []
+
+_wake = threading.Event()
+_stop = threading.Event()
+_watcher_thread: Optional[threading.Thread] = None
+_observer = None
+
+
+def get_db_path() -> Path:
+    """Return SQLite database file path"""
+    settings = get_settings()
+    base_dir = settings.FILESYSTEM_BASE_DIR or os.getcwd()
+    db_dir = Path(base_dir) / "db"
+    db_dir.mkdir(parents=True, exist_ok=True)
+    return db_dir / "memory_changes.db"
+
+
+def get_connection() -> sqlite3.Connection:
+    """Return SQLite connection (with Row factory set)"""
+    conn = sqlite3.connect(get_db_path())
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def get_memories_path() -> Path:
+    """Return the memories folder path"""
+    settings = get_settings()
+    base_dir = settings.FILESYSTEM_BASE_DIR or os.getcwd()
+    return Path(base_dir) / "memories"
+
+
+def init_db():
+    """Initialize database and create tables"""
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    # Last known mtime of every memory file
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS memory_files (
+            path TEXT PRIMARY KEY,
+            mtime REAL NOT NULL
+        )
+    """)
+
+    # Change journal (seq is the cursor consumers poll from)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS memory_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            path TEXT NOT NULL,
+            change_type TEXT NOT NULL,
+            mtime REAL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    # Last cursor each named consumer has processed (survives restarts)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS memory_consumers (
+            name TEXT PRIMARY KEY,
+            cursor INTEGER NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    conn.commit()
+    conn.close()
+
+
+def _take_snapshot(memories_path: Path) -> Dict[str, float]:
+    """Map relative path -> mtime for every memory file"""
+    snapshot = {}
+    if not memories_path.exists():
+        return snapshot
+    for path in memories_path.rglob("*.md"):
+        try:
+            snapshot[path.relative_to(memories_path).as_posix()] = path.stat().st_mtime
+        except OSError:
+            continue
+    return snapshot
+
+
+def _load_state(conn: sqlite3.Connection) -> None:
+    """Load known files and the generation from the database (caller holds _lock)"""
+    global _generation, _files
+    if _files is not None:
+        return
+    cursor = conn.cursor()
+    cursor.execute("SELECT path, mtime FROM memory_files")
+    _files = {row["path"]: row["mtime"] for row in cursor.fetchall()}
+    cursor.execute("SELECT COALESCE(MAX(seq), 0) AS seq FROM memory_changes")
+    _generation = cursor.fetchone()["seq"]
+
+
+def scan_changes() -> int:
+    """
+    Record memory files added, changed or removed since the last scan
+
+    Returns:
+        Current generation (sequence number of the latest change)
+    """
+    global _generation, _files
+    settings = get_settings()
+    batch = []
+
+    with _lock:
+        conn = get_connection()
+        try:
+            _load_state(conn)
+            current = _take_snapshot(get_memories_path())
+
+            changes = []
+            for rel_path, mtime in current.items():
+                known = _files.get(rel_path)
+                if known is None:
+                    changes.append((rel_path, "added", mtime))
+                elif known != mtime:
+                    changes.append((rel_path, "modified", mtime))
+            for rel_path in _files:
+                if rel_path not in current:
+                    changes.append((rel_path, "deleted", None))
+
+            if not changes:
+                return _generation
+
+            cursor = conn.cursor()
+            for rel_path, change_type, mtime in sorted(changes):
+                cursor.execute(
+                    "INSERT INTO memory_changes (path, change_type, mtime) VALUES (?, ?, ?)",
+                    (rel_path, change_type, mtime),
+                )
+                batch.append({"seq": cursor.lastrowid, "path": rel_path, "change_type": change_type, "mtime": mtime})
+                if change_type == "deleted":
+                    cursor.execute("DELETE FROM memory_files WHERE path = ?", (rel_path,))
+                else:
+                    cursor.execute(
+                        "INSERT OR REPLACE INTO memory_files (path, mtime) VALUES (?, ?)",
+                        (rel_path, mtime),
+                    )
+
+            # Keep the journal small; cursors older than the kept range get None from changes_since()
+            last_seq = batch[-1]["seq"]
+            cursor.execute(
+                "DELETE FROM memory_changes WHERE seq <= ?",
+                (last_seq - settings.MEMORY_CHANGE_JOURNAL_MAX_ROWS,),
+            )
+            conn.commit()
+
+            _files = current
+            _generation = last_seq
+        finally:
+            conn.close()
+
+    logging.info(f"[MEMORY_STORE] Generation {last_seq}: {len(batch)} files changed")
+    for callback in list(_subscribers):
+        try:
+            callback(batch)
+        except Exception as e:
+            logging.error(f"[MEMORY_STORE] Subscriber failed: {e}")
+    return last_seq
+
+
+def sync() -> int:
+    """
+    Return an up-to-date generation
+
+    With the watcher running the journal is already current, so this is free;
+    otherwise it scans the memories folder.
+    """
+    if is_watching():
+        return get_generation()
+    return scan_changes()
+
+
+def get_generation() -> int:
+    """Return the current generation without scanning"""
+    if _generation is None:
+        with _lock:
+            conn = get_connection()
+            try:
+                _load_state(conn)
+            finally:
+                conn.close()
+    return _generation
+
+
+def changes_since(cursor: int, limit: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+    """
+    Return journal entries after a cursor, oldest first
+
+    Args:
+        cursor: Last sequence number the consumer has seen (0 for everything)
+        limit: Maximum number of entries
+
+    Returns:
+        List of {"seq", "path", "change_type", "mtime", "created_at"}, or None if
+        the journal no longer reaches back to the cursor (consumer should rescan)
+    """
+    if cursor >= get_generation():
+        return []
+
+    conn = get_connection()
+    try:
+        db_cursor = conn.cursor()
+        db_cursor.execute("SELECT MIN(seq) AS seq FROM memory_changes")
+        oldest = db_cursor.fetchone()["seq"]
+        if oldest is None or oldest > cursor + 1:
+            return None
+
+        query = "SELECT seq, path, change_type, mtime, created_at FROM memory_changes WHERE seq > ? ORDER BY seq"
+        params: list = [cursor]
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        db_cursor.execute(query, params)
+        return [dict(row) for row in db_cursor.fetchall()]
+    finally:
+        conn.close()
+
+
+def changed_since(cursor: int) -> Optional[Set[str]]:
+    """
+    Return the set of files changed after a cursor
+
+    Returns:
+        Set of relative paths, or None if the journal no longer reaches back that far
+    """
+    changes = changes_since(cursor)
+    if changes is None:
+        return None
+    return {change["path"] for change in changes}
+
+
+def get_cursor(consumer: str) -> Optional[int]:
+    """
+    Return the stored cursor of a named consumer
+
+    Args:
+        consumer: Consumer name (e.g. "dynamic_suggester")
+
+    Returns:
+        Last processed sequence number, or None if the consumer never stored one
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT cursor FROM memory_consumers WHERE name = ?", (consumer,))
+    row = cursor.fetchone()
+    conn.close()
+    return row["cursor"] if row else None
+
+
+def set_cursor(consumer: str, seq: int) -> None:
+    """
+    Store the cursor of a named consumer
+
+    Args:
+        consumer: Consumer name
+        seq: Last processed sequence number
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        INSERT INTO memory_consumers (name, cursor, updated_at) VALUES (?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(name) DO UPDATE SET cursor = excluded.cursor, updated_at = CURRENT_TIMESTAMP
+        """,
+        (consumer, seq),
+    )
+    conn.commit()
+    conn.close()
+
+
+def subscribe(callback: Callable[[List[Dict[str, Any]]], None]) -> None:
+    """
+    Call back with each batch of changes (runs on the scanning thread)
+
+    Args:
+        callback: Function receiving a list of {"seq", "path", "change_type", "mtime"}
+    """
+    _subscribers.append(callback)
+
+
+def is_watching() -> bool:
+    """Whether the background watcher keeps the journal current"""
+    return _watcher_thread is not None and _watcher_thread.is_alive()
+
+
+def _watch_loop(interval: float) -> None:
+    """Scan on filesystem events (debounced) and at least every interval seconds"""
+    while not _stop.is_set():
+        triggered = _wake.wait(timeout=interval)
+        if _stop.is_set():
+            break
+        if triggered:
+            time.sleep(DEBOUNCE_SECONDS)
+            _wake.clear()
+        try:
+            scan_changes()
+        except Exception as e:
+            logging.error(f"[MEMORY_STORE] Scan failed: {e}")
+
+
+def start_watcher() -> None:
+    """Start the change feed (watchdog observer if available, mtime polling otherwise)"""
+    global _watcher_thread, _observer
+    if is_watching():
+        return
+
+    settings = get_settings()
+    memories_path = get_memories_path()
+    memories_path.mkdir(parents=True, exist_ok=True)
+
+    # Record changes made while the bot was not running
+    scan_changes()
+
+    try:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+
+        class _MemoryEventHandler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if not event.is_directory:
+                    _wake.set()
+
+        _observer = Observer()
+        _observer.schedule(_MemoryEventHandler(), str(memories_path), recursive=True)
+        _observer.daemon = True
+        _observer.start()
+        logging.info("[MEMORY_STORE] Watching memories with watchdog")
+    except Exception as e:
+        _observer = None
+        logging.info(f"[MEMORY_STORE] watchdog unavailable, polling every {settings.MEMORY_CHANGE_SCAN_INTERVAL_SECONDS}s: {e}")
+
+    _stop.clear()
+    _watcher_thread = threading.Thread(
+        target=_watch_loop,
+        args=(settings.MEMORY_CHANGE_SCAN_INTERVAL_SECONDS,),
+        name="memory-change-feed",
+        daemon=True,
+    )
+    _watcher_thread.start()
+
+
+def stop_watcher() -> None:
+    """Stop the change feed"""
+    global _watcher_thread, _observer
+    _stop.set()
+    _wake.set()
+    if _observer is not None:
+        _observer.stop()
+        _observer = None
+    _watcher_thread = None
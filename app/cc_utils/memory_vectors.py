@@ -0,0 +1,250 @@
+"""
+Memory Embedding Index (optional)
+Semantic search over memory chunks with a small local CPU embedding model.
+Vectors are stored as a NumPy matrix under FILESYSTEM_BASE_DIR/db/memory_vectors,
+memory-mapped for search and updated incrementally (only changed files are re-embedded).
+
+Requires the optional `sentence-transformers` package; without it (or with
+MEMORY_EMBEDDING_ENABLED=False) every function is a no-op and search returns [].
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.config.settings import get_settings
+from app.cc_utils.memory_index import INDEX_FILE_NAME, parse_frontmatter, frontmatter_text
+
+# Target chunk size in characters (headings/paragraphs are merged up to this size)
+CHUNK_CHARS = 800
+
+_lock = threading.Lock()
+_model = None
+_model_failed = False
+
+# Loaded state: {"chunks": [...], "files": {path: mtime}, "vectors": np.memmap}
+_state: Dict[str, Any] = {"chunks": [], "files": {}, "vectors": None}
+_loaded_dir: Optional[Path] = None
+
+
+def get_vectors_dir() -> Path:
+    """Return the directory holding vectors.npy and meta.json"""
+    settings = get_settings()
+    base_dir = settings.FILESYSTEM_BASE_DIR or os.getcwd()
+    vectors_dir = Path(base_dir) / "db" / "memory_vectors"
+    vectors_dir.mkdir(parents=True, exist_ok=True)
+    return vectors_dir
+
+
+def get_memories_path() -> Path:
+    """Return the memories folder path"""
+    settings = get_settings()
+    base_dir = settings.FILESYSTEM_BASE_DIR or os.getcwd()
+    return Path(base_dir) / "memories"
+
+
+def is_enabled() -> bool:
+    """Whether semantic search is enabled and the embedding model can be loaded"""
+    return get_settings().MEMORY_EMBEDDING_ENABLED and _get_model() is not None
+
+
+def _get_model():
+    """Load the embedding model once (None if unavailable)"""
+    global _model, _model_failed
+    if _model is not None or _model_failed:
+        return _model
+
+    with _lock:
+        if _model is not None or _model_failed:
+            return _model
+        try:
+            from sentence_transformers import SentenceTransformer
+
+            model_name = get_settings().MEMORY_EMBEDDING_MODEL
+            _model = SentenceTransformer(model_name, device="cpu")
+            logging.info(f"[MEMORY_VECTORS] Loaded embedding model: {model_name}")
+        except ImportError:
+            _model_failed = True
+            logging.warning("[MEMORY_VECTORS] sentence-transformers is not installed, semantic search disabled")
+        except Exception as e:
+            _model_failed = True
+            logging.warning(f"[MEMORY_VECTORS] Failed to load embedding model, semantic search disabled: {e}")
+    return _model
+
+
+def _embed(texts: List[str]) -> np.ndarray:
+    """Embed texts into L2-normalized float32 vectors"""
+    vectors = _get_model().encode(texts, batch_size=32, normalize_embeddings=True, show_progress_bar=False)
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def split_chunks(content: str) -> List[str]:
+    """
+    Split a memory file into chunks (frontmatter values are prepended to each chunk)
+
+    Args:
+        content: Full markdown file content
+
+    Returns:
+        List of chunk texts
+    """
+    fields, body = parse_frontmatter(content)
+    header = frontmatter_text(fields)
+
+    paragraphs = [p.strip() for p in re.split(r"\n(?=#)|\n\s*\n", body) if p.strip()]
+    chunks = []
+    current = ""
+    for paragraph in paragraphs:
+        if current and len(current) + len(paragraph) > CHUNK_CHARS:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n{paragraph}" if current else paragraph
+    if current:
+        chunks.append(current)
+
+    if not chunks:
+        chunks = [""]
+    return [f"{header}\n{chunk}".strip() for chunk in chunks]
+
+
+def _load() -> None:
+    """Load meta.json and memory-map vectors.npy (caller holds _lock)"""
+    global _loaded_dir
+    vectors_dir = get_vectors_dir()
+    if _loaded_dir == vectors_dir:
+        return
+
+    meta_path = vectors_dir / "meta.json"
+    vectors_path = vectors_dir / "vectors.npy"
+    _state.update({"chunks": [], "files": {}, "vectors": None})
+    if meta_path.exists() and vectors_path.exists():
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            vectors = np.load(vectors_path, mmap_mode="r")
+            if len(meta["chunks"]) == vectors.shape[0]:
+                _state.update({"chunks": meta["chunks"], "files": meta["files"], "vectors": vectors})
+        except Exception as e:
+            logging.warning(f"[MEMORY_VECTORS] Failed to load vector index, rebuilding: {e}")
+    _loaded_dir = vectors_dir
+
+
+def refresh() -> int:
+    """
+    Re-embed memory files added or changed since the last refresh and drop removed ones
+
+    Called after the memory manager writes files (and once at startup).
+
+    Returns:
+        Number of files re-embedded or removed
+    """
+    if not is_enabled():
+        return 0
+
+    memories_path = get_memories_path()
+    if not memories_path.exists():
+        return 0
+
+    with _lock:
+        _load()
+
+        current_files = {}
+        for path in memories_path.rglob("*.md"):
+            rel_path = path.relative_to(memories_path).as_posix()
+            if rel_path == INDEX_FILE_NAME:
+                continue
+            try:
+                current_files[rel_path] = path.stat().st_mtime
+            except OSError:
+                continue
+
+        known_files = _state["files"]
+        changed = [p for p, mtime in current_files.items() if known_files.get(p) != mtime]
+        removed = [p for p in known_files if p not in current_files]
+        if not changed and not removed:
+            return 0
+
+        # Keep vectors of unchanged files, embed only the changed ones
+        stale = set(changed) | set(removed)
+        old_vectors = _state["vectors"]
+        keep_rows = [i for i, chunk in enumerate(_state["chunks"]) if chunk["path"] not in stale]
+        chunks = [_state["chunks"][i] for i in keep_rows]
+        kept = np.asarray(old_vectors[keep_rows]) if old_vectors is not None and keep_rows else None
+
+        new_chunks = []
+        new_texts = []
+        for rel_path in changed:
+            try:
+                content = (memories_path / rel_path).read_text(encoding="utf-8")
+            except (OSError, UnicodeDecodeError) as e:
+                logging.warning(f"[MEMORY_VECTORS] Failed to read {rel_path}: {e}")
+                current_files.pop(rel_path, None)
+                continue
+            for chunk_text in split_chunks(content):
+                new_chunks.append({"path": rel_path, "text": chunk_text[:200]})
+                new_texts.append(chunk_text)
+
+        parts = [v for v in (kept, _embed(new_texts) if new_texts else None) if v is not None]
+        vectors = np.vstack(parts) if parts else np.zeros((0, 0), dtype=np.float32)
+        chunks.extend(new_chunks)
+
+        # Write next to the live files and swap in atomically
+        vectors_dir = get_vectors_dir()
+        tmp_vectors = vectors_dir / "vectors.tmp.npy"
+        tmp_meta = vectors_dir / "meta.tmp.json"
+        np.save(tmp_vectors, vectors)
+        tmp_meta.write_text(json.dumps({"chunks": chunks, "files": current_files}, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_vectors, vectors_dir / "vectors.npy")
+        os.replace(tmp_meta, vectors_dir / "meta.json")
+
+        _state.update({
+            "chunks": chunks,
+            "files": current_files,
+            "vectors": np.load(vectors_dir / "vectors.npy", mmap_mode="r"),
+        })
+        logging.info(f"[MEMORY_VECTORS] Re-embedded {len(changed)} files, removed {len(removed)} ({len(chunks)} chunks)")
+        return len(changed) + len(removed)
+
+
+def search(query: str, top_k: int = 8) -> List[Dict[str, Any]]:
+    """
+    Rank memory files by cosine similarity of their best chunk (brute force over the memmap)
+
+    Args:
+        query: Search query
+        top_k: Number of files to return
+
+    Returns:
+        List of {"path", "score"} sorted by score (empty if disabled)
+    """
+    if not is_enabled():
+        return []
+
+    try:
+        with _lock:
+            _load()
+            vectors = _state["vectors"]
+            chunks = _state["chunks"]
+        if vectors is None or not len(chunks):
+            return []
+
+        query_vector = _embed([query])[0]
+        similarities = np.asarray(vectors @ query_vector)
+
+        best_by_file: Dict[str, float] = {}
+        for row in np.argsort(-similarities)[: top_k * 4]:
+            path = chunks[row]["path"]
+            score = float(similarities[row])
+            if score > best_by_file.get(path, -1.0):
+                best_by_file[path] = score
+
+        ranked = sorted(best_by_file.items(), key=lambda item: item[1], reverse=True)[:top_k]
+        return [{"path": path, "score": round(score, 3)} for path, score in ranked]
+    except Exception as e:
+        logging.warning(f"[MEMORY_VECTORS] Search failed: {e}")
+        return []
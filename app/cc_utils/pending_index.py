@@ -0,0 +1,178 @@
+"""
+Pending State Index
+In-memory index of open waiting-answers and confirms, so checking whether a
+user has anything pending (done on every message) is a dict lookup instead of
+two SQLite queries.
+
+- waiting answers: respondent user_id -> {request_id: expires_at}
+- confirms: (channel_id, user_id, thread_ts) -> {confirm_id: expires_at}
+
+Loaded from the bot state database at startup and kept current write-through by
+waiting_answer_db / confirm_db after their transactions commit. Items past their
+window (24 hours for waiting answers, 12 hours for confirms) are dropped by
+expire(), which runs on a timer; lookups also ignore expired items between runs.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from app.cc_utils import state_db
+
+WAITING_ANSWER_TTL = timedelta(hours=24)
+CONFIRM_TTL = timedelta(hours=12)
+
+ConfirmKey = Tuple[str, str, Optional[str]]
+
+_lock = threading.Lock()
+_waiting: Dict[str, Dict[str, float]] = {}
+_confirms: Dict[ConfirmKey, Dict[str, float]] = {}
+# confirm_id -> key, for removals that only know the ID
+_confirm_keys: Dict[str, ConfirmKey] = {}
+
+
+def _expires_at(created_at: str, ttl: timedelta) -> float:
+    """Expiry timestamp for a created_at value (isoformat written by the DB modules)"""
+    try:
+        return (datetime.fromisoformat(created_at) + ttl).timestamp()
+    except (TypeError, ValueError):
+        return time.time() + ttl.total_seconds()
+
+
+def load() -> None:
+    """Rebuild the index from the database"""
+    waiting: Dict[str, Dict[str, float]] = {}
+    confirms: Dict[ConfirmKey, Dict[str, float]] = {}
+    confirm_keys: Dict[str, ConfirmKey] = {}
+    now = time.time()
+
+    with state_db.connection() as conn:
+        for row in conn.execute(
+            "SELECT request_id, respondent_user_id, created_at FROM waiting_answers WHERE responded = 0"
+        ):
+            expires_at = _expires_at(row["created_at"], WAITING_ANSWER_TTL)
+            if expires_at > now:
+                waiting.setdefault(row["respondent_user_id"], {})[row["request_id"]] = expires_at
+
+        for row in conn.execute(
+            "SELECT confirm_id, channel_id, user_id, thread_ts, created_at FROM confirms WHERE confirmed = 0"
+        ):
+            expires_at = _expires_at(row["created_at"], CONFIRM_TTL)
+            if expires_at > now:
+                key = (row["channel_id"], row["user_id"], row["thread_ts"] or None)
+                confirms.setdefault(key, {})[row["confirm_id"]] = expires_at
+                confirm_keys[row["confirm_id"]] = key
+
+    with _lock:
+        _waiting.clear()
+        _waiting.update(waiting)
+        _confirms.clear()
+        _confirms.update(confirms)
+        _confirm_keys.clear()
+        _confirm_keys.update(confirm_keys)
+
+    logging.info(
+        f"[PENDING_INDEX] Loaded {sum(len(v) for v in waiting.values())} waiting answers, "
+        f"{len(confirm_keys)} confirms"
+    )
+
+
+def add_waiting(request_id: str, user_ids: List[str], created_at: str) -> None:
+    """Record a new waiting-answer request for its respondents"""
+    expires_at = _expires_at(created_at, WAITING_ANSWER_TTL)
+    with _lock:
+        for user_id in user_ids:
+            _waiting.setdefault(user_id, {})[request_id] = expires_at
+
+
+def remove_waiting(request_id: str, user_id: str) -> None:
+    """Forget a waiting-answer request once the user responded"""
+    with _lock:
+        requests = _waiting.get(user_id)
+        if requests is not None:
+            requests.pop(request_id, None)
+            if not requests:
+                del _waiting[user_id]
+
+
+def pending_request_ids(user_id: str) -> List[str]:
+    """Return open request IDs the user still has to answer"""
+    now = time.time()
+    with _lock:
+        return [request_id for request_id, expires_at in _waiting.get(user_id, {}).items() if expires_at > now]
+
+
+def add_confirm(confirm_id: str, channel_id: str, user_id: str, thread_ts: Optional[str], created_at: str) -> None:
+    """Record a new pending confirm"""
+    key = (channel_id, user_id, thread_ts or None)
+    with _lock:
+        _confirms.setdefault(key, {})[confirm_id] = _expires_at(created_at, CONFIRM_TTL)
+        _confirm_keys[confirm_id] = key
+
+
+def _drop_confirm(confirm_id: str) -> None:
+    """Remove one confirm (caller holds _lock)"""
+    key = _confirm_keys.pop(confirm_id, None)
+    if key is None:
+        return
+    confirms = _confirms.get(key)
+    if confirms is not None:
+        confirms.pop(confirm_id, None)
+        if not confirms:
+            del _confirms[key]
+
+
+def remove_confirm(confirm_id: str) -> None:
+    """Forget a confirm once it was answered"""
+    with _lock:
+        _drop_confirm(confirm_id)
+
+
+def cancel_confirms(channel_id: str, user_id: str, thread_ts: Optional[str]) -> None:
+    """Forget every pending confirm of a user in a channel/thread (thread_ts=None: main channel)"""
+    with _lock:
+        for confirm_id in list(_confirms.get((channel_id, user_id, thread_ts or None), {})):
+            _drop_confirm(confirm_id)
+
+
+def pending_confirm_ids(channel_id: str, user_id: str, thread_ts: Optional[str]) -> List[str]:
+    """Return open confirm IDs visible from a channel/thread (that thread's plus main-channel ones)"""
+    now = time.time()
+    keys = {(channel_id, user_id, thread_ts or None), (channel_id, user_id, None)}
+    with _lock:
+        return [
+            confirm_id
+            for key in keys
+            for confirm_id, expires_at in _confirms.get(key, {}).items()
+            if expires_at > now
+        ]
+
+
+def expire() -> int:
+    """
+    Drop items past their window (run periodically)
+
+    Returns:
+        Number of items dropped
+    """
+    now = time.time()
+    dropped = 0
+    with _lock:
+        for user_id in list(_waiting):
+            requests = _waiting[user_id]
+            for request_id in [r for r, expires_at in requests.items() if expires_at <= now]:
+                del requests[request_id]
+                dropped += 1
+            if not requests:
+                del _waiting[user_id]
+
+        for confirm_id, key in list(_confirm_keys.items()):
+            if _confirms.get(key, {}).get(confirm_id, 0) <= now:
+                _drop_confirm(confirm_id)
+                dropped += 1
+
+    if dropped:
+        logging.info(f"[PENDING_INDEX] Expired {dropped} pending items")
+    return dropped
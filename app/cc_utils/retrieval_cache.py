@@ -0,0 +1,107 @@
+"""
+Memory Retrieval Cache
+Caches memory retriever results by (channel, user, normalized query).
+Each entry remembers the memory generation it was filled at and the candidate
+files it was built from; it stays valid until one of those files changes or
+the candidate set for the query changes (e.g. a new relevant file was written).
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from app.config.settings import get_settings
+from app.cc_utils import memory_store
+
+_lock = threading.Lock()
+_cache: "OrderedDict[Tuple[str, str, str], Dict]" = OrderedDict()
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation"""
+    normalized = re.sub(r"\s+", " ", (query or "").lower()).strip()
+    return normalized.rstrip(" .!?~")
+
+
+def make_key(channel_id: Optional[str], user_id: Optional[str], query: str) -> Tuple[str, str, str]:
+    """Build the cache key for a retrieval"""
+    return (channel_id or "", user_id or "", normalize_query(query))
+
+
+def get(key: Tuple[str, str, str], candidate_paths: List[str]) -> Optional[str]:
+    """
+    Return a cached retrieval result if the files it depends on are unchanged
+
+    Call memory_store.sync() first so recent writes are seen. Blocking (reads
+    the memory change feed): call it off the event loop.
+
+    Args:
+        key: Key from make_key()
+        candidate_paths: Current index candidates for the query
+
+    Returns:
+        Cached result, or None on miss
+    """
+    with _lock:
+        entry = _cache.get(key)
+        if entry is None:
+            return None
+
+        settings = get_settings()
+        if time.time() - entry["created_at"] > settings.MEMORY_RETRIEVAL_CACHE_TTL_SECONDS:
+            _cache.pop(key, None)
+            return None
+        generation = entry["generation"]
+
+    changed = memory_store.changed_since(generation)
+    if changed is None or _is_stale(entry, changed, candidate_paths):
+        with _lock:
+            _cache.pop(key, None)
+        logging.info(f"[RETRIEVAL_CACHE] Invalidated: {key[2][:50]}")
+        return None
+
+    # Nothing relevant changed: carry the entry forward to the current generation
+    with _lock:
+        entry["generation"] = memory_store.get_generation()
+        if key in _cache:
+            _cache.move_to_end(key)
+    logging.info(f"[RETRIEVAL_CACHE] Hit: {key[2][:50]}")
+    return entry["result"]
+
+
+def _is_stale(entry: Dict, changed: set, candidate_paths: List[str]) -> bool:
+    """Whether changes since the entry was filled affect its result"""
+    if not changed:
+        return False
+    # Without index candidates we cannot tell which files mattered
+    if not entry["paths"]:
+        return True
+    if set(candidate_paths) != entry["paths"]:
+        return True
+    return bool(changed & entry["paths"])
+
+
+def put(key: Tuple[str, str, str], result: str, candidate_paths: List[str], generation: int) -> None:
+    """
+    Store a retrieval result
+
+    Args:
+        key: Key from make_key()
+        result: Retrieved memory text
+        candidate_paths: Index candidates the result was built from
+        generation: Memory generation observed before the retrieval started
+    """
+    settings = get_settings()
+    with _lock:
+        _cache[key] = {
+            "result": result,
+            "paths": set(candidate_paths),
+            "generation": generation,
+            "created_at": time.time(),
+        }
+        _cache.move_to_end(key)
+        while len(_cache) > settings.MEMORY_RETRIEVAL_CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
@@ -0,0 +1,94 @@
+"""
+Scheduled Job Context Cache
+Slack context and retrieved memory prepared shortly before a schedule fires, so the
+operator can start right at trigger time instead of rebuilding them on every run.
+
+Entries are keyed by schedule ID and remember the memory generation they were
+built at. If any memory file changed since, the prefetch re-runs only the memory
+retrieval, and take() still returns the Slack context but drops the retrieved
+memory (the operator then retrieves it itself); expired entries are discarded and
+the job builds its context from scratch.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from app.cc_utils import memory_store
+
+_lock = threading.Lock()
+_cache: Dict[str, Dict[str, Any]] = {}
+
+
+def peek(schedule_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Prepared entry of a schedule without removing it
+
+    Returns:
+        {"context", "generation", "expires_at"}, or None if missing or expired
+    """
+    with _lock:
+        entry = _cache.get(schedule_id)
+        if entry is None or entry["expires_at"] <= time.time():
+            return None
+        return dict(entry)
+
+
+def put(schedule_id: str, context: Dict[str, Any], generation: int, expires_at: float) -> None:
+    """
+    Store a prepared context
+
+    Args:
+        schedule_id: Schedule ID
+        context: {"slack_data", "user_name", "retrieved_memory", "memory_query"}
+        generation: Memory generation read before the memory was retrieved
+        expires_at: Timestamp after which the context is not used
+    """
+    with _lock:
+        _cache[schedule_id] = {"context": context, "generation": generation, "expires_at": expires_at}
+
+
+def take(schedule_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Remove and return a schedule's context if it is still current
+
+    Call with the memory generation already synced (memory_store.sync()).
+
+    Returns:
+        The context (retrieved_memory is None if memory changed since), or None if missing or expired
+    """
+    with _lock:
+        entry = _cache.pop(schedule_id, None)
+    if entry is None:
+        return None
+
+    if entry["expires_at"] <= time.time():
+        return None
+    context = entry["context"]
+    if memory_store.get_generation() != entry["generation"] and context.get("retrieved_memory") is not None:
+        # Slack context does not depend on memory; only the retrieval is stale
+        logging.info(f"[SCHEDULE_CONTEXT] Memory changed since prefetch, dropping retrieved memory of {schedule_id}")
+        context = dict(context, retrieved_memory=None)
+    return context
+
+
+def discard(schedule_id: str) -> None:
+    """Forget a schedule's context (the schedule was edited or removed)"""
+    with _lock:
+        _cache.pop(schedule_id, None)
+
+
+def prune() -> int:
+    """
+    Drop expired entries
+
+    Returns:
+        Number of entries dropped
+    """
+    now = time.time()
+    with _lock:
+        expired = [schedule_id for schedule_id, entry in _cache.items() if entry["expires_at"] <= now]
+        for schedule_id in expired:
+            del _cache[schedule_id]
+    return len(expired)
@@ -0,0 +1,213 @@
+"""
+Schedule Database Manager
+schedules table of the bot state database (state_db) holding user schedules.
+
+Each add/update/remove touches one row; the scheduler then applies the same
+change to APScheduler as a single job operation. schedules.json is only an
+import/export format (see import_from_file / export_to_file).
+"""
+
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.cc_utils import sqlite_pool, state_db
+
+# Columns callers may change through update_schedule()
+UPDATABLE_FIELDS = ("name", "schedule_type", "schedule_value", "user", "text", "channel", "is_enabled", "misfire_policy")
+
+# Fields written to / read from schedules.json
+FILE_FIELDS = ("id", "name", "schedule_type", "schedule_value", "user", "text", "channel", "is_enabled", "misfire_policy")
+
+
+def _to_dict(row) -> Dict[str, Any]:
+    """Row -> schedule dict in the schedules.json shape"""
+    schedule = dict(row)
+    schedule["is_enabled"] = bool(schedule["is_enabled"])
+    return schedule
+
+
+def add_schedule(schedule: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Add new schedule
+
+    Args:
+        schedule: Schedule dict (id, name, schedule_type, schedule_value, user, text, channel,
+            is_enabled, misfire_policy)
+
+    Returns:
+        Stored schedule
+    """
+    with state_db.transaction() as conn:
+        conn.execute("""
+            INSERT INTO schedules
+            (id, name, schedule_type, schedule_value, user, text, channel, is_enabled, misfire_policy)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (schedule["id"], schedule["name"], schedule["schedule_type"], schedule["schedule_value"],
+              schedule.get("user"), schedule.get("text"), schedule.get("channel"),
+              1 if schedule.get("is_enabled", True) else 0, schedule.get("misfire_policy")))
+        row = conn.execute("SELECT * FROM schedules WHERE id = ?", (schedule["id"],)).fetchone()
+
+    return _to_dict(row)
+
+
+def update_schedule(schedule_id: str, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Update fields of a schedule
+
+    Args:
+        schedule_id: Schedule ID
+        fields: Fields to change (keys outside UPDATABLE_FIELDS are ignored)
+
+    Returns:
+        Updated schedule, or None if not found
+    """
+    changes = {key: value for key, value in fields.items() if key in UPDATABLE_FIELDS}
+    if "is_enabled" in changes:
+        changes["is_enabled"] = 1 if changes["is_enabled"] else 0
+
+    with state_db.transaction() as conn:
+        if changes:
+            assignments = ", ".join(f"{key} = ?" for key in changes)
+            conn.execute(
+                f"UPDATE schedules SET {assignments}, updated_at = ? WHERE id = ?",
+                (*changes.values(), datetime.now().isoformat(), schedule_id),
+            )
+        row = conn.execute("SELECT * FROM schedules WHERE id = ?", (schedule_id,)).fetchone()
+
+    return _to_dict(row) if row else None
+
+
+def remove_schedule(schedule_id: str) -> bool:
+    """
+    Delete a schedule
+
+    Args:
+        schedule_id: Schedule ID
+
+    Returns:
+        Whether a schedule was deleted
+    """
+    with state_db.transaction() as conn:
+        cursor = conn.execute("DELETE FROM schedules WHERE id = ?", (schedule_id,))
+        deleted = cursor.rowcount > 0
+
+    return deleted
+
+
+def get_schedule(schedule_id: str) -> Optional[Dict[str, Any]]:
+    """Get specific schedule"""
+    with state_db.connection() as conn:
+        row = conn.execute("SELECT * FROM schedules WHERE id = ?", (schedule_id,)).fetchone()
+
+    return _to_dict(row) if row else None
+
+
+def list_schedules(channel_id: Optional[str] = None, enabled_only: bool = False) -> List[Dict[str, Any]]:
+    """
+    List schedules in creation order
+
+    Args:
+        channel_id: Only schedules of this channel (optional)
+        enabled_only: Only enabled schedules
+
+    Returns:
+        List of schedules
+    """
+    conditions = []
+    params: List[Any] = []
+    if channel_id:
+        conditions.append("channel = ?")
+        params.append(channel_id)
+    if enabled_only:
+        conditions.append("is_enabled = 1")
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    with state_db.connection() as conn:
+        rows = conn.execute(f"SELECT * FROM schedules {where} ORDER BY created_at, rowid", params).fetchall()
+
+    return [_to_dict(row) for row in rows]
+
+
+def has_enabled_name(name: str) -> bool:
+    """Whether an enabled schedule already uses this name"""
+    with state_db.connection() as conn:
+        row = conn.execute(
+            "SELECT 1 FROM schedules WHERE name = ? AND is_enabled = 1 LIMIT 1", (name,)
+        ).fetchone()
+
+    return row is not None
+
+
+def import_from_file(path: str) -> int:
+    """
+    Insert or replace schedules from a schedules.json file
+
+    Args:
+        path: JSON file (list of schedule dicts)
+
+    Returns:
+        Number of schedules imported
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        schedules = json.load(f)
+
+    rows = [
+        (s["id"], s.get("name"), s.get("schedule_type"), s.get("schedule_value"),
+         s.get("user"), s.get("text"), s.get("channel"), 1 if s.get("is_enabled") else 0,
+         s.get("misfire_policy"))
+        for s in schedules
+        if s.get("id")
+    ]
+    with state_db.transaction() as conn:
+        conn.executemany("""
+            INSERT INTO schedules
+            (id, name, schedule_type, schedule_value, user, text, channel, is_enabled, misfire_policy)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                name = excluded.name,
+                schedule_type = excluded.schedule_type,
+                schedule_value = excluded.schedule_value,
+                user = excluded.user,
+                text = excluded.text,
+                channel = excluded.channel,
+                is_enabled = excluded.is_enabled,
+                misfire_policy = excluded.misfire_policy,
+                updated_at = CURRENT_TIMESTAMP
+        """, rows)
+
+    logging.info(f"[SCHEDULE_DB] Imported {len(rows)} schedules from {path}")
+    return len(rows)
+
+
+def export_to_file(path: str) -> int:
+    """
+    Write all schedules to a schedules.json file
+
+    Args:
+        path: Destination JSON file
+
+    Returns:
+        Number of schedules exported
+    """
+    schedules = [
+        {key: s[key] for key in FILE_FIELDS}
+        for s in list_schedules()
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(schedules, f, indent=2, ensure_ascii=False)
+
+    logging.info(f"[SCHEDULE_DB] Exported {len(schedules)} schedules to {path}")
+    return len(schedules)
+
+
+# Async variants for the event loop (run on the shared DB thread pool)
+add_schedule_async = sqlite_pool.to_async(add_schedule)
+update_schedule_async = sqlite_pool.to_async(update_schedule)
+remove_schedule_async = sqlite_pool.to_async(remove_schedule)
+get_schedule_async = sqlite_pool.to_async(get_schedule)
+list_schedules_async = sqlite_pool.to_async(list_schedules)
+has_enabled_name_async = sqlite_pool.to_async(has_enabled_name)
+import_from_file_async = sqlite_pool.to_async(import_from_file)
+export_to_file_async = sqlite_pool.to_async(export_to_file)
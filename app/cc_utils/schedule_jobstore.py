@@ -0,0 +1,132 @@
+"""
+Schedule Job Store
+APScheduler job store on the scheduled_jobs table of the bot state database
+(state_db), so user schedule jobs and their next run times survive restarts.
+
+The scheduler asks the store only for jobs whose next_run_time is due (indexed),
+so startup recovers in O(due jobs); jobs missed during downtime are then handled
+by their misfire settings (see app.scheduler.MISFIRE_POLICIES).
+
+Jobs are pickled like APScheduler's own persistent stores, so the job function
+must be importable by reference (app.scheduler:scheduled_message_wrapper).
+"""
+
+import logging
+import pickle
+import sqlite3
+from datetime import datetime
+from typing import List, Optional
+
+from apscheduler.job import Job
+from apscheduler.jobstores.base import BaseJobStore, ConflictingIdError, JobLookupError
+from apscheduler.util import datetime_to_utc_timestamp, utc_timestamp_to_datetime
+
+from app.cc_utils import state_db
+
+
+class StateDBJobStore(BaseJobStore):
+    """Persistent job store backed by the bot state database"""
+
+    def __init__(self, pickle_protocol: int = pickle.HIGHEST_PROTOCOL):
+        super().__init__()
+        self.pickle_protocol = pickle_protocol
+
+    def lookup_job(self, job_id: str) -> Optional[Job]:
+        with state_db.connection() as conn:
+            row = conn.execute("SELECT job_state FROM scheduled_jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._reconstitute_job(row["job_state"]) if row else None
+
+    def get_due_jobs(self, now: datetime) -> List[Job]:
+        return self._get_jobs("WHERE next_run_time <= ?", (datetime_to_utc_timestamp(now),))
+
+    def get_next_run_time(self) -> Optional[datetime]:
+        with state_db.connection() as conn:
+            row = conn.execute(
+                "SELECT next_run_time FROM scheduled_jobs "
+                "WHERE next_run_time IS NOT NULL ORDER BY next_run_time LIMIT 1"
+            ).fetchone()
+        return utc_timestamp_to_datetime(row["next_run_time"]) if row else None
+
+    def get_all_jobs(self) -> List[Job]:
+        jobs = self._get_jobs()
+        self._fix_paused_jobs_sorting(jobs)
+        return jobs
+
+    def add_job(self, job: Job) -> None:
+        try:
+            with state_db.transaction() as conn:
+                conn.execute(
+                    "INSERT INTO scheduled_jobs (id, next_run_time, job_state) VALUES (?, ?, ?)",
+                    (job.id, datetime_to_utc_timestamp(job.next_run_time), self._serialize(job)),
+                )
+        except sqlite3.IntegrityError:
+            raise ConflictingIdError(job.id)
+
+    def update_job(self, job: Job) -> None:
+        with state_db.transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE scheduled_jobs SET next_run_time = ?, job_state = ? WHERE id = ?",
+                (datetime_to_utc_timestamp(job.next_run_time), self._serialize(job), job.id),
+            )
+            if cursor.rowcount == 0:
+                raise JobLookupError(job.id)
+
+    def remove_job(self, job_id: str) -> None:
+        with state_db.transaction() as conn:
+            cursor = conn.execute("DELETE FROM scheduled_jobs WHERE id = ?", (job_id,))
+            if cursor.rowcount == 0:
+                raise JobLookupError(job_id)
+
+    def remove_all_jobs(self) -> None:
+        with state_db.transaction() as conn:
+            conn.execute("DELETE FROM scheduled_jobs")
+
+    def get_jobs_between(self, start: datetime, end: datetime) -> List[Job]:
+        """Jobs whose next run falls in [start, end) (used to prepare upcoming runs)"""
+        return self._get_jobs(
+            "WHERE next_run_time >= ? AND next_run_time < ?",
+            (datetime_to_utc_timestamp(start), datetime_to_utc_timestamp(end)),
+        )
+
+    def count_jobs(self) -> int:
+        """Number of stored jobs (without unpickling them)"""
+        with state_db.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM scheduled_jobs").fetchone()[0]
+
+    def _serialize(self, job: Job) -> bytes:
+        return pickle.dumps(job.__getstate__(), self.pickle_protocol)
+
+    def _reconstitute_job(self, job_state: bytes) -> Job:
+        job_state = pickle.loads(job_state)
+        job_state["jobstore"] = self
+        job = Job.__new__(Job)
+        job.__setstate__(job_state)
+        job._scheduler = self._scheduler
+        job._jobstore_alias = self._alias
+        return job
+
+    def _get_jobs(self, where: str = "", params: tuple = ()) -> List[Job]:
+        with state_db.connection() as conn:
+            rows = conn.execute(
+                f"SELECT id, job_state FROM scheduled_jobs {where} ORDER BY next_run_time", params
+            ).fetchall()
+
+        jobs = []
+        failed_job_ids = []
+        for row in rows:
+            try:
+                jobs.append(self._reconstitute_job(row["job_state"]))
+            except Exception:
+                self._logger.exception(f"Unable to restore job {row['id']} -- removing it")
+                failed_job_ids.append(row["id"])
+
+        # Drop jobs that can no longer be restored (e.g. the function moved)
+        if failed_job_ids:
+            with state_db.transaction() as conn:
+                conn.executemany("DELETE FROM scheduled_jobs WHERE id = ?", [(job_id,) for job_id in failed_job_ids])
+            logging.warning(f"[SCHEDULE_JOBSTORE] Removed {len(failed_job_ids)} unrestorable jobs")
+
+        return jobs
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} ({state_db.get_db_path()})>"
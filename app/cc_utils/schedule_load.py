@@ -0,0 +1,94 @@
+"""
+Schedule Load Smoothing
+Spreads bursts of user schedules that fire on the same round time (e.g. "0 9 * * *")
+so they do not all reach enqueue_message in the same second.
+
+- forecast_load(): jobs per minute over the coming hours, computed from the job
+  triggers (refreshed periodically by the scheduler)
+- jitter_offset(): a stable per-schedule delay inside a bounded window, applied
+  only when the forecast says the schedule's minute is crowded
+- TokenBucket: caps the rate at which scheduled messages are released to the queue
+"""
+
+import asyncio
+import time
+import zlib
+from datetime import datetime, timedelta
+from typing import Dict, Iterable
+
+# Fire times examined per job (an every-minute cron fills the horizon by itself)
+MAX_FIRES_PER_JOB = 24 * 60
+
+
+class TokenBucket:
+    """Async token bucket: at most `burst` releases at once, refilled at rate_per_minute"""
+
+    def __init__(self, rate_per_minute: float, burst: int):
+        self.rate = rate_per_minute / 60
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self) -> float:
+        """
+        Take one token, waiting for the refill if none is left (waiters are served in order)
+
+        Returns:
+            Seconds waited (including time queued behind other waiters)
+        """
+        if self.rate <= 0:
+            return 0.0
+
+        started_at = time.monotonic()
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+        return time.monotonic() - started_at
+
+
+def _minute(dt: datetime) -> datetime:
+    return dt.replace(second=0, microsecond=0)
+
+
+def forecast_load(jobs: Iterable, now: datetime, horizon: timedelta) -> Dict[datetime, int]:
+    """
+    Count job fire times per minute between now and now + horizon
+
+    Args:
+        jobs: APScheduler jobs (trigger and next_run_time are used)
+        now: Timezone-aware start of the window
+        horizon: Length of the window
+
+    Returns:
+        Minute (timezone-aware, truncated) -> number of jobs firing in it
+    """
+    end = now + horizon
+    load: Dict[datetime, int] = {}
+    for job in jobs:
+        fire_time = job.next_run_time
+        previous = None
+        for _ in range(MAX_FIRES_PER_JOB):
+            if fire_time is None or fire_time > end:
+                break
+            if fire_time >= now:
+                minute = _minute(fire_time)
+                load[minute] = load.get(minute, 0) + 1
+            previous = fire_time
+            fire_time = job.trigger.get_next_fire_time(previous, previous + timedelta(microseconds=1))
+    return load
+
+
+def jitter_offset(key: str, window_seconds: int) -> int:
+    """Stable delay in [0, window_seconds] for a schedule, so its runs land at the same spot"""
+    if window_seconds <= 0:
+        return 0
+    return zlib.crc32(key.encode("utf-8")) % (window_seconds + 1)
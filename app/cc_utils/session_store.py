@@ -0,0 +1,106 @@
+"""
+Operator Session Store
+Maps a Slack thread (channel_id, thread_ts) to the Claude session that answered it,
+so follow-ups in the same thread can resume that session instead of starting over
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.config.settings import get_settings
+
+# (channel_id, thread_ts) -> {"session_id", "estimated_tokens", "updated_at"}
+# Ordered by last use (least recently used first)
+_sessions: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+
+
+def get_reply_thread_ts(channel_type: str, message_ts: Optional[str], thread_ts: Optional[str]) -> Optional[str]:
+    """
+    Return the thread the bot replies in (same rule as mcp__slack__answer)
+
+    Args:
+        channel_type: public_channel, private_channel, dm or group_dm
+        message_ts: Timestamp of the request message
+        thread_ts: Thread timestamp of the request message (optional)
+
+    Returns:
+        Reply thread timestamp, or None if the reply is not threaded
+    """
+    if channel_type in ["public_channel", "private_channel", "group_dm"]:
+        return thread_ts or message_ts
+    return thread_ts
+
+
+def _evict_expired(now: float) -> None:
+    """Drop entries older than the TTL"""
+    ttl_seconds = get_settings().OPERATOR_SESSION_TTL_MINUTES * 60
+    expired = [key for key, entry in _sessions.items() if now - entry["updated_at"] > ttl_seconds]
+    for key in expired:
+        del _sessions[key]
+    if expired:
+        logging.info(f"[SESSION_STORE] Evicted {len(expired)} expired sessions")
+
+
+def save_session(channel_id: str, thread_ts: Optional[str], session_id: Optional[str], estimated_tokens: int) -> None:
+    """
+    Remember the session that answered a thread
+
+    Args:
+        channel_id: Slack channel ID
+        thread_ts: Reply thread timestamp (not stored if None)
+        session_id: Claude session ID
+        estimated_tokens: Estimated context size of the session
+    """
+    settings = get_settings()
+    if not settings.OPERATOR_SESSION_RESUME_ENABLED or not channel_id or not thread_ts or not session_id:
+        return
+
+    key = (channel_id, thread_ts)
+
+    # Sessions close to the context limit are not worth resuming
+    max_tokens = int(settings.OPERATOR_CONTEXT_WINDOW_TOKENS * settings.OPERATOR_COMPACT_THRESHOLD)
+    if estimated_tokens >= max_tokens:
+        _sessions.pop(key, None)
+        logging.info(f"[SESSION_STORE] Session for {key} is too large to resume (~{estimated_tokens} tokens)")
+        return
+
+    now = time.monotonic()
+    _sessions[key] = {
+        "session_id": session_id,
+        "estimated_tokens": estimated_tokens,
+        "updated_at": now,
+    }
+    _sessions.move_to_end(key)
+
+    _evict_expired(now)
+    while len(_sessions) > settings.OPERATOR_SESSION_MAX_ENTRIES:
+        evicted_key, _ = _sessions.popitem(last=False)
+        logging.info(f"[SESSION_STORE] Evicted least recently used session for {evicted_key}")
+
+
+def claim_session(channel_id: str, thread_ts: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Take the session for a thread out of the store for resumption
+
+    The entry is removed while in use so concurrent follow-ups in the same
+    thread do not resume the same session; the operator saves it back when done.
+
+    Args:
+        channel_id: Slack channel ID
+        thread_ts: Thread timestamp of the follow-up message
+
+    Returns:
+        Session entry dict, or None if there is no live session for the thread
+    """
+    if not get_settings().OPERATOR_SESSION_RESUME_ENABLED or not channel_id or not thread_ts:
+        return None
+
+    _evict_expired(time.monotonic())
+    return _sessions.pop((channel_id, thread_ts), None)
+
+
+def drop_session(channel_id: str, thread_ts: Optional[str]) -> None:
+    """Forget the session for a thread (e.g. after a failed resume)"""
+    _sessions.pop((channel_id, thread_ts), None)
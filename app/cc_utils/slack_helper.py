@@ -283,7 +283,7 @@ def get_slack_context_data(channel_id: str, message_limit: int = 10) -> Dict[str
 
     Args:
         channel_id: Slack channel ID
-        message_limit: Number of recent messages to retrieve (default 10)
+        message_limit: Number of recent messages to retrieve (default 10, 0 skips the history call)
 
     Returns:
         {
@@ -330,7 +330,7 @@ def get_slack_context_data(channel_id: str, message_limit: int = 10) -> Dict[str
     members_info = get_channel_members_info(channel_id)
 
     # Get recent conversation history
-    conversation_history = get_conversation_history_for_context(channel_id, message_limit)
+    conversation_history = get_conversation_history_for_context(channel_id, message_limit) if message_limit > 0 else []
 
     return {
         "channel": {
@@ -0,0 +1,235 @@
+"""
+Slack Progress Streamer
+Posts one placeholder reply for a long-running agent and keeps it updated
+with chat.update as tool calls and partial text arrive (rate-limited)
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, List, Optional
+
+from slack_sdk.errors import SlackApiError
+
+from app.cc_utils.language_helper import detect_language
+from app.cc_utils.session_store import get_reply_thread_ts
+from app.config.settings import get_settings
+
+# Built-in tools shown with a friendly label (others fall back to the MCP server name)
+TOOL_LABELS = {
+    "Korean": {
+        "WebSearch": "웹 검색",
+        "WebFetch": "웹 페이지 확인",
+        "Read": "파일 확인",
+        "Glob": "파일 찾기",
+        "Grep": "파일 내용 찾기",
+        "Write": "파일 작성",
+        "Edit": "파일 수정",
+        "Bash": "명령 실행",
+        "Skill": "작업 준비",
+        "Task": "세부 작업 진행",
+        "TodoWrite": "작업 계획 정리",
+    },
+    "English": {
+        "WebSearch": "Searching the web",
+        "WebFetch": "Reading a web page",
+        "Read": "Reading files",
+        "Glob": "Finding files",
+        "Grep": "Searching files",
+        "Write": "Writing a file",
+        "Edit": "Editing a file",
+        "Bash": "Running a command",
+        "Skill": "Preparing",
+        "Task": "Working on a sub-task",
+        "TodoWrite": "Planning the work",
+    },
+}
+
+HEADERS = {
+    "Korean": "⏳ 작업 중입니다",
+    "English": "⏳ Working on it",
+}
+
+# Number of recent steps kept in the placeholder
+MAX_STEPS = 5
+
+# Characters of partial assistant text shown in the placeholder
+MAX_PREVIEW_CHARS = 300
+
+
+class SlackProgressStreamer:
+    """
+    Progress placeholder for one agent run
+
+    Usage:
+        async with ClaudeSDKClient(options=options) as client, SlackProgressStreamer(...) as progress:
+            async for message in client.receive_response():
+                progress.on_message(message)
+
+    The placeholder is only posted if the run takes longer than
+    OPERATOR_PROGRESS_DELAY_SECONDS, is edited at most once per
+    OPERATOR_PROGRESS_UPDATE_INTERVAL seconds, and is deleted when the run ends
+    (the final answer is sent separately by the agent).
+    """
+
+    def __init__(
+        self,
+        slack_client,
+        channel_id: Optional[str],
+        message_ts: Optional[str],
+        thread_ts: Optional[str] = None,
+        channel_type: str = "",
+        user_text: str = "",
+    ):
+        """
+        Args:
+            slack_client: Slack AsyncWebClient
+            channel_id: Channel to post the placeholder in
+            message_ts: Timestamp of the request message (no placeholder if missing)
+            thread_ts: Thread timestamp of the request message (optional)
+            channel_type: public_channel, private_channel, dm or group_dm
+            user_text: Request text (used to pick the placeholder language)
+        """
+        settings = get_settings()
+        self.enabled = bool(settings.OPERATOR_PROGRESS_ENABLED and channel_id and message_ts)
+        self.delay = settings.OPERATOR_PROGRESS_DELAY_SECONDS
+        self.min_interval = settings.OPERATOR_PROGRESS_UPDATE_INTERVAL
+
+        self.client = slack_client
+        self.channel_id = channel_id
+        self.language = detect_language(user_text or "")
+
+        # Same placement rule as mcp__slack__answer
+        self.thread_ts = get_reply_thread_ts(channel_type, message_ts, thread_ts)
+
+        self.steps: List[str] = []
+        self.preview = ""
+        self.placeholder_ts: Optional[str] = None
+        self.started_at = time.monotonic()
+        self.dirty = False
+        self.paused_until = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def __aenter__(self):
+        if self.enabled:
+            self.started_at = time.monotonic()
+            self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.finish()
+        return False
+
+    def on_message(self, message: Any) -> None:
+        """Record tool calls and partial text from a streamed SDK message (never raises)"""
+        if not self.enabled:
+            return
+
+        try:
+            content = getattr(message, "content", None)
+            if not isinstance(content, list):
+                return
+
+            for block in content:
+                tool_name = getattr(block, "name", None)
+                if tool_name and hasattr(block, "input"):
+                    label = self._tool_label(tool_name)
+                    if label and (not self.steps or self.steps[-1] != label):
+                        self.steps.append(label)
+                        self.steps = self.steps[-MAX_STEPS:]
+                        self.dirty = True
+                    continue
+
+                text = getattr(block, "text", None)
+                if text and text.strip():
+                    self.preview = text.strip()[-MAX_PREVIEW_CHARS:]
+                    self.dirty = True
+        except Exception as e:
+            logging.debug(f"[SLACK_PROGRESS] Failed to read message: {e}")
+
+    async def finish(self) -> None:
+        """Stop updating and remove the placeholder"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if not self.placeholder_ts:
+            return
+
+        try:
+            await self.client.chat_delete(channel=self.channel_id, ts=self.placeholder_ts)
+        except Exception as e:
+            logging.warning(f"[SLACK_PROGRESS] Failed to delete placeholder: {e}")
+        self.placeholder_ts = None
+
+    async def _run(self) -> None:
+        """Post the placeholder after the delay, then flush pending changes at a fixed rate"""
+        await asyncio.sleep(self.delay)
+        while True:
+            now = time.monotonic()
+            if now >= self.paused_until:
+                if self.placeholder_ts is None:
+                    await self._send(post=True)
+                elif self.dirty:
+                    await self._send(post=False)
+            await asyncio.sleep(self.min_interval)
+
+    async def _send(self, post: bool) -> None:
+        """Post or update the placeholder, backing off on rate limits"""
+        text = self._render()
+        self.dirty = False
+        try:
+            if post:
+                params = {"channel": self.channel_id, "text": text}
+                if self.thread_ts:
+                    params["thread_ts"] = self.thread_ts
+                response = await self.client.chat_postMessage(**params)
+                self.placeholder_ts = response.get("ts")
+            else:
+                await self.client.chat_update(channel=self.channel_id, ts=self.placeholder_ts, text=text)
+        except SlackApiError as e:
+            if e.response.status_code == 429:
+                retry_after = float(e.response.headers.get("Retry-After", self.min_interval))
+                self.paused_until = time.monotonic() + retry_after
+                self.dirty = True
+                logging.warning(f"[SLACK_PROGRESS] Rate limited, pausing updates for {retry_after}s")
+            else:
+                logging.warning(f"[SLACK_PROGRESS] Slack API error: {e.response['error']}")
+        except Exception as e:
+            logging.warning(f"[SLACK_PROGRESS] Failed to update placeholder: {e}")
+
+    def _render(self) -> str:
+        """Build the placeholder text"""
+        elapsed = int(time.monotonic() - self.started_at)
+        minutes, seconds = divmod(elapsed, 60)
+        if self.language == "Korean":
+            elapsed_text = f"{minutes}분 {seconds}초" if minutes else f"{seconds}초"
+        else:
+            elapsed_text = f"{minutes}m {seconds}s" if minutes else f"{seconds}s"
+
+        lines = [f"{HEADERS[self.language]}... ({elapsed_text})"]
+        lines.extend(f"• {step}" for step in self.steps)
+        if self.preview:
+            lines.append("")
+            lines.append(f"_{self.preview}_")
+        return "\n".join(lines)
+
+    def _tool_label(self, tool_name: str) -> Optional[str]:
+        """Friendly label for a tool call (None for the final answer tools)"""
+        labels = TOOL_LABELS[self.language]
+        if tool_name in labels:
+            return labels[tool_name]
+
+        if tool_name.startswith("mcp__"):
+            parts = tool_name.split("__")
+            server = parts[1] if len(parts) > 1 else tool_name
+            # The answer itself is not a progress step
+            if server == "slack" and parts[-1] in ("answer", "upload_file", "answer_with_emoji"):
+                return None
+            return f"{server} 확인 중" if self.language == "Korean" else f"Checking {server}"
+
+        return tool_name
@@ -0,0 +1,146 @@
+"""
+SQLite Connection Pool
+Shared data-access layer for the cc_utils *_db modules:
+
+- one connection per (thread, database file), reused across calls
+- transaction() for multi-statement writes committed with a single fsync
+- WAL journal with synchronous=NORMAL, so readers never wait for a writer
+  and commits skip the extra fsync of the default rollback journal
+- sqlite3's prepared statement cache kept warm on the reused connections
+- a dedicated thread pool plus to_async() wrappers, so database I/O never
+  runs on the event loop handling Slack events
+"""
+
+import asyncio
+import functools
+import logging
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, TypeVar, Union
+
+from app.config.settings import get_settings
+
+# Prepared statements kept per connection (sqlite3 default is 128)
+CACHED_STATEMENTS = 256
+
+# Seconds a writer waits for another writer's lock before raising
+BUSY_TIMEOUT_SECONDS = 10
+
+T = TypeVar("T")
+
+_local = threading.local()
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _open(db_path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_SECONDS, cached_statements=CACHED_STATEMENTS)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def get_connection(db_path: Union[str, Path]) -> sqlite3.Connection:
+    """
+    Return this thread's connection to a database file (opened on first use)
+
+    The connection is shared by later calls on the same thread; do not close it.
+
+    Args:
+        db_path: Database file path
+
+    Returns:
+        SQLite connection with Row factory set
+    """
+    connections: Dict[str, sqlite3.Connection] = _local.__dict__.setdefault("connections", {})
+    key = str(db_path)
+    conn = connections.get(key)
+    if conn is None:
+        conn = _open(key)
+        connections[key] = conn
+    return conn
+
+
+@contextmanager
+def connection(db_path: Union[str, Path]) -> Iterator[sqlite3.Connection]:
+    """
+    Borrow this thread's connection for one unit of work
+
+    Callers commit their own writes; anything left uncommitted (an exception
+    before commit) is rolled back so it never leaks into the next caller.
+    """
+    conn = get_connection(db_path)
+    try:
+        yield conn
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+
+
+@contextmanager
+def transaction(db_path: Union[str, Path]) -> Iterator[sqlite3.Connection]:
+    """
+    Run a block as one write transaction (BEGIN IMMEDIATE ... COMMIT, one fsync)
+
+    Commits on success and rolls back on any exception. Nested use on the same
+    thread joins the outer transaction, so helpers can be composed atomically.
+    """
+    conn = get_connection(db_path)
+    if conn.in_transaction:
+        yield conn
+        return
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=get_settings().DB_POOL_THREADS,
+                    thread_name_prefix="sqlite",
+                )
+    return _executor
+
+
+async def run(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking database function on the DB thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(func, *args, **kwargs))
+
+
+def submit(func: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+    """Queue a blocking database write on the DB thread pool without waiting for it"""
+    _get_executor().submit(func, *args, **kwargs)
+
+
+def to_async(func: Callable[..., T]) -> Callable[..., Awaitable[T]]:
+    """Wrap a blocking database function into a coroutine function running on the DB thread pool"""
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        return await run(func, *args, **kwargs)
+
+    return wrapper
+
+
+def shutdown() -> None:
+    """Shut down the DB thread pool (its threads' connections close with them)"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+    logging.info("[SQLITE_POOL] Shut down")
@@ -0,0 +1,301 @@
+"""
+Bot State Database
+Single SQLite file ({FILESYSTEM_BASE_DIR}/db/bot_state.db) holding the tables
+that used to live in waiting_answers.db, confirms.db, email_tasks.db,
+jira_tasks.db and schedule_data/schedules.json, so related updates can share
+one transaction.
+
+The schema is versioned with PRAGMA user_version: migrate() applies every
+migration newer than the stored version, each in its own transaction.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, List, Tuple
+
+from app.config.settings import get_settings
+from app.cc_utils import sqlite_pool
+
+DB_FILE_NAME = "bot_state.db"
+
+# Files merged into the unified database by migration 2 (file name -> tables)
+LEGACY_DATABASES = {
+    "waiting_answers.db": ["waiting_answers"],
+    "confirms.db": ["confirms"],
+    "email_tasks.db": ["email_tasks"],
+    "jira_tasks.db": ["jira_tasks"],
+}
+
+_migrate_lock = threading.Lock()
+
+
+def get_db_dir() -> Path:
+    """Return the folder holding the SQLite files"""
+    settings = get_settings()
+    base_dir = settings.FILESYSTEM_BASE_DIR or os.getcwd()
+    db_dir = Path(base_dir) / "db"
+    db_dir.mkdir(parents=True, exist_ok=True)
+    return db_dir
+
+
+def get_db_path() -> Path:
+    """Return SQLite database file path"""
+    return get_db_dir() / DB_FILE_NAME
+
+
+@contextmanager
+def connection() -> Iterator[sqlite3.Connection]:
+    """Borrow this thread's connection for reads"""
+    with sqlite_pool.connection(get_db_path()) as conn:
+        yield conn
+
+
+@contextmanager
+def transaction() -> Iterator[sqlite3.Connection]:
+    """Run a block of writes (possibly across tables) as one transaction"""
+    with sqlite_pool.transaction(get_db_path()) as conn:
+        yield conn
+
+
+def _create_tables(conn: sqlite3.Connection) -> None:
+    """Version 1: tables and indexes of the four former databases"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS waiting_answers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            request_id TEXT NOT NULL,
+            channel_id TEXT NOT NULL,
+            requester_id TEXT NOT NULL,
+            requester_name TEXT,
+            request_content TEXT NOT NULL,
+            respondent_user_id TEXT NOT NULL,
+            respondent_name TEXT,
+            responded INTEGER DEFAULT 0,
+            response TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            status TEXT DEFAULT 'in_progress'
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_request_id ON waiting_answers(request_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_respondent ON waiting_answers(respondent_user_id, responded)")
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS confirms (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            confirm_id TEXT NOT NULL UNIQUE,
+            channel_id TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            user_name TEXT,
+            confirm_message TEXT NOT NULL,
+            original_request_text TEXT NOT NULL,
+            thread_ts TEXT,
+            confirmed INTEGER DEFAULT 0,
+            response TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            status TEXT DEFAULT 'pending'
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_confirm_id ON confirms(confirm_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_channel_user_pending ON confirms(channel_id, user_id, confirmed)")
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS email_tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email_id TEXT NOT NULL,
+            sender TEXT NOT NULL,
+            subject TEXT NOT NULL,
+            task_description TEXT NOT NULL,
+            priority TEXT DEFAULT 'medium',
+            user TEXT,
+            text TEXT,
+            channel TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            status TEXT DEFAULT 'pending'
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS jira_tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            issue_key TEXT NOT NULL,
+            issue_url TEXT NOT NULL,
+            summary TEXT NOT NULL,
+            status TEXT NOT NULL,
+            priority TEXT DEFAULT 'medium',
+            task_description TEXT NOT NULL,
+            user TEXT,
+            text TEXT,
+            channel TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            db_status TEXT DEFAULT 'pending'
+        )
+    """)
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_issue_key ON jira_tasks(issue_key)")
+
+
+def _import_legacy_databases(conn: sqlite3.Connection) -> None:
+    """Version 2: copy rows from the old per-feature database files (left in place, no longer used)"""
+    db_dir = get_db_dir()
+    for file_name, tables in LEGACY_DATABASES.items():
+        legacy_path = db_dir / file_name
+        if not legacy_path.exists():
+            continue
+
+        legacy = sqlite3.connect(f"file:{legacy_path}?mode=ro", uri=True)
+        try:
+            for table in tables:
+                legacy_columns = [row[1] for row in legacy.execute(f"PRAGMA table_info({table})")]
+                if not legacy_columns:
+                    continue
+                # Old files may predate columns added by later in-place migrations
+                current_columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+                columns = [c for c in legacy_columns if c in current_columns]
+                column_list = ", ".join(columns)
+                rows = legacy.execute(f"SELECT {column_list} FROM {table}").fetchall()
+                conn.executemany(
+                    f"INSERT OR IGNORE INTO {table} ({column_list}) VALUES ({', '.join('?' * len(columns))})",
+                    rows,
+                )
+                logging.info(f"[STATE_DB] Imported {len(rows)} rows from {file_name}:{table}")
+        finally:
+            legacy.close()
+
+
+def _add_query_indexes(conn: sqlite3.Connection) -> None:
+    """Version 3: composite indexes for the hot lookups and the retention purge"""
+    # Pending lookups (superseding the shorter indexes from version 1)
+    conn.execute("DROP INDEX IF EXISTS idx_respondent")
+    conn.execute("DROP INDEX IF EXISTS idx_channel_user_pending")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_waiting_respondent_pending "
+        "ON waiting_answers(respondent_user_id, responded, created_at)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_confirms_channel_user_pending "
+        "ON confirms(channel_id, user_id, confirmed, created_at)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_email_tasks_status ON email_tasks(status, created_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jira_tasks_status ON jira_tasks(db_status, updated_at)")
+
+    # Retention range scans
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_waiting_created_at ON waiting_answers(created_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_confirms_created_at ON confirms(created_at)")
+
+
+def _create_processed_emails(conn: sqlite3.Connection) -> None:
+    """Version 4: ledger of emails already handed to the task extractor"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS processed_emails (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            message_id TEXT NOT NULL UNIQUE,
+            content_hash TEXT NOT NULL,
+            subject TEXT,
+            processed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_processed_emails_hash ON processed_emails(content_hash)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_processed_emails_at ON processed_emails(processed_at)")
+
+
+def _create_schedules(conn: sqlite3.Connection) -> None:
+    """Version 5: user schedules (imported once from schedule_data/schedules.json, which is left in place)"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schedules (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            schedule_type TEXT NOT NULL,
+            schedule_value TEXT NOT NULL,
+            user TEXT,
+            text TEXT,
+            channel TEXT,
+            is_enabled INTEGER DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_schedules_channel ON schedules(channel)")
+
+    schedule_file = get_db_dir().parent / "schedule_data" / "schedules.json"
+    if not schedule_file.exists():
+        return
+    try:
+        schedules = json.loads(schedule_file.read_text(encoding="utf-8"))
+    except (json.JSONDecodeError, OSError) as e:
+        logging.warning(f"[STATE_DB] Could not read {schedule_file}: {e}")
+        return
+
+    conn.executemany(
+        """
+        INSERT OR IGNORE INTO schedules
+        (id, name, schedule_type, schedule_value, user, text, channel, is_enabled)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (s.get("id"), s.get("name"), s.get("schedule_type"), s.get("schedule_value"),
+             s.get("user"), s.get("text"), s.get("channel"), 1 if s.get("is_enabled") else 0)
+            for s in schedules
+            if s.get("id")
+        ],
+    )
+    logging.info(f"[STATE_DB] Imported {len(schedules)} schedules from {schedule_file.name}")
+
+
+def _create_scheduled_jobs(conn: sqlite3.Connection) -> None:
+    """Version 6: persistent APScheduler job store and per-schedule misfire policy"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS scheduled_jobs (
+            id TEXT PRIMARY KEY,
+            next_run_time REAL,
+            job_state BLOB NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_scheduled_jobs_next_run ON scheduled_jobs(next_run_time)")
+    conn.execute("ALTER TABLE schedules ADD COLUMN misfire_policy TEXT")
+
+
+# (version, description, apply); append new migrations, never edit applied ones
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Connection], None]]] = [
+    (1, "create tables", _create_tables),
+    (2, "import legacy database files", _import_legacy_databases),
+    (3, "add query and retention indexes", _add_query_indexes),
+    (4, "create processed email ledger", _create_processed_emails),
+    (5, "create schedules", _create_schedules),
+    (6, "create scheduled job store", _create_scheduled_jobs),
+]
+
+
+def migrate() -> int:
+    """
+    Apply pending migrations
+
+    Returns:
+        Schema version after migrating
+    """
+    with _migrate_lock:
+        with connection() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+
+        for target, description, apply in MIGRATIONS:
+            if target <= version:
+                continue
+            with transaction() as conn:
+                apply(conn)
+                conn.execute(f"PRAGMA user_version = {target}")
+            version = target
+            logging.info(f"[STATE_DB] Migrated to version {target}: {description}")
+
+    return version
+
+
+def init_db():
+    """Initialize database (create or migrate the schema)"""
+    version = migrate()
+    logging.info(f"[STATE_DB] Database ready at {get_db_path()} (schema version {version})")
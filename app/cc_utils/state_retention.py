@@ -0,0 +1,159 @@
+"""
+Bot State Retention
+Scheduled purge of finished rows from the bot state database (state_db).
+
+Each table has a policy: which rows are finished and how many days they are
+kept. Expired rows are appended to a gzip-compressed JSONL archive
+({FILESYSTEM_BASE_DIR}/db/archive/<table>_<YYYYMM>.jsonl.gz) and then deleted
+in small batches, each its own short transaction, so the purge never holds the
+write lock long enough to stall Slack handling. Afterwards ANALYZE refreshes
+the planner statistics and VACUUM runs when enough pages are free.
+"""
+
+import gzip
+import json
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict
+
+from app.config.settings import get_settings
+from app.cc_utils import state_db
+
+# Rows archived and deleted per transaction
+BATCH_SIZE = 500
+
+# VACUUM when at least this share of the file is free pages
+VACUUM_FREE_RATIO = 0.2
+
+# Never purge inside the pending windows (24h waiting answers, 12h confirms)
+MIN_RETENTION_DAYS = 2
+
+
+# table -> time_column compared against the cutoff date, finished condition a row
+# must meet to be purged, days_setting holding the retention in days
+POLICIES: Dict[str, Dict[str, Any]] = {
+    # Pending rows older than the window are already expired, so age alone decides
+    "waiting_answers": {
+        "time_column": "created_at",
+        "finished": "1 = 1",
+        "days_setting": "WAITING_ANSWERS_RETENTION_DAYS",
+    },
+    "confirms": {
+        "time_column": "created_at",
+        "finished": "1 = 1",
+        "days_setting": "CONFIRMS_RETENTION_DAYS",
+    },
+    "email_tasks": {
+        "time_column": "created_at",
+        "finished": "status = 'completed'",
+        "days_setting": "EMAIL_TASKS_RETENTION_DAYS",
+    },
+    # jira_tasks also dedupes issues, so keep these longer (re-upserts refresh updated_at)
+    "jira_tasks": {
+        "time_column": "updated_at",
+        "finished": "db_status = 'completed'",
+        "days_setting": "JIRA_TASKS_RETENTION_DAYS",
+    },
+    # The email checker only processes mail received within a shorter window
+    # (email_ledger_db.get_fetch_window_start), so old ledger rows are safe to drop
+    "processed_emails": {
+        "time_column": "processed_at",
+        "finished": "1 = 1",
+        "days_setting": "PROCESSED_EMAILS_RETENTION_DAYS",
+    },
+}
+
+
+def get_archive_dir() -> Path:
+    """Return the folder holding purged-row archives"""
+    archive_dir = state_db.get_db_dir() / "archive"
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    return archive_dir
+
+
+def purge_table(table: str, days: int) -> int:
+    """
+    Archive and delete the finished rows of one table older than days
+
+    Args:
+        table: Table name (key of POLICIES)
+        days: Retention in days
+
+    Returns:
+        Number of rows purged
+    """
+    # Date-only cutoff: created_at/updated_at mix "YYYY-MM-DDTHH:MM:SS" and
+    # "YYYY-MM-DD HH:MM:SS", which both compare correctly against a bare date
+    cutoff = (datetime.now() - timedelta(days=max(days, MIN_RETENTION_DAYS))).strftime("%Y-%m-%d")
+    policy = POLICIES[table]
+    archive_path = get_archive_dir() / f"{table}_{datetime.now().strftime('%Y%m')}.jsonl.gz"
+
+    purged = 0
+    while True:
+        with state_db.connection() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM {table} "
+                f"WHERE {policy['time_column']} < ? AND {policy['finished']} "
+                f"ORDER BY id LIMIT ?",
+                (cutoff, BATCH_SIZE),
+            ).fetchall()
+        if not rows:
+            break
+
+        # Archive first, so a crash between the two steps loses nothing
+        with gzip.open(archive_path, "at", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(dict(row), ensure_ascii=False) + "\n")
+
+        ids = [row["id"] for row in rows]
+        with state_db.transaction() as conn:
+            conn.execute(
+                f"DELETE FROM {table} WHERE id IN ({', '.join('?' * len(ids))})",
+                ids,
+            )
+        purged += len(ids)
+
+        if len(rows) < BATCH_SIZE:
+            break
+
+    if purged:
+        logging.info(f"[STATE_RETENTION] Purged {purged} rows from {table} (before {cutoff}) -> {archive_path.name}")
+    return purged
+
+
+def maintain() -> None:
+    """ANALYZE, and VACUUM if enough of the file is free pages"""
+    with state_db.connection() as conn:
+        conn.execute("ANALYZE")
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        freelist_count = conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+        if page_count and freelist_count / page_count >= VACUUM_FREE_RATIO:
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            logging.info(f"[STATE_RETENTION] VACUUM reclaimed {freelist_count} of {page_count} pages")
+
+
+def run_retention() -> Dict[str, int]:
+    """
+    Apply every table policy, then maintain the database (scheduled daily)
+
+    Returns:
+        Rows purged per table
+    """
+    settings = get_settings()
+    purged = {}
+    for table, policy in POLICIES.items():
+        try:
+            purged[table] = purge_table(table, getattr(settings, policy["days_setting"]))
+        except Exception as e:
+            logging.error(f"[STATE_RETENTION] Failed to purge {table}: {e}")
+
+    try:
+        maintain()
+    except Exception as e:
+        logging.error(f"[STATE_RETENTION] Maintenance failed: {e}")
+
+    logging.info(f"[STATE_RETENTION] Done: {purged}")
+    return purged
@@ -0,0 +1,276 @@
+"""
+Agent Usage SQLite Database Manager
+SQLite database for recording per-agent token, cost and latency usage
+"""
+
+import sqlite3
+import os
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Dict, Any, Optional
+
+from app.config.settings import get_settings
+from app.cc_utils import sqlite_pool
+
+
+def get_db_path() -> Path:
+    """Return SQLite database file path"""
+    settings = get_settings()
+    base_dir = settings.FILESYSTEM_BASE_DIR or os.getcwd()
+    db_dir = Path(base_dir) / "db"
+    db_dir.mkdir(parents=True, exist_ok=True)
+    return db_dir / "usage.db"
+
+
+@contextmanager
+def connection() -> Iterator[sqlite3.Connection]:
+    """Borrow this thread's pooled connection for reads"""
+    with sqlite_pool.connection(get_db_path()) as conn:
+        yield conn
+
+
+@contextmanager
+def transaction() -> Iterator[sqlite3.Connection]:
+    """Run a block of writes as one transaction on this thread's pooled connection"""
+    with sqlite_pool.transaction(get_db_path()) as conn:
+        yield conn
+
+
+def init_db():
+    """Initialize database and create tables"""
+    with transaction() as conn:
+        _create_tables(conn.cursor())
+
+
+def _create_tables(cursor: sqlite3.Cursor) -> None:
+    """Create the usage tables and indexes"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS agent_usage (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            agent TEXT NOT NULL,
+            channel_id TEXT,
+            user_id TEXT,
+            model TEXT,
+            session_id TEXT,
+            wall_time_ms INTEGER DEFAULT 0,
+            duration_ms INTEGER DEFAULT 0,
+            duration_api_ms INTEGER DEFAULT 0,
+            num_turns INTEGER DEFAULT 0,
+            input_tokens INTEGER DEFAULT 0,
+            output_tokens INTEGER DEFAULT 0,
+            cache_creation_input_tokens INTEGER DEFAULT 0,
+            cache_read_input_tokens INTEGER DEFAULT 0,
+            total_cost_usd REAL DEFAULT 0,
+            is_error INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    # Create indexes (time-series queries are always bounded by created_at)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_usage_created_at
+        ON agent_usage(created_at)
+    """)
+
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_usage_agent_created_at
+        ON agent_usage(agent, created_at)
+    """)
+
+    # Context compaction events (how often and at what size compaction fires)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS context_compactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            agent TEXT NOT NULL,
+            channel_id TEXT,
+            session_id TEXT,
+            trigger TEXT NOT NULL,
+            estimated_tokens INTEGER DEFAULT 0,
+            context_window INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_compactions_agent_created_at
+        ON context_compactions(agent, created_at)
+    """)
+
+
+def add_usage(
+    agent: str,
+    channel_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+    model: Optional[str] = None,
+    session_id: Optional[str] = None,
+    wall_time_ms: int = 0,
+    duration_ms: int = 0,
+    duration_api_ms: int = 0,
+    num_turns: int = 0,
+    input_tokens: int = 0,
+    output_tokens: int = 0,
+    cache_creation_input_tokens: int = 0,
+    cache_read_input_tokens: int = 0,
+    total_cost_usd: float = 0.0,
+    is_error: bool = False
+) -> int:
+    """
+    Add a usage record for one agent session
+
+    Args:
+        agent: Agent name (e.g., "operator", "memory_retriever")
+        channel_id: Slack channel ID the session ran for (optional)
+        user_id: Slack user ID the session ran for (optional)
+        model: Model name used by the session
+        session_id: Claude session ID
+        wall_time_ms: Wall-clock time measured around the client session
+        duration_ms: Duration reported by ResultMessage
+        duration_api_ms: API duration reported by ResultMessage
+        num_turns: Turn count reported by ResultMessage
+        input_tokens: Input tokens
+        output_tokens: Output tokens
+        cache_creation_input_tokens: Cache write tokens
+        cache_read_input_tokens: Cache read tokens
+        total_cost_usd: Session cost in USD
+        is_error: Whether the session ended with an error
+
+    Returns:
+        ID of created record
+    """
+    created_at = datetime.now().isoformat()
+
+    with transaction() as conn:
+        cursor = conn.execute("""
+            INSERT INTO agent_usage (
+                agent, channel_id, user_id, model, session_id,
+                wall_time_ms, duration_ms, duration_api_ms, num_turns,
+                input_tokens, output_tokens, cache_creation_input_tokens, cache_read_input_tokens,
+                total_cost_usd, is_error, created_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (agent, channel_id, user_id, model, session_id,
+              wall_time_ms, duration_ms, duration_api_ms, num_turns,
+              input_tokens, output_tokens, cache_creation_input_tokens, cache_read_input_tokens,
+              total_cost_usd, 1 if is_error else 0, created_at))
+
+    return cursor.lastrowid
+
+
+def get_total_cost_since(since: datetime) -> float:
+    """
+    Get total cost of all agent sessions since a point in time
+
+    Args:
+        since: Start of the window (local time)
+
+    Returns:
+        Total cost in USD
+    """
+    with connection() as conn:
+        cursor = conn.execute("""
+            SELECT COALESCE(SUM(total_cost_usd), 0) AS total_cost
+            FROM agent_usage
+            WHERE created_at >= ?
+        """, (since.isoformat(),))
+        row = cursor.fetchone()
+
+    return float(row["total_cost"]) if row else 0.0
+
+
+def get_usage_summary(since: datetime, group_by: str = "agent") -> List[Dict[str, Any]]:
+    """
+    Get aggregated usage since a point in time
+
+    Args:
+        since: Start of the window (local time)
+        group_by: Grouping column ("agent", "channel_id" or "user_id")
+
+    Returns:
+        List of aggregated rows, most expensive first
+    """
+    if group_by not in ("agent", "channel_id", "user_id"):
+        raise ValueError(f"Invalid group_by: {group_by}")
+
+    with connection() as conn:
+        cursor = conn.execute(f"""
+            SELECT
+                {group_by} AS key,
+                COUNT(*) AS sessions,
+                SUM(wall_time_ms) AS wall_time_ms,
+                SUM(num_turns) AS num_turns,
+                SUM(input_tokens) AS input_tokens,
+                SUM(output_tokens) AS output_tokens,
+                SUM(cache_creation_input_tokens) AS cache_creation_input_tokens,
+                SUM(cache_read_input_tokens) AS cache_read_input_tokens,
+                SUM(total_cost_usd) AS total_cost_usd,
+                SUM(is_error) AS errors
+            FROM agent_usage
+            WHERE created_at >= ?
+            GROUP BY {group_by}
+            ORDER BY total_cost_usd DESC
+        """, (since.isoformat(),))
+        rows = cursor.fetchall()
+
+    return [dict(row) for row in rows]
+
+
+def add_compaction(
+    agent: str,
+    trigger: str,
+    estimated_tokens: int,
+    context_window: int,
+    channel_id: Optional[str] = None,
+    session_id: Optional[str] = None
+) -> int:
+    """
+    Add a context compaction event
+
+    Args:
+        agent: Agent name
+        trigger: What caused it ("preflight_trim", "proactive" or "overflow")
+        estimated_tokens: Estimated context size when compaction fired
+        context_window: Model context window in tokens
+        channel_id: Slack channel ID (optional)
+        session_id: Claude session ID (optional)
+
+    Returns:
+        ID of created record
+    """
+    created_at = datetime.now().isoformat()
+
+    with transaction() as conn:
+        cursor = conn.execute("""
+            INSERT INTO context_compactions (
+                agent, channel_id, session_id, trigger, estimated_tokens, context_window, created_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (agent, channel_id, session_id, trigger, estimated_tokens, context_window, created_at))
+
+    return cursor.lastrowid
+
+
+def get_compaction_summary(since: datetime) -> List[Dict[str, Any]]:
+    """
+    Get compaction counts and sizes per agent and trigger since a point in time
+
+    Args:
+        since: Start of the window (local time)
+
+    Returns:
+        List of aggregated rows
+    """
+    with connection() as conn:
+        cursor = conn.execute("""
+            SELECT
+                agent,
+                trigger,
+                COUNT(*) AS count,
+                AVG(estimated_tokens) AS avg_estimated_tokens,
+                MAX(estimated_tokens) AS max_estimated_tokens
+            FROM context_compactions
+            WHERE created_at >= ?
+            GROUP BY agent, trigger
+            ORDER BY count DESC
+        """, (since.isoformat(),))
+        rows = cursor.fetchall()
+
+    return [dict(row) for row in rows]
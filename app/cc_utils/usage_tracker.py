@@ -0,0 +1,247 @@
+"""
+Agent Usage Tracker
+Central accounting hook around ClaudeSDKClient sessions (tokens, cost, latency)
+and daily/monthly budget caps for non-interactive agents
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional
+
+from app.cc_utils import sqlite_pool
+from app.config.settings import get_settings
+
+# Agents that are not answering a user in real time.
+# Over budget they are downgraded to a cheaper model, or deferred to a later run.
+NON_INTERACTIVE_AGENTS = {
+    "memory_manager",
+    "dynamic_suggester",
+    "email_fetcher",
+    "email_task_extractor",
+    "jira_fetcher",
+    "jira_task_extractor",
+    "confluence_fetcher",
+    "confluence_summarizer",
+}
+
+# Non-interactive agents whose work would be lost if skipped (downgrade only)
+NEVER_DEFER_AGENTS = {"memory_manager"}
+
+# Seconds to reuse the computed daily/monthly totals before querying again
+_BUDGET_CACHE_TTL = 60.0
+_budget_cache = {"expires_at": 0.0, "daily": 0.0, "monthly": 0.0}
+
+
+class UsageRecorder:
+    """Collects the ResultMessage of one agent session"""
+
+    def __init__(self, agent: str, channel_id: Optional[str], user_id: Optional[str], model: Optional[str]):
+        self.agent = agent
+        self.channel_id = channel_id
+        self.user_id = user_id
+        self.model = model
+        self.result = None
+
+    def record(self, result_message) -> None:
+        """Keep the latest ResultMessage (multi-query sessions accumulate below)"""
+        if self.result is None:
+            self.result = result_message
+            return
+
+        # Same client used for several queries (e.g. /compact + retry): sum up
+        previous = self.result
+        merged_usage = dict(previous.usage or {})
+        for key, value in (result_message.usage or {}).items():
+            if isinstance(value, (int, float)):
+                merged_usage[key] = merged_usage.get(key, 0) + value
+        result_message.usage = merged_usage
+        result_message.num_turns = (previous.num_turns or 0) + (result_message.num_turns or 0)
+        result_message.duration_ms = (previous.duration_ms or 0) + (result_message.duration_ms or 0)
+        result_message.duration_api_ms = (previous.duration_api_ms or 0) + (result_message.duration_api_ms or 0)
+        result_message.total_cost_usd = (previous.total_cost_usd or 0) + (result_message.total_cost_usd or 0)
+        self.result = result_message
+
+
+@contextmanager
+def track_usage(
+    agent: str,
+    channel_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+    model: Optional[str] = None,
+):
+    """
+    Measure one ClaudeSDKClient session and store its usage
+
+    Usage:
+        with track_usage("simple_chat", channel_id, user_id, model) as usage:
+            async with ClaudeSDKClient(options=options) as client:
+                ...
+                if isinstance(message, ResultMessage):
+                    usage.record(message)
+
+    Args:
+        agent: Agent name
+        channel_id: Slack channel ID (optional)
+        user_id: Slack user ID (optional)
+        model: Model name used by the session (optional)
+    """
+    recorder = UsageRecorder(agent, channel_id, user_id, model)
+    started_at = time.monotonic()
+    try:
+        yield recorder
+    finally:
+        wall_time_ms = int((time.monotonic() - started_at) * 1000)
+        _write_in_background(_store_usage, recorder, wall_time_ms)
+
+
+def _write_in_background(func, *args, **kwargs) -> None:
+    """Run a usage write on the DB thread pool when called from the event loop"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        func(*args, **kwargs)
+        return
+    sqlite_pool.submit(func, *args, **kwargs)
+
+
+def _store_usage(recorder: UsageRecorder, wall_time_ms: int) -> None:
+    """Write usage record (never raises into the agent)"""
+    settings = get_settings()
+    if not settings.USAGE_TRACKING_ENABLED:
+        return
+
+    result = recorder.result
+    usage = (getattr(result, "usage", None) or {}) if result else {}
+
+    try:
+        from app.cc_utils.usage_db import add_usage
+
+        add_usage(
+            agent=recorder.agent,
+            channel_id=recorder.channel_id,
+            user_id=recorder.user_id,
+            model=recorder.model,
+            session_id=getattr(result, "session_id", None),
+            wall_time_ms=wall_time_ms,
+            duration_ms=getattr(result, "duration_ms", 0) or 0,
+            duration_api_ms=getattr(result, "duration_api_ms", 0) or 0,
+            num_turns=getattr(result, "num_turns", 0) or 0,
+            input_tokens=usage.get("input_tokens", 0) or 0,
+            output_tokens=usage.get("output_tokens", 0) or 0,
+            cache_creation_input_tokens=usage.get("cache_creation_input_tokens", 0) or 0,
+            cache_read_input_tokens=usage.get("cache_read_input_tokens", 0) or 0,
+            total_cost_usd=getattr(result, "total_cost_usd", 0.0) or 0.0,
+            is_error=result is None or bool(getattr(result, "is_error", False)),
+        )
+        # Budget totals changed
+        _budget_cache["expires_at"] = 0.0
+    except Exception as e:
+        logging.warning(f"[USAGE_TRACKER] Failed to record usage for {recorder.agent}: {e}")
+
+
+def _read_spent() -> tuple:
+    """Query (daily, monthly) spend in USD (blocking)"""
+    from app.cc_utils.usage_db import get_total_cost_since
+
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    month_start = today.replace(day=1)
+    return get_total_cost_since(today), get_total_cost_since(month_start)
+
+
+async def _get_spent() -> tuple:
+    """Return (daily, monthly) spend in USD, cached for a short time"""
+    now = time.monotonic()
+    if now < _budget_cache["expires_at"]:
+        return _budget_cache["daily"], _budget_cache["monthly"]
+
+    daily, monthly = await sqlite_pool.run(_read_spent)
+    _budget_cache["daily"] = daily
+    _budget_cache["monthly"] = monthly
+    _budget_cache["expires_at"] = now + _BUDGET_CACHE_TTL
+    return daily, monthly
+
+
+async def apply_budget_policy(agent: str, model: str) -> Optional[str]:
+    """
+    Apply daily/monthly budget caps to an agent run
+
+    - Interactive agents always run with the requested model
+    - Daily cap exceeded: non-interactive agents run with USAGE_DOWNGRADE_MODEL
+    - Monthly cap exceeded: non-interactive agents are deferred (except NEVER_DEFER_AGENTS)
+
+    Args:
+        agent: Agent name
+        model: Model the agent would normally use
+
+    Returns:
+        Model to use, or None if the run should be deferred
+    """
+    settings = get_settings()
+    if agent not in NON_INTERACTIVE_AGENTS:
+        return model
+
+    daily_cap = settings.USAGE_DAILY_BUDGET_USD
+    monthly_cap = settings.USAGE_MONTHLY_BUDGET_USD
+    if daily_cap <= 0 and monthly_cap <= 0:
+        return model
+
+    try:
+        daily_spent, monthly_spent = await _get_spent()
+    except Exception as e:
+        logging.warning(f"[USAGE_TRACKER] Failed to read budget totals: {e}")
+        return model
+
+    if monthly_cap > 0 and monthly_spent >= monthly_cap:
+        if agent not in NEVER_DEFER_AGENTS:
+            logging.warning(
+                f"[USAGE_TRACKER] Monthly budget exceeded (${monthly_spent:.2f}/${monthly_cap:.2f}), deferring {agent}"
+            )
+            return None
+        return settings.USAGE_DOWNGRADE_MODEL
+
+    if daily_cap > 0 and daily_spent >= daily_cap:
+        logging.info(
+            f"[USAGE_TRACKER] Daily budget exceeded (${daily_spent:.2f}/${daily_cap:.2f}), downgrading {agent} to {settings.USAGE_DOWNGRADE_MODEL}"
+        )
+        return settings.USAGE_DOWNGRADE_MODEL
+
+    return model
+
+
+def record_compaction(
+    agent: str,
+    trigger: str,
+    estimated_tokens: int,
+    context_window: int,
+    channel_id: Optional[str] = None,
+    session_id: Optional[str] = None,
+) -> None:
+    """Write a context compaction event in the background (never raises into the agent)"""
+    logging.info(
+        f"[USAGE_TRACKER] {agent} compaction ({trigger}) at ~{estimated_tokens}/{context_window} tokens"
+    )
+    if not get_settings().USAGE_TRACKING_ENABLED:
+        return
+
+    _write_in_background(
+        _store_compaction,
+        agent=agent,
+        trigger=trigger,
+        estimated_tokens=estimated_tokens,
+        context_window=context_window,
+        channel_id=channel_id,
+        session_id=session_id,
+    )
+
+
+def _store_compaction(agent: str, **fields) -> None:
+    """Write compaction record (never raises into the agent)"""
+    try:
+        from app.cc_utils.usage_db import add_compaction
+
+        add_compaction(agent=agent, **fields)
+    except Exception as e:
+        logging.warning(f"[USAGE_TRACKER] Failed to record compaction for {agent}: {e}")
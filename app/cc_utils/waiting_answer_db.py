@@ -1,80 +1,12 @@
 """
 Waiting Answer SQLite Database Manager
-SQLite database for managing pending response queries
+waiting_answers table of the bot state database (state_db) for managing pending response queries
 """
 
-import sqlite3
-import os
 from datetime import datetime
-from pathlib import Path
 from typing import List, Dict, Any, Optional
 
-from app.config.settings import get_settings
-
-
-def get_db_path() -> Path:
-    """Return SQLite database file path"""
-    settings = get_settings()
-    base_dir = settings.FILESYSTEM_BASE_DIR or os.getcwd()
-    db_dir = Path(base_dir) / "db"
-    db_dir.mkdir(parents=True, exist_ok=True)
-    return db_dir / "waiting_answers.db"
-
-
-def get_connection() -> sqlite3.Connection:
-    """Return SQLite connection (with Row factory set)"""
-    conn = sqlite3.connect(get_db_path())
-    conn.row_factory = sqlite3.Row
-    return conn
-
-
-def init_db():
-    """Initialize database and create tables"""
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS waiting_answers (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            request_id TEXT NOT NULL,
-            channel_id TEXT NOT NULL,
-            requester_id TEXT NOT NULL,
-            requester_name TEXT,
-            request_content TEXT NOT NULL,
-            respondent_user_id TEXT NOT NULL,
-            respondent_name TEXT,
-            responded INTEGER DEFAULT 0,
-            response TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            status TEXT DEFAULT 'in_progress'
-        )
-    """)
-
-    # Add columns to existing table (migration)
-    try:
-        cursor.execute("ALTER TABLE waiting_answers ADD COLUMN requester_name TEXT")
-    except:
-        pass  # Ignore if already exists
-
-    try:
-        cursor.execute("ALTER TABLE waiting_answers ADD COLUMN respondent_name TEXT")
-    except:
-        pass  # Ignore if already exists
-
-    # Create indexes
-    cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_request_id
-        ON waiting_answers(request_id)
-    """)
-
-    cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_respondent
-        ON waiting_answers(respondent_user_id, responded)
-    """)
-
-    conn.commit()
-    conn.close()
+from app.cc_utils import pending_index, sqlite_pool, state_db
 
 
 def add_request(
@@ -99,28 +31,23 @@ def add_request(
     Returns:
         Number of records added
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-
     created_at = datetime.now().isoformat()
 
-    for respondent in respondents:
-        respondent_user_id = respondent.get("user_id")
-        respondent_name = respondent.get("name", "")
-
-        cursor.execute("""
+    # One batched insert for all respondents
+    with state_db.transaction() as conn:
+        conn.executemany("""
             INSERT INTO waiting_answers (
                 request_id, channel_id, requester_id, requester_name, request_content,
                 respondent_user_id, respondent_name, responded, response, created_at, status
             ) VALUES (?, ?, ?, ?, ?, ?, ?, 0, NULL, ?, 'in_progress')
-        """, (request_id, channel_id, requester_id, requester_name, request_content,
-              respondent_user_id, respondent_name, created_at))
+        """, [
+            (request_id, channel_id, requester_id, requester_name, request_content,
+             respondent.get("user_id"), respondent.get("name", ""), created_at)
+            for respondent in respondents
+        ])
 
-    conn.commit()
-    count = len(respondents)
-    conn.close()
-
-    return count
+    pending_index.add_waiting(request_id, [respondent.get("user_id") for respondent in respondents], created_at)
+    return len(respondents)
 
 
 def get_user_pending_requests(user_id: str) -> List[Dict[str, Any]]:
@@ -133,21 +60,25 @@ def get_user_pending_requests(user_id: str) -> List[Dict[str, Any]]:
     Returns:
         List of pending queries (within last 24 hours)
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT
-            id, request_id, channel_id, requester_id, requester_name, request_content,
-            respondent_user_id, respondent_name, responded, response, created_at, updated_at, status
-        FROM waiting_answers
-        WHERE respondent_user_id = ? AND responded = 0
-          AND created_at >= datetime('now', '-1 day')
-        ORDER BY created_at DESC
-    """, (user_id,))
-
-    rows = cursor.fetchall()
-    conn.close()
+    # The pending index answers the common "nothing pending" case without a query
+    request_ids = pending_index.pending_request_ids(user_id)
+    if not request_ids:
+        return []
+
+    with state_db.connection() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute(f"""
+            SELECT
+                id, request_id, channel_id, requester_id, requester_name, request_content,
+                respondent_user_id, respondent_name, responded, response, created_at, updated_at, status
+            FROM waiting_answers
+            WHERE respondent_user_id = ? AND responded = 0
+              AND request_id IN ({', '.join('?' * len(request_ids))})
+            ORDER BY created_at DESC
+        """, (user_id, *request_ids))
+
+        rows = cursor.fetchall()
 
     return [dict(row) for row in rows]
 
@@ -168,24 +99,24 @@ def update_response(
     Returns:
         Whether update was successful
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    updated_at = datetime.now().isoformat()
-
-    cursor.execute("""
-        UPDATE waiting_answers
-        SET responded = 1,
-            response = ?,
-            updated_at = ?,
-            status = 'completed'
-        WHERE request_id = ? AND respondent_user_id = ?
-    """, (response, updated_at, request_id, user_id))
+    with state_db.transaction() as conn:
+        cursor = conn.cursor()
 
-    conn.commit()
-    success = cursor.rowcount > 0
-    conn.close()
+        updated_at = datetime.now().isoformat()
 
+        cursor.execute("""
+            UPDATE waiting_answers
+            SET responded = 1,
+                response = ?,
+                updated_at = ?,
+                status = 'completed'
+            WHERE request_id = ? AND respondent_user_id = ?
+        """, (response, updated_at, request_id, user_id))
+
+        success = cursor.rowcount > 0
+
+    if success:
+        pending_index.remove_waiting(request_id, user_id)
     return success
 
 
@@ -200,19 +131,18 @@ def get_request_by_id(request_id: str, user_id: str) -> Optional[Dict[str, Any]]
     Returns:
         Query info or None
     """
-    conn = get_connection()
-    cursor = conn.cursor()
+    with state_db.connection() as conn:
+        cursor = conn.cursor()
 
-    cursor.execute("""
-        SELECT
-            id, request_id, channel_id, requester_id, requester_name, request_content,
-            respondent_user_id, respondent_name, responded, response, created_at, updated_at, status
-        FROM waiting_answers
-        WHERE request_id = ? AND respondent_user_id = ?
-    """, (request_id, user_id))
+        cursor.execute("""
+            SELECT
+                id, request_id, channel_id, requester_id, requester_name, request_content,
+                respondent_user_id, respondent_name, responded, response, created_at, updated_at, status
+            FROM waiting_answers
+            WHERE request_id = ? AND respondent_user_id = ?
+        """, (request_id, user_id))
 
-    row = cursor.fetchone()
-    conn.close()
+        row = cursor.fetchone()
 
     return dict(row) if row else None
 
@@ -227,20 +157,19 @@ def get_all_responses_for_request(request_id: str) -> List[Dict[str, Any]]:
     Returns:
         List of all respondents' responses
     """
-    conn = get_connection()
-    cursor = conn.cursor()
+    with state_db.connection() as conn:
+        cursor = conn.cursor()
 
-    cursor.execute("""
-        SELECT
-            id, request_id, channel_id, requester_id, requester_name, request_content,
-            respondent_user_id, respondent_name, responded, response, created_at, updated_at, status
-        FROM waiting_answers
-        WHERE request_id = ?
-        ORDER BY created_at ASC
-    """, (request_id,))
+        cursor.execute("""
+            SELECT
+                id, request_id, channel_id, requester_id, requester_name, request_content,
+                respondent_user_id, respondent_name, responded, response, created_at, updated_at, status
+            FROM waiting_answers
+            WHERE request_id = ?
+            ORDER BY created_at ASC
+        """, (request_id,))
 
-    rows = cursor.fetchall()
-    conn.close()
+        rows = cursor.fetchall()
 
     return [dict(row) for row in rows]
 
@@ -255,21 +184,29 @@ def get_request_progress(request_id: str) -> Dict[str, int]:
     Returns:
         {"total": Total respondent count, "completed": Completed response count}
     """
-    conn = get_connection()
-    cursor = conn.cursor()
+    with state_db.connection() as conn:
+        cursor = conn.cursor()
 
-    cursor.execute("""
-        SELECT
-            COUNT(*) as total,
-            SUM(responded) as completed
-        FROM waiting_answers
-        WHERE request_id = ?
-    """, (request_id,))
+        cursor.execute("""
+            SELECT
+                COUNT(*) as total,
+                SUM(responded) as completed
+            FROM waiting_answers
+            WHERE request_id = ?
+        """, (request_id,))
 
-    row = cursor.fetchone()
-    conn.close()
+        row = cursor.fetchone()
 
     return {
         "total": row["total"] if row else 0,
         "completed": row["completed"] if row and row["completed"] else 0
     }
+
+
+# Async variants for the event loop (run on the shared DB thread pool)
+add_request_async = sqlite_pool.to_async(add_request)
+get_user_pending_requests_async = sqlite_pool.to_async(get_user_pending_requests)
+update_response_async = sqlite_pool.to_async(update_response)
+get_request_by_id_async = sqlite_pool.to_async(get_request_by_id)
+get_all_responses_for_request_async = sqlite_pool.to_async(get_all_responses_for_request)
+get_request_progress_async = sqlite_pool.to_async(get_request_progress)
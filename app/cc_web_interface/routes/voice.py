@@ -7,7 +7,7 @@ import logging
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from slack_sdk.web.async_client import AsyncWebClient
 
-from app.queueing_extended import enqueue_message
+from app.queueing_extended import enqueue_internal_job
 from app.cc_web_interface.utils import get_slack_user_id
 from app.config.settings import get_settings
 
@@ -70,14 +70,16 @@ async def websocket_voice(websocket: WebSocket):
 
                     logger.info(f"[VOICE] Received from {user_name}({slack_user_id}): {message[:50]}...")
 
-                    # Add to message queue (using actual DM channel)
-                    await enqueue_message({
-                        "text": message,
-                        "channel": dm_channel_id,
-                        "ts": "",
-                        "user": slack_user_id,
-                        "thread_ts": None,
-                    })
+                    # Internal job in the actual DM channel (the user is already logged in,
+                    # so no bot call detection; simple_chat first, operator if needed)
+                    await enqueue_internal_job(
+                        source="voice",
+                        text=message,
+                        channel_id=dm_channel_id,
+                        user_id=slack_user_id,
+                        route="simple",
+                        user_name=user_info.get("name"),  # None if unknown: looked up from Slack
+                    )
 
                     await websocket.send_json({
                         "type": "processed",
@@ -116,6 +116,85 @@ class Settings(BaseSettings):
     DYNAMIC_SUGGESTER_ENABLED: bool = False
     DYNAMIC_SUGGESTER_INTERVAL: int = 15
 
+    # Usage accounting & budget caps (0 = no cap)
+    USAGE_TRACKING_ENABLED: bool = True
+    USAGE_DAILY_BUDGET_USD: float = 0.0
+    USAGE_MONTHLY_BUDGET_USD: float = 0.0
+    USAGE_DOWNGRADE_MODEL: str = "haiku"  # Used by non-interactive agents over the daily cap
+
+    # Operator context budget (compact before the model limit is reached)
+    OPERATOR_CONTEXT_WINDOW_TOKENS: int = 200000
+    OPERATOR_COMPACT_THRESHOLD: float = 0.75
+
+    # Operator progress replies (placeholder updated with chat.update)
+    OPERATOR_PROGRESS_ENABLED: bool = True
+    OPERATOR_PROGRESS_DELAY_SECONDS: float = 5.0   # Only long runs get a placeholder
+    OPERATOR_PROGRESS_UPDATE_INTERVAL: float = 3.0  # Minimum seconds between chat.update calls
+
+    # Operator session resumption for thread follow-ups
+    OPERATOR_SESSION_RESUME_ENABLED: bool = True
+    OPERATOR_SESSION_TTL_MINUTES: int = 60
+    OPERATOR_SESSION_MAX_ENTRIES: int = 200
+
+    # Memory retrieval index
+    MEMORY_INDEX_ENABLED: bool = True
+    MEMORY_INDEX_TOP_K: int = 8
+    MEMORY_DIRECT_LOOKUP_MAX_CHARS: int = 0  # Skip the retriever LLM if candidates fit (0 = never skip)
+    MEMORY_DIRECT_LOOKUP_MIN_SCORE: float = 0.5  # A non channel/user candidate must score this (BM25; 0..1 with semantic search)
+
+    # Memory semantic search (optional, install the "embeddings" extra: uv sync --extra embeddings)
+    MEMORY_EMBEDDING_ENABLED: bool = False
+    MEMORY_EMBEDDING_MODEL: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+    MEMORY_HYBRID_LEXICAL_WEIGHT: float = 0.5  # BM25 share of the hybrid score (rest is cosine similarity)
+
+    # Memory retrieval cache
+    MEMORY_RETRIEVAL_CACHE_ENABLED: bool = True
+    MEMORY_RETRIEVAL_CACHE_TTL_SECONDS: int = 3600
+    MEMORY_RETRIEVAL_CACHE_MAX_ENTRIES: int = 500
+
+    # Memory change feed
+    MEMORY_CHANGE_FEED_ENABLED: bool = True
+    MEMORY_CHANGE_SCAN_INTERVAL_SECONDS: int = 60  # Fallback mtime scan (the only trigger without watchdog)
+    MEMORY_CHANGE_JOURNAL_MAX_ROWS: int = 10000
+
+    # Memory compaction (near-duplicate merge)
+    MEMORY_COMPACTION_ENABLED: bool = False
+    MEMORY_COMPACTION_HOUR: int = 4
+    MEMORY_COMPACTION_FLAG_THRESHOLD: float = 0.8  # Report pairs at or above this Jaccard similarity
+    MEMORY_COMPACTION_MERGE_THRESHOLD: float = 0.95  # Merge pairs at or above this similarity
+
+    # SQLite access (threads running DB calls off the event loop; one pooled connection per thread)
+    DB_POOL_THREADS: int = 4
+
+    # Bot state retention (finished rows archived to db/archive/*.jsonl.gz, then deleted)
+    STATE_DB_RETENTION_ENABLED: bool = True
+    STATE_DB_RETENTION_HOUR: int = 3
+    WAITING_ANSWERS_RETENTION_DAYS: int = 30
+    CONFIRMS_RETENTION_DAYS: int = 30
+    EMAIL_TASKS_RETENTION_DAYS: int = 30
+    JIRA_TASKS_RETENTION_DAYS: int = 90
+    PROCESSED_EMAILS_RETENTION_DAYS: int = 90
+
+    # User schedules (misfire window of the "coalesce" policy, used by default for cron schedules)
+    SCHEDULE_MISFIRE_GRACE_SECONDS: int = 3600
+    # Burst smoothing: release rate (0 = unlimited), burst size and jitter window for crowded minutes
+    SCHEDULE_RELEASE_PER_MINUTE: int = 6
+    SCHEDULE_RELEASE_BURST: int = 3
+    SCHEDULE_JITTER_SECONDS: int = 300
+    # Prepare Slack context and memory this many minutes before a schedule fires
+    SCHEDULE_PREFETCH_ENABLED: bool = True
+    SCHEDULE_PREFETCH_LEAD_MINUTES: int = 5
+
+    # Memory save fast path (trivial saves dropped, simple facts written without the LLM)
+    MEMORY_FAST_PATH_ENABLED: bool = True
+
+    # Memory writers (each job writes one channel/user/topic file scope; the same scope always runs in order)
+    MEMORY_WRITER_SHARDS: int = 4
+
+    # Memory snapshots (consistent reads for the retriever)
+    MEMORY_SNAPSHOTS_ENABLED: bool = True
+    MEMORY_SNAPSHOT_KEEP: int = 5
+
     # Debug
     DEBUG_SLACK_MESSAGES_ENABLED: bool = False
 
@@ -157,6 +236,7 @@ class Settings(BaseSettings):
             object.__setattr__(self, 'MODEL_FOR_SIMPLE', vertex_model_map.get(self.MODEL_FOR_SIMPLE, self.MODEL_FOR_SIMPLE))
             object.__setattr__(self, 'MODEL_FOR_MODERATE', vertex_model_map.get(self.MODEL_FOR_MODERATE, self.MODEL_FOR_MODERATE))
             object.__setattr__(self, 'MODEL_FOR_COMPLEX', vertex_model_map.get(self.MODEL_FOR_COMPLEX, self.MODEL_FOR_COMPLEX))
+            object.__setattr__(self, 'USAGE_DOWNGRADE_MODEL', vertex_model_map.get(self.USAGE_DOWNGRADE_MODEL, self.USAGE_DOWNGRADE_MODEL))
 
 @lru_cache
 def get_settings() -> Settings:
@@ -20,13 +20,13 @@ from slack_bolt.async_app import AsyncApp
 
 from app.config.settings import get_settings
 from app.queueing_extended import start_channel_workers
-from app.scheduler import scheduler, reload_schedules_from_file
+from app.scheduler import scheduler, load_schedules, export_schedules_to_file
 from app.cc_slack_handlers import _process_message_logic
 from app.cc_slack_handlers import register_handlers
-from app.cc_utils.waiting_answer_db import init_db
-from app.cc_utils.confirm_db import init_db as init_confirm_db
-from app.cc_utils.email_tasks_db import init_db as init_email_tasks_db
-from app.cc_utils.jira_tasks_db import init_db as init_jira_tasks_db
+from app.cc_utils.state_db import init_db as init_state_db
+from app.cc_utils.usage_db import init_db as init_usage_db
+from app.cc_utils.memory_store import init_db as init_memory_changes_db
+from app.cc_utils.memory_catalog_db import init_db as init_memory_catalog_db
 
 settings = get_settings()
 
@@ -101,21 +101,26 @@ async def main():
         else:
             logging.info("[CHROME_SETUP] Chrome profile already exists, skipping setup")
 
-    # 2. Initialize waiting_answer database
-    init_db()
-    logging.info("Waiting answer database initialized")
+    # 2. Initialize bot state database (waiting answers, confirms, email/jira tasks)
+    init_state_db()
+    logging.info("Bot state database initialized")
 
-    # 2-1. Initialize confirm database
-    init_confirm_db()
-    logging.info("Confirm database initialized")
+    # Load pending waiting-answers / confirms into memory (checked on every message)
+    from app.cc_utils import pending_index
 
-    # 2-2. Initialize email tasks database
-    init_email_tasks_db()
-    logging.info("Email tasks database initialized")
+    pending_index.load()
 
-    # 2-3. Initialize jira tasks database
-    init_jira_tasks_db()
-    logging.info("Jira tasks database initialized")
+    # 2-1. Initialize usage database
+    init_usage_db()
+    logging.info("Usage database initialized")
+
+    # 2-2. Initialize memory change journal
+    init_memory_changes_db()
+    logging.info("Memory change journal initialized")
+
+    # 2-3. Initialize memory catalog database
+    init_memory_catalog_db()
+    logging.info("Memory catalog database initialized")
 
     # 3. Validate signing secret
     if not settings.SLACK_SIGNING_SECRET or settings.SLACK_SIGNING_SECRET == "...":
@@ -152,6 +157,25 @@ async def main():
 
     # 7-2. Wrap the orchestrator process
     async def orchestrator_wrapper(job, client):
+        from app.cc_agents.operator.agent import call_operator_agent, SessionResumeError
+
+        # Thread follow-up: resume the previous session, fall back to a fresh one
+        resume_session = job.get("resume_session")
+        if resume_session:
+            try:
+                response = await call_operator_agent(
+                    user_query=job["query"],
+                    slack_data=job["slack_data"],
+                    message_data=job["message_data"],
+                    resume_session=resume_session,
+                )
+                logging.info(
+                    f"[ORCHESTRATOR_WRAPPER] Resumed response: {response[:100] if response else 'None'}..."
+                )
+                return
+            except SessionResumeError as e:
+                logging.warning(f"[ORCHESTRATOR_WRAPPER] Session resume failed, starting a fresh session: {e}")
+
         # Get memory (reuse if already retrieved, otherwise retrieve new)
         retrieved_memory = job.get("retrieved_memory")
         if not retrieved_memory:
@@ -159,7 +183,7 @@ async def main():
 
             logging.info(f"[ORCHESTRATOR_WRAPPER] Retrieving relevant memories...")
             retrieved_memory = await call_memory_retriever(
-                query=job["query"],
+                query=job.get("memory_query") or job["query"],
                 slack_data=job["slack_data"],
                 message_data=job["message_data"],
             )
@@ -172,8 +196,6 @@ async def main():
             )
 
         # Run Operator
-        from app.cc_agents.operator.agent import call_operator_agent
-
         response = await call_operator_agent(
             user_query=job["query"],
             slack_data=job["slack_data"],
@@ -189,25 +211,80 @@ async def main():
         """Worker that processes memory save tasks"""
         from app.cc_agents.memory_manager import call_memory_manager
 
+        # Near-duplicate compaction runs on the same worker so it never races a save
+        if job.get("type") == "compaction":
+            from app.cc_utils.memory_compaction import compact_memories
+
+            await asyncio.to_thread(compact_memories)
+            return
+
+        if job.get("type") == "direct":
+            # Structured fact from the fast path: written without a memory manager session
+            from app.cc_utils.memory_fast_path import write_fact
+
+            return await asyncio.to_thread(write_fact, job["fact"]) is not None
+
         memory_query = job.get("memory_query")
 
         if not memory_query:
             logging.warning(f"[MEMORY_WRAPPER] No memory query in job")
-            return
+            return False
 
         logging.info(f"[MEMORY_WRAPPER] Saving memory: {memory_query[:100]}...")
-        await call_memory_manager(memory_query)
+        await call_memory_manager(
+            memory_query, shard_key=job.get("shard_key"), allow_handoff=not job.get("handoff")
+        )
         logging.info(f"[MEMORY_WRAPPER] Memory saved successfully")
 
+    async def memory_publish_wrapper():
+        """Publish memory changes (runs only while no memory job is writing)"""
+        from app.cc_utils import memory_snapshots, memory_store
+        from app.cc_utils.memory_index_md import apply_index_updates
+
+        # Bump the memory generation so cached retrievals over changed files are dropped,
+        # merge the changes into index.md, then publish a consistent snapshot for readers
+        await asyncio.to_thread(memory_store.scan_changes)
+        await asyncio.to_thread(apply_index_updates)
+        await asyncio.to_thread(memory_snapshots.publish_snapshot)
+
+        # Re-embed only the memory files that changed
+        if settings.MEMORY_EMBEDDING_ENABLED:
+            from app.cc_utils import memory_vectors
+
+            await asyncio.to_thread(memory_vectors.refresh)
+
     # 7-4. Start the workers
     from app.queueing_extended import start_orchestrator_worker, start_memory_worker
 
     start_channel_workers(app, process_wrapper, workers_per_channel=8)
     start_orchestrator_worker(app, orchestrator_wrapper, num_workers=3)
-    start_memory_worker(memory_worker_wrapper)
+    start_memory_worker(
+        memory_worker_wrapper, num_shards=settings.MEMORY_WRITER_SHARDS, publish_func=memory_publish_wrapper
+    )
+
+    # 7-5. Start the memory change feed (the catalog follows every change batch)
+    from app.cc_utils import memory_store
+    from app.cc_utils.memory_catalog_db import sync_catalog
+
+    memory_store.subscribe(lambda changes: sync_catalog())
+    if settings.MEMORY_CHANGE_FEED_ENABLED:
+        await asyncio.to_thread(memory_store.start_watcher)
+    await asyncio.to_thread(sync_catalog)
+
+    # Publish the first memory snapshot for readers
+    from app.cc_utils import memory_snapshots
+
+    await asyncio.to_thread(memory_snapshots.publish_snapshot)
+
+    # 7-6. Build the memory embedding index in the background (optional)
+    if settings.MEMORY_EMBEDDING_ENABLED:
+        from app.cc_utils import memory_vectors
+
+        asyncio.create_task(asyncio.to_thread(memory_vectors.refresh))
+        logging.info("[MEMORY_VECTORS] Background embedding refresh started")
 
     # 8. Start the scheduler
-    await reload_schedules_from_file()
+    await load_schedules()
 
     # 8-1. Add MS365 (Outlook) checker job
     if settings.OUTLOOK_CHECK_ENABLED and settings.MS365_ENABLED:
@@ -277,6 +354,80 @@ async def main():
             f"[SCHEDULER] Dynamic suggester registered (interval: {settings.DYNAMIC_SUGGESTER_INTERVAL} minutes)"
         )
 
+    # 8-5. Add memory compaction job (runs alone on the memory workers)
+    if settings.MEMORY_COMPACTION_ENABLED:
+        from app.queueing_extended import enqueue_memory_job
+
+        async def enqueue_memory_compaction():
+            await enqueue_memory_job({"type": "compaction", "exclusive": True})
+
+        scheduler.add_job(
+            enqueue_memory_compaction,
+            trigger="cron",
+            hour=settings.MEMORY_COMPACTION_HOUR,
+            id="memory_compaction",
+            name="Memory Compaction",
+        )
+        logging.info(
+            f"[SCHEDULER] Memory compaction registered (daily at {settings.MEMORY_COMPACTION_HOUR}:00)"
+        )
+
+    # 8-6. Expire pending waiting-answers / confirms from the in-memory index
+    scheduler.add_job(
+        pending_index.expire,
+        trigger="interval",
+        minutes=1,
+        id="pending_index_expiry",
+        name="Pending Index Expiry",
+    )
+
+    # 8-7. Add bot state retention job (archive + purge old rows, ANALYZE/VACUUM)
+    if settings.STATE_DB_RETENTION_ENABLED:
+        from app.cc_utils import sqlite_pool
+        from app.cc_utils.state_retention import run_retention
+
+        scheduler.add_job(
+            sqlite_pool.to_async(run_retention),
+            trigger="cron",
+            hour=settings.STATE_DB_RETENTION_HOUR,
+            id="state_db_retention",
+            name="Bot State Retention",
+        )
+        logging.info(
+            f"[SCHEDULER] Bot state retention registered (daily at {settings.STATE_DB_RETENTION_HOUR}:00)"
+        )
+
+    # 8-8. Refresh the schedule load forecast (crowded minutes get jitter)
+    from datetime import datetime
+    from app.scheduler import refresh_load_forecast
+
+    scheduler.add_job(
+        refresh_load_forecast,
+        trigger="interval",
+        minutes=10,
+        next_run_time=datetime.now(),
+        id="schedule_load_forecast",
+        name="Schedule Load Forecast",
+    )
+
+    # 8-9. Prefetch context for schedules about to fire (operator starts right at trigger time)
+    if settings.SCHEDULE_PREFETCH_ENABLED:
+        from app.scheduler import prefetch_schedule_contexts
+
+        scheduler.add_job(
+            prefetch_schedule_contexts,
+            trigger="interval",
+            minutes=1,
+            # A pass can outlast the interval; overlapping passes would prefetch the same schedules
+            max_instances=1,
+            coalesce=True,
+            id="schedule_context_prefetch",
+            name="Schedule Context Prefetch",
+        )
+        logging.info(
+            f"[SCHEDULER] Schedule context prefetch registered ({settings.SCHEDULE_PREFETCH_LEAD_MINUTES} min ahead)"
+        )
+
     scheduler.start()
 
     # 9. Start FastAPI Web Server (voice interface)
@@ -396,14 +547,23 @@ async def main():
             except asyncio.CancelledError:
                 pass
 
-        # 2. Shutdown scheduler
+        # 2. Shutdown scheduler (schedules.json kept as an export of the schedules table)
         logging.info("[SHUTDOWN] Stopping scheduler...")
         scheduler.shutdown()
+        try:
+            await export_schedules_to_file()
+        except Exception as e:
+            logging.error(f"[SHUTDOWN] Failed to export schedules: {e}")
 
         # 3. Shutdown handler
         logging.info("[SHUTDOWN] Stopping Slack handler...")
         await handler.close_async()
 
+        # 4. Shutdown DB thread pool
+        from app.cc_utils import sqlite_pool
+
+        sqlite_pool.shutdown()
+
         logging.info("[SHUTDOWN] ✅ Shutdown complete")
 
 
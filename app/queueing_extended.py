@@ -1,7 +1,9 @@
 import asyncio
 import logging
+import time
+import zlib
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 # Per-channel message queues
 message_queues: Dict[str, asyncio.Queue] = {}
@@ -9,8 +11,21 @@ message_queues: Dict[str, asyncio.Queue] = {}
 # Global orchestrator queue (for heavy tasks)
 orchestrator_queue = asyncio.Queue(maxsize=100)
 
-# Memory save dedicated queue (single worker for sequential processing)
-memory_queue = asyncio.Queue(maxsize=100)
+# Memory save queues, one per shard (one worker each: ordered writes within a shard)
+memory_queues: List[asyncio.Queue] = [asyncio.Queue(maxsize=100)]
+
+# Exclusive memory jobs (compaction) wait for all shard jobs to finish and block new ones;
+# snapshots are also published under the exclusive slot
+_memory_active_jobs = 0
+_memory_exclusive = False
+_memory_exclusive_waiting = 0
+_memory_publish_pending = False
+_memory_condition = asyncio.Condition()
+
+# Written changes wait for the shards to go idle before they are published; after this
+# many seconds a publish is forced (new shard jobs wait until the running ones finish)
+MEMORY_PUBLISH_MAX_DELAY_SECONDS = 300
+_memory_unpublished_since: Optional[float] = None
 
 # Orchestrator worker status management
 _active_orchestrator_workers = 0  # Currently active worker count
@@ -37,16 +52,98 @@ async def enqueue_message(message):
     logging.info(f"[QUEUE] Message enqueued to channel {channel_id}, queue size: {queue.qsize()}")
 
 
+# Internal jobs: work the bot creates itself, trusted and pre-routed (see enqueue_internal_job)
+INTERNAL_JOB_SOURCES = ("schedule", "email", "jira", "voice")
+# operator: straight to the operator / simple: simple_chat first, operator if it declines
+INTERNAL_JOB_ROUTES = ("operator", "simple")
+
+
+async def enqueue_internal_job(
+    source: str,
+    text: str,
+    channel_id: str,
+    user_id: str,
+    route: str = "operator",
+    user_name: Optional[str] = None,
+    context: Optional[dict] = None,
+):
+    """Add a trusted internal job to its channel queue
+
+    Unlike enqueue_message, the job skips the Slack message pipeline (mention
+    conversion, full channel history, proactive confirm, bot call detection,
+    answer aggregator, request router) and goes straight to its route. No
+    approval/busy/ack messages are posted for internal jobs.
+
+    Args:
+        source: Producer of the job (one of INTERNAL_JOB_SOURCES)
+        text: Complete request for the bot
+        channel_id: Channel to answer in
+        user_id: User the job acts for
+        route: Stage to start at (one of INTERNAL_JOB_ROUTES)
+        user_name: Slack display name if already known (saves a users.info call)
+        context: Prefetched context from prepare_internal_context (skips building it)
+    """
+    if source not in INTERNAL_JOB_SOURCES:
+        raise ValueError(f"Unknown internal job source: {source}")
+    if route not in INTERNAL_JOB_ROUTES:
+        raise ValueError(f"Unknown internal job route: {route}")
+
+    await enqueue_message({
+        "internal": True,
+        "source": source,
+        "route": route,
+        "text": text,
+        "channel": channel_id,
+        "ts": "",
+        "user": user_id,
+        "user_name": user_name,
+        "thread_ts": None,
+        "context": context,
+    })
+
+
 async def enqueue_orchestrator_job(orchestrator_job: dict):
     """Add job to global orchestrator queue"""
     await orchestrator_queue.put(orchestrator_job)
     logging.info(f"[ORCHESTRATOR_QUEUE] Job enqueued, queue size: {orchestrator_queue.qsize()}")
 
 
+def get_memory_shard(shard_key: Optional[str]) -> int:
+    """Map a target file's entity key (e.g. "channel:C123", "user:U123") to a memory shard index"""
+    if not shard_key or len(memory_queues) == 1:
+        return 0
+    return zlib.crc32(shard_key.encode("utf-8")) % len(memory_queues)
+
+
 async def enqueue_memory_job(memory_job: dict):
-    """Add job to memory save queue (sequential processing)"""
-    await memory_queue.put(memory_job)
-    logging.info(f"[MEMORY_QUEUE] Job enqueued, queue size: {memory_queue.qsize()}")
+    """Add job to its entity's memory shard queue (sequential within the shard)
+
+    Args:
+        memory_job: Job dict; "shard_key" is the write scope of the job (see app.cc_utils.memory_scope),
+            "exclusive" runs it alone (compaction)
+    """
+    shard = get_memory_shard(memory_job.get("shard_key"))
+    queue = memory_queues[shard]
+    await queue.put(memory_job)
+    logging.info(f"[MEMORY_QUEUE] Job enqueued to shard {shard}, queue size: {queue.qsize()}")
+
+
+def enqueue_memory_job_nowait(memory_job: dict) -> bool:
+    """Add a memory job without waiting (for jobs started from a running memory job,
+    which must not block on a full queue of its own shard)
+
+    Returns:
+        bool: False if the shard queue is full
+    """
+    shard = get_memory_shard(memory_job.get("shard_key"))
+    queue = memory_queues[shard]
+    try:
+        queue.put_nowait(memory_job)
+    except asyncio.QueueFull:
+        logging.warning(f"[MEMORY_QUEUE] Shard {shard} queue is full, job not enqueued")
+        return False
+    logging.info(f"[MEMORY_QUEUE] Job enqueued to shard {shard}, queue size: {queue.qsize()}")
+    return True
 
 
 async def debounced_enqueue_message(message, delay_seconds: float = 2.0):
@@ -244,28 +341,130 @@ def start_orchestrator_worker(app, orchestrator_func, num_workers=2):
         logging.info(f"[ORCHESTRATOR_WORKER] Created worker {worker_id}/{num_workers}")
 
 
-def start_memory_worker(memory_func):
-    """Start memory save dedicated worker (single worker for sequential processing)
+async def _acquire_memory_slot(exclusive: bool):
+    """Wait until a memory job may run (shared for shard jobs, exclusive for maintenance)"""
+    global _memory_active_jobs, _memory_exclusive, _memory_exclusive_waiting
+    async with _memory_condition:
+        if exclusive:
+            _memory_exclusive_waiting += 1
+            await _memory_condition.wait_for(lambda: _memory_active_jobs == 0 and not _memory_exclusive)
+            _memory_exclusive_waiting -= 1
+            _memory_exclusive = True
+        else:
+            await _memory_condition.wait_for(lambda: not _memory_exclusive and _memory_exclusive_waiting == 0)
+            _memory_active_jobs += 1
+
+
+async def _release_memory_slot(exclusive: bool, written: bool = False) -> bool:
+    """Release a memory slot
+
+    A shard job that leaves every shard idle with unpublished changes takes the
+    exclusive slot on the way out, so it can publish before any new job starts.
+
+    Returns:
+        bool: True if the caller now holds the exclusive slot to publish (release it afterwards)
+    """
+    global _memory_active_jobs, _memory_exclusive, _memory_unpublished_since
+    async with _memory_condition:
+        take_publish = False
+        if exclusive:
+            _memory_exclusive = False
+        else:
+            _memory_active_jobs -= 1
+            if written and _memory_unpublished_since is None:
+                _memory_unpublished_since = time.monotonic()
+            if _memory_unpublished_since is not None and _memory_active_jobs == 0 and _memory_exclusive_waiting == 0:
+                _memory_exclusive = True
+                take_publish = True
+        _memory_condition.notify_all()
+        return take_publish
+
+
+async def _publish_under_slot(publish_func):
+    """Publish while holding the exclusive slot"""
+    global _memory_unpublished_since, _memory_publish_pending
+    _memory_unpublished_since = None
+    _memory_publish_pending = False
+    try:
+        await publish_func()
+    finally:
+        await _release_memory_slot(True)
+
+
+def start_memory_worker(memory_func, num_shards=1, publish_func=None):
+    """Start memory save workers, one per shard
+
+    Jobs for the same entity always land on the same shard and run in order;
+    different shards write in parallel. Jobs marked "exclusive" run alone.
+
+    publish_func (index update, snapshot) only ever runs while no job is writing:
+    inside an exclusive job's slot, when the last running shard job finishes, or
+    (if the shards never go idle) once changes are MEMORY_PUBLISH_MAX_DELAY_SECONDS old.
 
     Args:
-        memory_func: Memory save function (receives and processes job dict)
+        memory_func: Memory save function (receives and processes job dict; returns False if nothing was written)
+        num_shards: Number of shards (parallel writers)
+        publish_func: Coroutine function publishing written changes (optional)
     """
-    async def memory_worker():
-        logging.info(f"[MEMORY_WORKER] Started")
+    global memory_queues
+    num_shards = max(1, num_shards)
+    if len(memory_queues) != num_shards:
+        pending = [job for queue in memory_queues for job in _drain(queue)]
+        memory_queues = [asyncio.Queue(maxsize=100) for _ in range(num_shards)]
+        for job in pending:
+            memory_queues[get_memory_shard(job.get("shard_key"))].put_nowait(job)
+
+    async def memory_worker(shard: int, queue: asyncio.Queue):
+        global _memory_publish_pending
+        logging.info(f"[MEMORY_WORKER-{shard}] Started")
 
         while True:
-            logging.info(f"[MEMORY_WORKER] Waiting for next job...")
-            job = await memory_queue.get()
-            logging.info(f"[MEMORY_WORKER] Job received from queue (queue size: {memory_queue.qsize()})")
+            logging.info(f"[MEMORY_WORKER-{shard}] Waiting for next job...")
+            job = await queue.get()
+            logging.info(f"[MEMORY_WORKER-{shard}] Job received from queue (queue size: {queue.qsize()})")
 
+            exclusive = bool(job.get("exclusive"))
             try:
-                await memory_func(job)
-                logging.info(f"[MEMORY_WORKER] Job completed successfully")
+                await _acquire_memory_slot(exclusive)
+                written = False
+                take_publish = False
+                try:
+                    written = await memory_func(job) is not False
+                finally:
+                    if exclusive:
+                        # Exclusive jobs publish inside their own slot
+                        take_publish = publish_func is not None and (written or _memory_unpublished_since is not None)
+                        if not take_publish:
+                            await _release_memory_slot(True)
+                    else:
+                        take_publish = await _release_memory_slot(False, written and publish_func is not None)
+
+                if take_publish:
+                    await _publish_under_slot(publish_func)
+                elif (
+                    _memory_unpublished_since is not None
+                    and not _memory_publish_pending
+                    and time.monotonic() - _memory_unpublished_since >= MEMORY_PUBLISH_MAX_DELAY_SECONDS
+                ):
+                    # Shards kept busy: stop starting new jobs until the running ones finish
+                    _memory_publish_pending = True
+                    await _acquire_memory_slot(True)
+                    await _publish_under_slot(publish_func)
+                logging.info(f"[MEMORY_WORKER-{shard}] Job completed successfully")
             except Exception as e:
-                logging.error(f"[MEMORY_WORKER] Error: {e}")
+                logging.error(f"[MEMORY_WORKER-{shard}] Error: {e}")
             finally:
-                memory_queue.task_done()
+                queue.task_done()
 
     loop = asyncio.get_running_loop()
-    loop.create_task(memory_worker())
-    logging.info(f"[MEMORY_WORKER] Created single worker for sequential memory operations")
\ No newline at end of file
+    for shard, queue in enumerate(memory_queues):
+        loop.create_task(memory_worker(shard, queue))
+    logging.info(f"[MEMORY_WORKER] Created {num_shards} shard workers (sequential within each shard)")
+
+
+def _drain(queue: asyncio.Queue) -> list:
+    """Remove and return all jobs waiting in a queue"""
+    jobs = []
+    while not queue.empty():
+        jobs.append(queue.get_nowait())
+    return jobs
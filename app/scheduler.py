@@ -1,8 +1,8 @@
 import os
 import json
-import uuid
+import asyncio
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 
 # Scheduler dedicated logger (separate format)
 scheduler_logger = logging.getLogger("SCHEDULER")
@@ -14,13 +14,17 @@ _handler.setFormatter(logging.Formatter(
 ))
 scheduler_logger.addHandler(_handler)
 scheduler_logger.setLevel(logging.INFO)
-from typing import List, Dict, Any
+from typing import Dict, Any
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.executors.asyncio import AsyncIOExecutor
+from apscheduler.jobstores.memory import MemoryJobStore
 
 from app.config.settings import get_settings
-from app.queueing_extended import enqueue_message
+from app.cc_utils import memory_store, schedule_context, schedule_db, sqlite_pool
+from app.cc_utils.schedule_load import TokenBucket, forecast_load, jitter_offset
+from app.cc_utils.schedule_jobstore import StateDBJobStore
+from app.queueing_extended import enqueue_internal_job
 
 # Scheduler instance and configuration
 # =================================================================
@@ -33,13 +37,37 @@ job_defaults = {
     'max_instances': 3,  # Same job can run up to 3 instances concurrently
     'misfire_grace_time': 30  # Allow up to 30 seconds delay
 }
-scheduler = AsyncIOScheduler(executors=executors, job_defaults=job_defaults)
+# User schedules persist in the bot state DB; system jobs (checkers etc.) are re-added each start
+SCHEDULE_JOBSTORE = 'schedules'
+_schedule_jobstore = StateDBJobStore()
+jobstores = {
+    'default': MemoryJobStore(),
+    SCHEDULE_JOBSTORE: _schedule_jobstore,
+}
+scheduler = AsyncIOScheduler(jobstores=jobstores, executors=executors, job_defaults=job_defaults)
 settings = get_settings()
+
+# What happens to runs missed while the bot was down (or the loop was blocked)
+# - run_once: missed runs collapse into one late run, however late
+# - coalesce: missed runs collapse into one late run if within SCHEDULE_MISFIRE_GRACE_SECONDS
+# - skip: missed runs are dropped (anything more than SKIP_MISFIRE_GRACE_SECONDS late)
+MISFIRE_POLICIES = ("run_once", "coalesce", "skip")
+SKIP_MISFIRE_GRACE_SECONDS = 1
+DEFAULT_MISFIRE_POLICY = {
+    "date": "run_once",
+    "cron": "coalesce",
+}
+
+# Burst smoothing for user schedules (see app.cc_utils.schedule_load)
+LOAD_FORECAST_HORIZON = timedelta(hours=24)
+_release_bucket = TokenBucket(settings.SCHEDULE_RELEASE_PER_MINUTE, settings.SCHEDULE_RELEASE_BURST)
+# Minute -> number of schedule jobs firing in it
+_load_forecast: Dict[datetime, int] = {}
 SCHEDULE_DIR = os.path.join(settings.FILESYSTEM_BASE_DIR, "schedule_data")
 SCHEDULE_FILE = os.path.join(SCHEDULE_DIR, "schedules.json")
 
 
-# Internal file I/O and schedule management logic
+# schedules.json export (the schedules table in the bot state DB is the source of truth)
 # =================================================================
 def _ensure_dir_and_file():
     os.makedirs(SCHEDULE_DIR, exist_ok=True)
@@ -48,19 +76,10 @@ def _ensure_dir_and_file():
             json.dump([], f)
 
 
-def read_schedules_from_file() -> List[Dict[str, Any]]:
-    _ensure_dir_and_file()
-    try:
-        with open(SCHEDULE_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, FileNotFoundError):
-        return []
-
-
-def write_schedules_to_file(schedules: List[Dict[str, Any]]):
+async def export_schedules_to_file() -> int:
+    """Write the current schedules to schedules.json (backup)"""
     _ensure_dir_and_file()
-    with open(SCHEDULE_FILE, "w", encoding="utf-8") as f:
-        json.dump(schedules, f, indent=2, ensure_ascii=False)
+    return await schedule_db.export_to_file_async(SCHEDULE_FILE)
 
 
 async def scheduled_message_wrapper(message: dict, schedule_id: str, schedule_name: str):
@@ -73,11 +92,34 @@ async def scheduled_message_wrapper(message: dict, schedule_id: str, schedule_na
         schedule_name: Schedule name
     """
     try:
+        # Context prepared a few minutes ahead (its retrieved memory is dropped if memory changed since)
+        await asyncio.to_thread(memory_store.sync)
+        context = schedule_context.take(schedule_id)
+
+        # Crowded minute: shift this schedule by its stable offset within the jitter window
+        fired_at = datetime.now().astimezone().replace(second=0, microsecond=0)
+        if _load_forecast.get(fired_at, 0) > settings.SCHEDULE_RELEASE_BURST:
+            delay = jitter_offset(schedule_id, settings.SCHEDULE_JITTER_SECONDS)
+            if delay:
+                scheduler_logger.info(f"⏳ Jitter {delay}s: [{schedule_name}] (ID: {schedule_id}), {_load_forecast[fired_at]} jobs this minute")
+                await asyncio.sleep(delay)
+
+        # Release rate limit shared by all scheduled messages
+        waited = await _release_bucket.acquire()
+        if waited >= 1:
+            scheduler_logger.info(f"⏳ Rate limited {waited:.1f}s: [{schedule_name}] (ID: {schedule_id})")
+
         scheduler_logger.info(f"🔔 Executing: [{schedule_name}] (ID: {schedule_id})")
         scheduler_logger.info(f"  └─ Channel: {message.get('channel')}, User: {message.get('user')}")
         scheduler_logger.info(f"  └─ Text preview: {message.get('text', '')[:50]}...")
 
-        await enqueue_message(message)
+        await enqueue_internal_job(
+            source="schedule",
+            text=message.get("text", ""),
+            channel_id=message.get("channel"),
+            user_id=message.get("user"),
+            context=context,
+        )
 
         scheduler_logger.info(f"✅ Executed successfully: [{schedule_name}] (ID: {schedule_id})")
     except Exception as e:
@@ -85,70 +127,218 @@ async def scheduled_message_wrapper(message: dict, schedule_id: str, schedule_na
         scheduler_logger.error(f"  └─ Error: {type(e).__name__}: {e}")
 
 
-async def reload_schedules_from_file():
-    """Read schedules from file and reload them into the scheduler."""
-    try:
-        # Only delete jobs registered with scheduled_message_wrapper (keep checkers/suggester)
-        jobs = scheduler.get_jobs()
-        for job in jobs:
-            if job.func == scheduled_message_wrapper:
-                scheduler.remove_job(job.id)
-                scheduler_logger.debug(f"Removed existing job: {job.name} (ID: {job.id})")
-    except Exception as e:
-        scheduler_logger.warning(f"Error while deleting existing schedules (normal on first run): {e}")
+async def prefetch_schedule_contexts() -> int:
+    """
+    Prepare Slack context and retrieved memory for schedules firing within
+    SCHEDULE_PREFETCH_LEAD_MINUTES (run every minute)
 
-    schedules = read_schedules_from_file()
-    count = 0
-    for schedule in schedules:
-        if not schedule.get("is_enabled"):
-            continue
+    Returns:
+        Number of contexts prepared
+    """
+    from app.cc_slack_handlers import prepare_internal_context, retrieve_internal_memory
 
+    schedule_context.prune()
+    lead = timedelta(minutes=settings.SCHEDULE_PREFETCH_LEAD_MINUTES)
+    now = datetime.now().astimezone()
+    jobs = await sqlite_pool.run(_schedule_jobstore.get_jobs_between, now, now + lead)
+
+    current_generation = await asyncio.to_thread(memory_store.sync)
+
+    prepared = 0
+    for job in jobs:
+        message, schedule_id, schedule_name = job.args
+        entry = schedule_context.peek(schedule_id)
+        if entry is not None and entry["generation"] == current_generation:
+            continue
         try:
-            # Add user_id to the message payload
-            message = {
-                "user": schedule.get("user"),
-                "text": schedule.get("text"),
-                "channel": schedule.get("channel"),
-                "skip_ack_messages": True,  # Skip approval/busy Slack messages for scheduled tasks
-            }
-            schedule_type = schedule.get("schedule_type")
-            schedule_value = schedule.get("schedule_value")
-            schedule_id = schedule.get("id")
-            schedule_name = schedule.get("name")
-
-            job_args = {
-                "id": schedule_id,
-                "name": schedule_name,
-                "args": [message, schedule_id, schedule_name],  # Pass ID and name to wrapper
-            }
-
-            if schedule_type == "cron":
-                scheduler.add_job(
-                    scheduled_message_wrapper,  # Use wrapper function
-                    trigger=CronTrigger.from_crontab(schedule_value),
-                    **job_args,
-                )
-                scheduler_logger.info(f"📅 Registered cron: [{schedule_name}] (ID: {schedule_id}), pattern: {schedule_value}")
-            elif schedule_type == "date":
-                # Skip if the time is in the past
-                try:
-                    run_date = datetime.fromisoformat(schedule_value.replace('Z', '+00:00'))
-                    if run_date <= datetime.now(run_date.tzinfo):
-                        scheduler_logger.info(f"⏭️ Skipping past: [{schedule_name}] (ID: {schedule_id}), time: {schedule_value}")
-                        continue
-                except (ValueError, AttributeError) as e:
-                    scheduler_logger.error(f"❌ Invalid date format: [{schedule_name}] (ID: {schedule_id}), value: {schedule_value}, error: {e}")
-                    continue
-
-                scheduler.add_job(
-                    scheduled_message_wrapper,  # Use wrapper function
-                    trigger="date",
-                    run_date=schedule_value,
-                    **job_args
+            # Read the generation first so a memory write during retrieval invalidates the entry
+            generation = await asyncio.to_thread(memory_store.sync)
+            if entry is not None:
+                # Memory changed since the prefetch: only the retrieval is stale, keep the Slack context
+                context = entry["context"]
+                retrieved_memory = await retrieve_internal_memory(
+                    context, message.get("channel"), message.get("user"), message.get("text", "")
                 )
-                scheduler_logger.info(f"📅 Registered one-time: [{schedule_name}] (ID: {schedule_id}), time: {schedule_value}")
+                schedule_context.put(schedule_id, dict(context, retrieved_memory=retrieved_memory), generation, entry["expires_at"])
+                prepared += 1
+                scheduler_logger.info(f"🧰 Refreshed prefetched memory: [{schedule_name}] (ID: {schedule_id})")
+                continue
 
-            count += 1
+            context = await prepare_internal_context(
+                message.get("channel"), message.get("user"), message.get("text", ""), retrieve_memory=True
+            )
+            # Usable until shortly after the run (jitter/rate limiting may delay it)
+            expires_at = job.next_run_time.timestamp() + lead.total_seconds() + settings.SCHEDULE_JITTER_SECONDS
+            schedule_context.put(schedule_id, context, generation, expires_at)
+            prepared += 1
+            scheduler_logger.info(f"🧰 Prefetched context: [{schedule_name}] (ID: {schedule_id}), runs at {job.next_run_time:%H:%M}")
         except Exception as e:
-            scheduler_logger.error(f"❌ Failed to register: [{schedule.get('name')}] (ID: {schedule.get('id')}), error: {e}")
-    scheduler_logger.info(f"Total {count} schedules reloaded successfully")
+            scheduler_logger.warning(f"Context prefetch failed: [{schedule_name}] (ID: {schedule_id}), error: {e}")
+
+    return prepared
+
+
+def _compute_load_forecast(now: datetime) -> Dict[datetime, int]:
+    """Load every stored schedule job and walk its fire times (blocking)"""
+    return forecast_load(_schedule_jobstore.get_all_jobs(), now, LOAD_FORECAST_HORIZON)
+
+
+async def refresh_load_forecast() -> Dict[datetime, int]:
+    """
+    Recompute jobs per minute for the next LOAD_FORECAST_HORIZON (run periodically)
+
+    Unpickling the stored jobs and walking their triggers runs on the DB thread
+    pool, so thousands of schedules do not block the event loop.
+
+    Returns:
+        Minutes where more schedules fire than the release burst allows
+    """
+    now = datetime.now().astimezone()
+    forecast = await sqlite_pool.run(_compute_load_forecast, now)
+
+    _load_forecast.clear()
+    _load_forecast.update(forecast)
+
+    crowded = {minute: count for minute, count in forecast.items() if count > settings.SCHEDULE_RELEASE_BURST}
+    if crowded:
+        peak_minute, peak_count = max(crowded.items(), key=lambda item: item[1])
+        scheduler_logger.info(
+            f"📈 Load forecast: {len(crowded)} crowded minutes in the next {LOAD_FORECAST_HORIZON}, "
+            f"peak {peak_count} jobs at {peak_minute:%m-%d %H:%M}"
+        )
+    return crowded
+
+
+def _misfire_options(schedule: Dict[str, Any]) -> Dict[str, Any]:
+    """APScheduler coalesce/misfire_grace_time for a schedule's misfire policy"""
+    policy = schedule.get("misfire_policy") or DEFAULT_MISFIRE_POLICY.get(schedule.get("schedule_type"), "skip")
+    if policy == "run_once":
+        return {"coalesce": True, "misfire_grace_time": None}
+    if policy == "coalesce":
+        return {"coalesce": True, "misfire_grace_time": settings.SCHEDULE_MISFIRE_GRACE_SECONDS}
+    return {"coalesce": True, "misfire_grace_time": SKIP_MISFIRE_GRACE_SECONDS}
+
+
+def _register_job(schedule: Dict[str, Any]) -> bool:
+    """
+    Add or replace the APScheduler job of one schedule
+
+    Returns:
+        Whether a job is now registered (False for disabled, past or invalid schedules)
+    """
+    schedule_id = schedule.get("id")
+    schedule_name = schedule.get("name")
+    if not schedule.get("is_enabled"):
+        return False
+
+    try:
+        # Add user_id to the message payload
+        message = {
+            "user": schedule.get("user"),
+            "text": schedule.get("text"),
+            "channel": schedule.get("channel"),
+            "skip_ack_messages": True,  # Skip approval/busy Slack messages for scheduled tasks
+        }
+        schedule_type = schedule.get("schedule_type")
+        schedule_value = schedule.get("schedule_value")
+
+        job_args = {
+            "id": schedule_id,
+            "name": schedule_name,
+            "args": [message, schedule_id, schedule_name],  # Pass ID and name to wrapper
+            "jobstore": SCHEDULE_JOBSTORE,
+            "replace_existing": True,
+            **_misfire_options(schedule),
+        }
+
+        if schedule_type == "cron":
+            scheduler.add_job(
+                scheduled_message_wrapper,  # Use wrapper function
+                trigger=CronTrigger.from_crontab(schedule_value),
+                **job_args,
+            )
+            scheduler_logger.info(f"📅 Registered cron: [{schedule_name}] (ID: {schedule_id}), pattern: {schedule_value}")
+        elif schedule_type == "date":
+            # Skip if the time is in the past
+            try:
+                run_date = datetime.fromisoformat(schedule_value.replace('Z', '+00:00'))
+                if run_date <= datetime.now(run_date.tzinfo):
+                    scheduler_logger.info(f"⏭️ Skipping past: [{schedule_name}] (ID: {schedule_id}), time: {schedule_value}")
+                    return False
+            except (ValueError, AttributeError) as e:
+                scheduler_logger.error(f"❌ Invalid date format: [{schedule_name}] (ID: {schedule_id}), value: {schedule_value}, error: {e}")
+                return False
+
+            scheduler.add_job(
+                scheduled_message_wrapper,  # Use wrapper function
+                trigger="date",
+                run_date=schedule_value,
+                **job_args
+            )
+            scheduler_logger.info(f"📅 Registered one-time: [{schedule_name}] (ID: {schedule_id}), time: {schedule_value}")
+        else:
+            return False
+
+        return True
+    except Exception as e:
+        scheduler_logger.error(f"❌ Failed to register: [{schedule_name}] (ID: {schedule_id}), error: {e}")
+        return False
+
+
+def unschedule_job(schedule_id: str):
+    """Remove the APScheduler job of one schedule (no-op if it is not registered)"""
+    schedule_context.discard(schedule_id)
+    job = scheduler.get_job(schedule_id, jobstore=SCHEDULE_JOBSTORE)
+    if job is not None:
+        scheduler.remove_job(schedule_id, jobstore=SCHEDULE_JOBSTORE)
+        scheduler_logger.info(f"🗑️ Unregistered: [{job.name}] (ID: {schedule_id})")
+
+
+def sync_schedule_job(schedule: Dict[str, Any]) -> bool:
+    """
+    Apply one added/updated schedule to APScheduler without touching other jobs
+
+    Returns:
+        Whether the schedule has an active job afterwards
+    """
+    # A context prefetched for the old text/channel must not be used
+    schedule_context.discard(schedule.get("id"))
+    if _register_job(schedule):
+        return True
+    # Disabled, past or invalid: make sure no stale job keeps firing
+    unschedule_job(schedule.get("id"))
+    return False
+
+
+def _clear_schedule_jobs():
+    """Remove every user schedule job (checkers/suggester live in the default store)"""
+    scheduler.remove_all_jobs(jobstore=SCHEDULE_JOBSTORE)
+    if not scheduler.running:
+        # Before start() the scheduler only clears pending jobs, not the persistent store
+        _schedule_jobstore.remove_all_jobs()
+
+
+async def load_schedules(rebuild: bool = False):
+    """
+    Prepare user schedule jobs at startup.
+
+    The persistent job store already holds every job with its next run time, so
+    normally nothing is re-registered: once started, the scheduler fetches only the
+    due jobs and applies their misfire policy. The store is rebuilt from the
+    schedules table when it is empty (first start) or when rebuild is set.
+
+    Schedules changed through the scheduler tools are synced to the store as they
+    are edited (sync_schedule_job). Rows edited directly in the schedules table
+    are not: with a non-empty store they are never re-registered until the store
+    is rebuilt (load_schedules(rebuild=True)).
+    """
+    stored = await sqlite_pool.run(_schedule_jobstore.count_jobs)
+    if stored and not rebuild:
+        scheduler_logger.info(f"Recovered {stored} schedule jobs from the persistent job store")
+        return
+
+    _clear_schedule_jobs()
+    schedules = await schedule_db.list_schedules_async(enabled_only=True)
+    count = sum(1 for schedule in schedules if _register_job(schedule))
+    scheduler_logger.info(f"Total {count} schedules loaded successfully")
+